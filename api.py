@@ -0,0 +1,355 @@
+import argparse
+import base64
+import binascii
+import gzip
+import json
+import socket
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from catalog import SUMMARY_COLUMNS
+from database import Database, data_version, read_aggregates, read_similar_universities, read_university_details
+from facets import FacetIndex
+from query import Filters, QueryEngine
+from search import search_universities
+from snapshot import load_snapshot
+
+# `sort` parameter values and the Explore sort options they stand for.
+SORT_KEYS = {'relevance': "Relevance", 'name': "Name (A-Z)", '-name': "Name (Z-A)",
+             'fees': "Fees (Low-High)", '-fees': "Fees (High-Low)"}
+FACET_PARAMS = ['region', 'type', 'max_fees', 'academic_interest', 'difficulty']
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Bodies smaller than this are sent as they are: gzip would barely shrink them.
+GZIP_MIN_BYTES = 512
+# Encoded responses kept per (data version, URL, encoding).
+RESPONSE_CACHE_SIZE = 1024
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Snapshot(NamedTuple):
+    version: int
+    catalog: object     # catalog.Catalog
+    engine: QueryEngine
+    facets: FacetIndex
+
+
+class Response(NamedTuple):
+    status: int
+    headers: dict
+    body: bytes
+
+
+# --- Request handling ---
+class CatalogAPI:
+    """Read-only JSON views of the catalog, independent of the HTTP server that carries them.
+
+    The catalog (from its columnar snapshot), query engine and facet index are loaded once
+    per data version, exactly as the app loads them. Every successful response carries the
+    version as its ETag: a client sending it back in If-None-Match gets a bodiless 304 instead,
+    while errors are always answered in full. Encoded (JSON, optionally gzipped) bodies are
+    memoized in a bounded LRU keyed by (data version, URL, encoding), so a repeat request,
+    conditional or not, costs a single indexed max() query and a lookup.
+    """
+
+    def __init__(self, db, cache_size=RESPONSE_CACHE_SIZE):
+        self.db = db
+        self.cache_size = cache_size
+        self._snapshot = None
+        self._load_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.routes = [
+            ('/universities', self.list_universities),
+            ('/search', self.search),
+            ('/aggregates', self.aggregates),
+            ('/facets', self.facet_counts),
+        ]
+
+    def version(self):
+        with self.db.read() as conn:
+            return data_version(conn)
+
+    def snapshot(self, version):
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._load_lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                catalog, interests = load_snapshot(self.db, version)
+                search = partial(self._search_ids, version)
+                self._snapshot = Snapshot(version, catalog, QueryEngine(catalog.universities, version, search=search),
+                                          FacetIndex(catalog, interests, version, search=search))
+            return self._snapshot
+
+    def _search_ids(self, version, text):
+        with self.db.read() as conn:
+            return search_universities(conn, text)
+
+    def handle(self, target, accept_encoding='', if_none_match=None):
+        """The Response for a GET of `target` (path and query string)."""
+        version = self.version()
+        gzipped = _accepts_gzip(accept_encoding)
+        key = (version, target, gzipped)
+        with self._lock:
+            response = self._cache.get(key)
+            if response is not None:
+                self._cache.move_to_end(key)
+        if response is None:
+            response = self._render(version, target, gzipped)
+            if response.status == 200:
+                with self._lock:
+                    self._cache[key] = response
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+
+        # Only what would be a 200 can be unmodified; the 304 names the representation that 200 would carry.
+        if response.status == 200 and if_none_match is not None and f'"{version}"' in {
+                tag.strip().removeprefix('W/').replace('-gzip"', '"') for tag in if_none_match.split(',')}:
+            return Response(304, {name: response.headers[name] for name in ('ETag', 'Cache-Control', 'Vary')}, b'')
+        return response
+
+    @staticmethod
+    def _etag(version, gzipped):
+        # Each encoding of a version is its own representation, so it gets its own strong tag.
+        return f'"{version}-gzip"' if gzipped else f'"{version}"'
+
+    def _render(self, version, target, gzipped):
+        url = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        path = url.path.rstrip('/') or '/'
+        try:
+            status, payload = 200, self._route(path, params, version)
+        except ApiError as e:
+            status, payload = e.status, {'error': str(e)}
+        body = json.dumps(payload, default=_json_default, ensure_ascii=False, separators=(',', ':')).encode()
+        headers = {'Content-Type': 'application/json; charset=utf-8', 'Vary': 'Accept-Encoding'}
+        if status == 200:
+            headers.update({'ETag': self._etag(version, gzipped and len(body) >= GZIP_MIN_BYTES),
+                            'Cache-Control': 'no-cache'})
+        if gzipped and len(body) >= GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+            headers['Content-Encoding'] = 'gzip'
+        return Response(status, headers, body)
+
+    def _route(self, path, params, version):
+        for prefix, view in self.routes:
+            if path == prefix:
+                return view(params, version)
+        if path.startswith('/universities/'):
+            return self.university(path.removeprefix('/universities/'), version)
+        raise ApiError(404, f"No such endpoint: {path}")
+
+    # --- Endpoints ---
+    def list_universities(self, params, version):
+        """Summary rows matching the filters, a page at a time."""
+        snapshot = self.snapshot(version)
+        filters = Filters(
+            search=params.get('q', ''),
+            region=params.get('region'),
+            type=params.get('type'),
+            max_fees=_integer(params, 'max_fees'),
+            difficulty=params.get('difficulty'),
+            sort_by=_sort(params.get('sort', 'relevance')),
+        )
+        positions = snapshot.engine.positions(filters)
+        limit = min(_integer(params, 'limit', DEFAULT_LIMIT, minimum=1), MAX_LIMIT)
+        offset = _decode_cursor(params.get('cursor'), version)
+        page = snapshot.catalog.universities.iloc[positions[offset:offset + limit]]
+        end = offset + len(page)
+        return {
+            'version': version,
+            'total': len(positions),
+            'items': _records(page),
+            'next_cursor': _encode_cursor(version, end) if end < len(positions) else None,
+        }
+
+    def search(self, params, version):
+        """Universities matching free text `q`, best match first unless `sort` says otherwise."""
+        if not params.get('q', '').strip():
+            raise ApiError(400, "Parameter 'q' is required")
+        return self.list_universities(params, version)
+
+    def university(self, university_id, version):
+        """The full record of one university, with its most similar institutions."""
+        if not university_id.isdigit():
+            raise ApiError(404, f"No university with id {university_id}")
+        with self.db.read() as conn:
+            uni = read_university_details(conn, int(university_id))
+            if uni is None:
+                raise ApiError(404, f"No university with id {university_id}")
+            uni['similar'] = read_similar_universities(conn, int(university_id))
+        return {'version': version, 'university': uni}
+
+    def aggregates(self, params, version):
+        """The Data Insights figures: {metric: {series: {label: value}}}, series '' for single-series metrics."""
+        with self.db.read() as conn:
+            rows = read_aggregates(conn)
+        metrics = {}
+        for metric, series, label, value in zip(rows['metric'], rows['series'], rows['label'], rows['value']):
+            metrics.setdefault(metric, {}).setdefault(series, {})[label] = value
+        return {'version': version, 'metrics': metrics}
+
+    def facet_counts(self, params, version):
+        """Matches for every option of every filter, given the other filters (as shown in the app)."""
+        facets = self.snapshot(version).facets
+        choices = {name: params.get(name) for name in FACET_PARAMS}
+        choices['max_fees'] = _integer(params, 'max_fees')
+        choices['search'] = params.get('q')
+        return {
+            'version': version,
+            'total': facets.count(choices),
+            'facets': {name: facets.counts(choices, name) for name in FACET_PARAMS},
+        }
+
+
+# --- Parameters ---
+def _accepts_gzip(accept_encoding):
+    # gzip unless the header leaves it out or gives it q=0, directly or through '*'.
+    qualities = {}
+    for coding in accept_encoding.split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    return qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0))) > 0
+
+
+def _integer(params, name, default=None, minimum=0):
+    if name not in params:
+        return default
+    try:
+        value = int(params[name])
+    except ValueError:
+        raise ApiError(400, f"Parameter '{name}' must be an integer") from None
+    if value < minimum:
+        raise ApiError(400, f"Parameter '{name}' must be at least {minimum}")
+    return value
+
+
+def _sort(key):
+    if key not in SORT_KEYS:
+        raise ApiError(400, f"Parameter 'sort' must be one of: {', '.join(SORT_KEYS)}")
+    return SORT_KEYS[key]
+
+
+def _encode_cursor(version, offset):
+    # Opaque to clients; it pins the data version so a page never silently shifts under a sync.
+    return base64.urlsafe_b64encode(json.dumps([version, offset]).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor, version):
+    if not cursor:
+        return 0
+    try:
+        cursor_version, offset = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError, binascii.Error):
+        raise ApiError(400, "Invalid cursor") from None
+    if cursor_version != version or not isinstance(offset, int) or offset < 0:
+        raise ApiError(410, "The catalog changed since this cursor was issued; start again without a cursor")
+    return offset
+
+
+def _records(page):
+    columns = [page[name].to_numpy(dtype=object) for name in SUMMARY_COLUMNS]
+    for values in columns:
+        values[pd.isna(values)] = None
+    return [dict(zip(SUMMARY_COLUMNS, values)) for values in zip(*columns)]
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# --- HTTP server ---
+class Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps client connections open between polls; every response sets Content-Length.
+    protocol_version = 'HTTP/1.1'
+    api = None
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this, Nagle's algorithm holds the
+        # body back until the client's delayed ACK, adding ~40 ms to every keep-alive response.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        try:
+            response = self.api.handle(self.path, self.headers.get('Accept-Encoding', ''),
+                                       self.headers.get('If-None-Match'))
+        except Exception:
+            # Still answer, so the client is not left waiting on a keep-alive connection.
+            self.log_error("Error serving %s\n%s", self.path, traceback.format_exc())
+            response = Response(500, {'Content-Type': 'application/json; charset=utf-8'},
+                                json.dumps({'error': "Internal server error"}).encode())
+        self.send_response(response.status)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(response.body)))
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def log_error(self, format, *args):
+        # Errors are logged even when requests are not.
+        super().log_message(format, *args)
+
+
+def make_server(db, host='127.0.0.1', port=8000, verbose=False):
+    """A threading HTTP server for CatalogAPI(db); call serve_forever() on it."""
+    handler = type('CatalogHandler', (Handler,), {'api': CatalogAPI(db)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+
+# --- Command line ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the university catalog as a read-only JSON API.")
+    parser.add_argument('--db', help="Database file (default: STACKUNIVERSITY_DB or universities.db)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    server = make_server(db, args.host, args.port, args.verbose)
+    print(f"Serving the catalog on http://{args.host}:{server.server_port} (Ctrl+C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,217 +1,337 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
-import requests
-from bs4 import BeautifulSoup
-import time
-import json
+import html
+from functools import partial
 from streamlit_echarts import st_echarts
 
-# --- Database Initialization ---
-def init_db():
-    conn = sqlite3.connect('universities.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS universities
-                 (id INTEGER PRIMARY KEY, name TEXT, acronym TEXT, region TEXT, type TEXT,
-                  avg_fees INTEGER, difficulty TEXT, location TEXT, description TEXT,
-                  facilities TEXT, programs TEXT, admission_requirements TEXT)''')
-    conn.commit()
-    return conn
-
-# --- Web Scraping Function ---
-def scrape_university_data():
-    conn = init_db()
-    c = conn.cursor()
-    
-    base_url = "https://www.tcu.go.tz/services/accreditation/universities-registered-tanzania"
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-    
-    scraped_universities = []
-    page = 1
-    max_pages = 5  # Limit to prevent infinite loops; adjust based on site
-
-    try:
-        while page <= max_pages:
-            url = f"{base_url}?page={page}" if page > 1 else base_url
-            st.write(f"Scraping page {page}: {url}")
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            university_rows = soup.select('table.views-table tbody tr')
-            if not university_rows:
-                st.write(f"No more universities found on page {page}. Stopping.")
-                break
-
-            for idx, row in enumerate(university_rows):
-                cells = row.find_all('td')
-                if len(cells) >= 4:
-                    name_full = cells[1].text.strip()
-                    name_parts = name_full.replace(')', '').split('(')
-                    name = name_parts[0].strip()
-                    acronym = name_parts[1].strip() if len(name_parts) > 1 else ''.join(word[0].upper() for word in name.split()[:3])
-                    
-                    head_office = cells[2].text.strip()
-                    uni_type = cells[3].text.replace('University', '').replace('College', '').replace('Campus, Centre and Institute', '').strip()
-                    
-                    difficulty = "Medium"
-                    if "Dar es Salaam" in head_office and "Public" in uni_type:
-                        difficulty = "High"
-                    elif "Health" in name or "Medicine" in name or "Science and Technology" in name:
-                        difficulty = "High" if uni_type == "Public" else "Very High" if uni_type == "Private" else "High"
-                    
-                    avg_fees = 1500000
-                    if "Private" in cells[3].text:
-                        avg_fees = 2000000 + ((idx + page * 10) * 50000) % 2500000
-                    
-                    generic_programs = [
-                        {"name": "General Studies", "duration": 3, "prospects": "Diverse career paths", "program_difficulty": "Medium"},
-                        {"name": "Diploma in Business", "duration": 2, "prospects": "Small business management", "program_difficulty": "Low"}
-                    ]
-                    generic_facilities = ["Library", "Labs"]
-                    
-                    scraped_universities.append({
-                        'id': len(scraped_universities) + 1,
-                        'name': name,
-                        'acronym': acronym,
-                        'region': head_office,
-                        'type': uni_type,
-                        'avg_fees': avg_fees,
-                        'difficulty': difficulty,
-                        'location': head_office,
-                        'description': f"This is a {uni_type} institution located in {head_office}, Tanzania. It is renowned for its contributions to various fields of study.",
-                        'facilities': json.dumps(generic_facilities),
-                        'programs': json.dumps(generic_programs),
-                        'admission_requirements': "Minimum of D grades in 4 relevant subjects (placeholder)."
-                    })
-            
-            page += 1
-            time.sleep(1)  # Avoid overwhelming the server
-
-        if scraped_universities:
-            st.success(f"Successfully scraped {len(scraped_universities)} universities from TCU.")
-            c.execute('DELETE FROM universities')
-            conn.commit()
-            for uni in scraped_universities:
-                c.execute('''INSERT INTO universities
-                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                          (uni['id'], uni['name'], uni['acronym'], uni['region'], uni['type'],
-                           uni['avg_fees'], uni['difficulty'], uni['location'], uni['description'],
-                           uni['facilities'], uni['programs'], uni['admission_requirements']))
-            conn.commit()
-        else:
-            st.warning("Scraping returned no data. Using sample data.")
-            insert_sample_data(c, conn)
-            
-    except requests.exceptions.RequestException as e:
-        st.error(f"Network or HTTP error during scraping: {e}. Using sample data.")
-        insert_sample_data(c, conn)
-    except Exception as e:
-        st.error(f"An unexpected error occurred during scraping: {e}. Using sample data.")
-        insert_sample_data(c, conn)
-    finally:
-        conn.close()
-
-# --- Helper function to insert sample data ---
-def insert_sample_data(c, conn):
-    sample_data = [
-        (1, "University of Dar es Salaam", "UDSM", "Dar es Salaam", "Public", 1500000, "High", "Mlimani",
-         "The oldest and largest public university in Tanzania.", json.dumps(["Library", "Labs", "Dorms", "Sports Complex"]),
-         json.dumps([
-             {"name": "BSc in Computer Science", "duration": 3, "prospects": "Software Developer, Data Scientist", "program_difficulty": "High"},
-             {"name": "Bachelor of Laws (LLB)", "duration": 4, "prospects": "Lawyer, Legal Advisor", "program_difficulty": "High"}
-         ]), "Minimum of B+ average in Science subjects."),
-        (2, "Sokoine University of Agriculture", "SUA", "Morogoro", "Public", 1300000, "Medium", "Morogoro Town",
-         "Leading in agriculture and veterinary sciences.", json.dumps(["Farms", "Labs", "Library"]),
-         json.dumps([
-             {"name": "BSc in Agriculture", "duration": 3, "prospects": "Agricultural Officer", "program_difficulty": "Medium"},
-             {"name": "Doctor of Veterinary Medicine", "duration": 5, "prospects": "Veterinary Doctor", "program_difficulty": "High"}
-         ]), "Minimum of C grades in Science subjects."),
-        (3, "Ardhi University", "ARU", "Dar es Salaam", "Public", 1400000, "Medium", "Ubungo",
-         "Specializes in land and environmental sciences.", json.dumps(["GIS Lab", "Library", "Dorms"]),
-         json.dumps([
-             {"name": "BSc in Land Management", "duration": 4, "prospects": "Valuer, Land Officer", "program_difficulty": "Medium"},
-             {"name": "BSc in Architecture", "duration": 5, "prospects": "Architect", "program_difficulty": "Very High"}
-         ]), "Minimum of C grades in Math, Physics, Geography."),
-        (4, "University of Dodoma", "UDOM", "Dodoma", "Public", 1200000, "Medium", "Dodoma City",
-         "Large university with diverse programs.", json.dumps(["Lecture Halls", "Library", "Hostels"]),
-         json.dumps([
-             {"name": "Bachelor of Arts in Education", "duration": 3, "prospects": "Teacher", "program_difficulty": "Medium"},
-             {"name": "BSc in Nursing", "duration": 4, "prospects": "Nurse", "program_difficulty": "High"}
-         ]), "Average pass in relevant subjects."),
-        (5, "St. Augustine University of Tanzania", "SAUT", "Mwanza", "Private", 2000000, "Medium", "Mwanza City",
-         "Prominent private university with multiple campuses.", json.dumps(["Library", "Hostels", "Computer Labs"]),
-         json.dumps([
-             {"name": "Bachelor of Arts in Mass Communication", "duration": 3, "prospects": "Journalist", "program_difficulty": "Medium"},
-             {"name": "Bachelor of Business Administration", "duration": 3, "prospects": "Manager", "program_difficulty": "Medium"}
-         ]), "Minimum of D grades in 4 subjects."),
-        (6, "Mzumbe University", "MU", "Morogoro", "Public", 1350000, "High", "Mzumbe Town",
-         "Renowned for public administration and law.", json.dumps(["Library", "Computer Labs", "Dorms"]),
-         json.dumps([
-             {"name": "Bachelor of Public Administration", "duration": 3, "prospects": "Civil Servant", "program_difficulty": "High"},
-             {"name": "Bachelor of Laws (LLB)", "duration": 4, "prospects": "Lawyer", "program_difficulty": "High"}
-         ]), "Strong passes in Arts subjects."),
-        (7, "Hubert Kairuki Memorial University", "HKMU", "Dar es Salaam", "Private", 4500000, "High", "Mikocheni",
-         "Specialized in health sciences.", json.dumps(["Hospital", "Labs", "Library"]),
-         json.dumps([
-             {"name": "Doctor of Medicine", "duration": 5, "prospects": "Medical Doctor", "program_difficulty": "Very High"},
-             {"name": "BSc in Nursing", "duration": 4, "prospects": "Nurse", "program_difficulty": "High"}
-         ]), "High passes in Chemistry, Biology, Physics."),
-        (8, "Nelson Mandela African Institution of Science and Technology", "NM-AIST", "Arusha", "Public", 3000000, "Very High", "Tengeru",
-         "Postgraduate-focused STEM institution.", json.dumps(["Advanced Labs", "Research Centers"]),
-         json.dumps([
-             {"name": "MSc in Data Science", "duration": 2, "prospects": "Data Scientist", "program_difficulty": "Very High"}
-         ]), "Strong Bachelor's in STEM field."),
-        (9, "Muhimbili University of Health and Allied Sciences", "MUHAS", "Dar es Salaam", "Public", 1600000, "High", "Upanga",
-         "Premier health sciences institution.", json.dumps(["Teaching Hospital", "Labs", "Library"]),
-         json.dumps([
-             {"name": "Bachelor of Pharmacy", "duration": 4, "prospects": "Pharmacist", "program_difficulty": "High"},
-             {"name": "Doctor of Dental Surgery", "duration": 5, "prospects": "Dentist", "program_difficulty": "Very High"}
-         ]), "High passes in Chemistry, Biology, Physics."),
-        (10, "Open University of Tanzania", "OUT", "Dar es Salaam", "Public", 1000000, "Low", "Kinondoni",
-         "Offers distance learning programs.", json.dumps(["E-Library", "Online Platforms"]),
-         json.dumps([
-             {"name": "Bachelor of Business Administration (ODL)", "duration": 3, "prospects": "Business Manager", "program_difficulty": "Medium"}
-         ]), "Passes in 4 subjects."),
-        (11, "Tumaini University Makumira", "TUMA", "Arusha", "Private", 1800000, "Medium", "Makumira",
-         "Faith-based university with diverse programs.", json.dumps(["Library", "Hostels", "Chapel"]),
-         json.dumps([
-             {"name": "Bachelor of Education", "duration": 3, "prospects": "Teacher", "program_difficulty": "Medium"}
-         ]), "Minimum of D grades in 4 subjects."),
-        (12, "Catholic University of Health and Allied Sciences", "CUHAS", "Mwanza", "Private", 3500000, "High", "Bugando",
-         "Focuses on health sciences.", json.dumps(["Hospital", "Labs", "Library"]),
-         json.dumps([
-             {"name": "Doctor of Medicine", "duration": 5, "prospects": "Medical Doctor", "program_difficulty": "Very High"}
-         ]), "High passes in Chemistry, Biology, Physics."),
-        (13, "St. Joseph University in Tanzania", "SJUIT", "Dar es Salaam", "Private", 2500000, "Medium", "Mbezi",
-         "Specializes in engineering and health sciences.", json.dumps(["Labs", "Library", "Workshops"]),
-         json.dumps([
-             {"name": "BSc in Civil Engineering", "duration": 4, "prospects": "Civil Engineer", "program_difficulty": "High"}
-         ]), "Minimum of C grades in Math, Physics."),
-        (14, "Teofilo Kisanji University", "TEKU", "Mbeya", "Private", 1700000, "Medium", "Mbeya City",
-         "Offers diverse academic programs.", json.dumps(["Library", "Hostels", "Computer Labs"]),
-         json.dumps([
-             {"name": "Bachelor of Business Administration", "duration": 3, "prospects": "Manager", "program_difficulty": "Medium"}
-         ]), "Minimum of D grades in 4 subjects."),
-        (15, "Muslim University of Morogoro", "MUM", "Morogoro", "Private", 1600000, "Medium", "Morogoro",
-         "Faith-based with focus on arts and sciences.", json.dumps(["Library", "Mosque", "Hostels"]),
-         json.dumps([
-             {"name": "Bachelor of Arts in Education", "duration": 3, "prospects": "Teacher", "program_difficulty": "Medium"}
-         ]), "Minimum of D grades in 4 subjects.")
-    ]
-    c.executemany('''INSERT OR IGNORE INTO universities
-                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', sample_data)
-    conn.commit()
+from compare import build_comparison
+from database import (Database, data_version, read_aggregates, read_comparison_details, read_similar_universities,
+                      read_university_details)
+from facets import BUDGET_STEPS, FacetIndex
+from ingest import IngestBusy, IngestWorker
+from insights import chart_options
+from metrics import METRICS, debug_enabled
+from query import SORT_OPTIONS, Filters, QueryEngine
+from recommend import CRITERIA_LABELS, Recommender
+from search import search_universities
+from snapshot import load_snapshot
+from taxonomy import INTERESTS
 
 # --- Load data from database ---
-@st.cache_data
-def load_university_data():
-    conn = init_db()
-    df = pd.read_sql_query("SELECT * FROM universities", conn)
-    conn.close()
-    df['facilities'] = df['facilities'].apply(json.loads)
-    df['programs'] = df['programs'].apply(json.loads)
-    return df
+@st.cache_resource
+def get_database():
+    return Database()
+
+@st.cache_resource
+def get_ingest_worker():
+    return IngestWorker(get_database())
+
+# Every loader is keyed on the database's data version (the latest sync id), so an ingest in
+# any process is picked up on the next rerun without clearing caches; max_entries lets the
+# superseded version age out.
+def current_data_version():
+    # One indexed max() per rerun: this is the cross-process change check.
+    with get_database().read() as conn:
+        return data_version(conn)
+
+@METRICS.cached(st.cache_resource(max_entries=2))
+def load_snapshot_tables(version):
+    # Catalog and interest counts from the memory-mapped Arrow snapshot ingest writes per data
+    # version; a worker that finds none reads SQLite once and writes it for the others.
+    return load_snapshot(get_database(), version)
+
+def load_catalog(version):
+    # Shared, read-only columnar catalog: one copy per data version for every session, never pickled per rerun.
+    return load_snapshot_tables(version)[0]
+
+@METRICS.cached(st.cache_data(max_entries=256))
+def load_university_details(version, university_id):
+    # Full record for the details view; list views only hold the catalog summary.
+    with get_database().read() as conn:
+        return read_university_details(conn, university_id)
+
+@METRICS.cached(st.cache_data(max_entries=256))
+def load_similar_universities(version, university_id):
+    # Neighbour lists are precomputed at ingest, so this is a single indexed read.
+    with get_database().read() as conn:
+        return read_similar_universities(conn, university_id)
+
+@METRICS.cached(st.cache_data(max_entries=16))
+def load_comparison(version, university_ids):
+    # Table, overlap matrices and closest pairs in one vectorized pass; the selection is a tuple of ids.
+    with get_database().read() as conn:
+        details, facilities = read_comparison_details(conn, university_ids)
+    return build_comparison(load_catalog(version), university_ids, details, facilities)
+
+def load_interest_data(version):
+    return load_snapshot_tables(version)[1]
+
+@METRICS.cached(st.cache_data(max_entries=512))
+def search_university_ids(version, text):
+    with get_database().read() as conn:
+        return search_universities(conn, text)
+
+@METRICS.cached(st.cache_resource(max_entries=2))
+def load_query_engine(version):
+    return QueryEngine(load_catalog(version).universities, version, search=partial(search_university_ids, version))
+
+@METRICS.cached(st.cache_resource(max_entries=2))
+def load_facet_index(version):
+    return FacetIndex(load_catalog(version), load_interest_data(version), version,
+                      search=partial(search_university_ids, version))
+
+@METRICS.cached(st.cache_resource(max_entries=2))
+def load_recommender(version):
+    return Recommender(load_catalog(version), load_interest_data(version), version)
+
+@METRICS.cached(st.cache_data(max_entries=2))
+def load_insight_charts(version):
+    # Chart payloads come from the aggregates materialized at ingest, so they only change with the data.
+    with get_database().read() as conn:
+        return chart_options(read_aggregates(conn))
+
+# --- Background data updates ---
+INGEST_POLL_SECONDS = 2
+
+@st.fragment(run_every=INGEST_POLL_SECONDS)
+def ingest_progress():
+    # Polls only this fragment while a job runs; the rest of the page stays interactive.
+    job = get_ingest_worker().status()
+    if job is None or job['status'] != 'running':
+        st.rerun()
+    st.info(f"⏳ Updating data in the background: {job['pages']} pages, {job['rows']} universities so far. "
+            f"{job['message']}. You can keep browsing the current listings.")
+
+def ingest_status():
+    job = get_ingest_worker().status()
+    if job is None:
+        return
+    if job['status'] == 'running':
+        ingest_progress()
+    elif job['id'] == st.session_state.get('ingest_job'):
+        # Report the outcome once, to the session that started the job.
+        del st.session_state['ingest_job']
+        notify = {'succeeded': st.success, 'fallback': st.warning}.get(job['status'], st.error)
+        notify(job['message'])
+
+# --- Live filter counts ---
+def option_index(options, value):
+    # Count labels change a widget's identity, so each filter is re-seeded from its stored choice.
+    return options.index(value) if value in options else 0
+
+def counted(facets, choices, facet, any_label=None, fmt="{}"):
+    # format_func labelling each option with the matches it would leave, given the other choices.
+    counts = facets.counts(choices, facet)
+    total = facets.count(dict(choices, **{facet: None}))
+    def label(option):
+        return f"{fmt.format(option)} ({total if option == any_label else counts.get(option, 0):,})"
+    return label
+
+# --- Card rendering ---
+PAGE_SIZES = [12, 24, 48, 96]
+
+def render_cards(unis):
+    # HTML for every card on the page, built in one pass over the visible slice only.
+    esc = html.escape
+    return [
+        f"""<div class='st-card'>
+            <h3 class='text-xl font-bold'>{esc(name)} ({esc(acronym)})</h3>
+            <p class='text-sm text-gray-500'>{esc(region)}</p>
+            <div class='my-4'>
+                <span class='st-tag bg-blue-100 text-blue-800'>{esc(type_)}</span>
+                <span class='st-tag bg-green-100 text-green-800'>{esc(difficulty)} Difficulty</span>
+            </div>
+            <p class='text-gray-600 text-sm flex-grow'>{esc(summary)}</p>
+        </div>"""
+        for name, acronym, region, type_, difficulty, summary in zip(
+            unis['name'], unis['acronym'], unis['region'], unis['type'], unis['difficulty'], unis['summary'])
+    ]
+
+# --- Browse sections ---
+BROWSE_SECTIONS = ["Explore Universities", "Compare", "Data Insights"]
+
+def toggle_comparison(uni_id):
+    # Button callback: runs before the fragment rerun, so the card redraws with the new state.
+    if uni_id in st.session_state.comparison_list:
+        st.session_state.comparison_list.remove(uni_id)
+    else:
+        st.session_state.comparison_list.append(uni_id)
+
+@st.fragment
+def explore_section(version):
+    # Filter changes and card actions rerun only this section; "View Details" changes view with a full rerun.
+    with METRICS.fragment('explore'):
+        df = load_catalog(version).universities
+        engine = load_query_engine(version)
+        st.header("Explore Universities")
+        st.markdown("Filter or search for universities and programs.")
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            st.subheader("Filter Your Search")
+            st.session_state.search_text = st.text_input("Search by Name/Program", value=st.session_state.search_text, placeholder="e.g., UDSM, Computer Science", key="search_input")
+            # Each option shows how many results it would leave given the other filters, read from
+            # the widgets' own state so every count reflects this rerun's choices.
+            facets = load_facet_index(version)
+            regions = ['All Regions'] + engine.regions
+            types = ['All Types', 'Public', 'Private']
+            region = st.session_state.get('region_select', st.session_state.region)
+            type_ = st.session_state.get('type_select', st.session_state.type_)
+            choices = {
+                'search': st.session_state.search_text,
+                'region': None if region == "All Regions" else region,
+                'type': None if type_ == "All Types" else type_,
+                'max_fees': st.session_state.get('fees_slider', st.session_state.max_fees),
+            }
+            st.session_state.region = st.selectbox("Region", regions, index=option_index(regions, region), key="region_select",
+                                                   format_func=counted(facets, choices, 'region', "All Regions"))
+            st.session_state.type_ = st.selectbox("University Type", types, index=option_index(types, type_), key="type_select",
+                                                  format_func=counted(facets, choices, 'type', "All Types"))
+            st.session_state.max_fees = st.select_slider("Max Annual Fees (TZS)", BUDGET_STEPS, value=choices['max_fees'], key="fees_slider",
+                                                         format_func=counted(facets, choices, 'max_fees', fmt="{:,}"))
+            st.session_state.sort_by = st.selectbox("Sort by", SORT_OPTIONS, index=0, key="sort_by_select")
+
+            if st.button("Reset Filters", type="secondary", key="reset_filters"):
+                st.session_state.search_text = ""
+                st.session_state.region = "All Regions"
+                st.session_state.type_ = "All Types"
+                st.session_state.max_fees = 10000000
+                st.session_state.sort_by = "Relevance"
+                for key in ("search_input", "region_select", "type_select", "fees_slider", "sort_by_select"):
+                    st.session_state.pop(key, None)
+                st.rerun()
+
+        filters = Filters(
+            search=st.session_state.search_text,
+            region=None if st.session_state.region == "All Regions" else st.session_state.region,
+            type=None if st.session_state.type_ == "All Types" else st.session_state.type_,
+            max_fees=st.session_state.max_fees,
+            sort_by=st.session_state.sort_by,
+        )
+        positions = engine.positions(filters)
+        METRICS.lap('explore.filter')
+
+        with col2:
+            col_count, col_page_size, col_page = st.columns([2, 1, 1])
+            with col_page_size:
+                page_size = st.selectbox("Per page", PAGE_SIZES, index=0, key="page_size_select")
+            page_count = max(1, -(-len(positions) // page_size))
+            # New filters or page size start again from the first page.
+            # The page widget's state is dropped whenever Explore is not shown, so check it too.
+            if st.session_state.get('explore_page_key') != (filters, page_size) or 'explore_page' not in st.session_state:
+                st.session_state.explore_page_key = (filters, page_size)
+                st.session_state.explore_page = 1
+            st.session_state.explore_page = min(st.session_state.explore_page, page_count)
+            with col_page:
+                page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key="explore_page")
+            start = (page - 1) * page_size
+            page_df = df.iloc[positions[start:start + page_size]]
+            with col_count:
+                showing = f" Showing {start + 1}–{start + len(page_df)}." if len(page_df) < len(positions) else ""
+                st.markdown(f"<p class='text-sm text-gray-600'><strong>{len(positions)}</strong> results found.{showing}</p>", unsafe_allow_html=True)
+                st.markdown(f"<p class='text-sm text-gray-600'><strong>{len(st.session_state.comparison_list)}</strong> selected for comparison.</p>", unsafe_allow_html=True)
+            if page_df.empty:
+                st.info("No universities match your filters. Try adjusting criteria.")
+
+            num_cols = 3
+            cards = render_cards(page_df)
+            page_ids = page_df['id'].tolist()
+            comparing = set(st.session_state.comparison_list)
+            for row_start in range(0, len(page_df), num_cols):
+                st.markdown("<div class='card-grid'>" + "".join(cards[row_start:row_start + num_cols]) + "</div>", unsafe_allow_html=True)
+                cols = st.columns(num_cols)
+                for col_idx, uni_id in enumerate(page_ids[row_start:row_start + num_cols]):
+                    with cols[col_idx]:
+                        st.markdown("<div class='button-container'>", unsafe_allow_html=True)
+                        if st.button("View Details", key=f"view_{uni_id}", type="secondary"):
+                            st.session_state.selected_uni_id = uni_id
+                            st.session_state.current_view = "details"
+                            st.rerun()
+                        is_comparing = uni_id in comparing
+                        st.button("Remove" if is_comparing else "Add to Compare", key=f"compare_{uni_id}",
+                                  type="primary" if not is_comparing else "secondary", on_click=toggle_comparison, args=(uni_id,))
+                        st.markdown("</div>", unsafe_allow_html=True)
+        METRICS.lap('explore.cards')
+
+DIFFERENCE_STYLE = "background-color: #fef3c7"
+
+def highlight_differences(comparison):
+    # Shade the feature rows on which the compared institutions do not all agree.
+    return comparison.table.style.apply(
+        lambda row: [DIFFERENCE_STYLE if comparison.differing[row.name] else ""] * len(row), axis=1)
+
+def compare_section(version):
+    st.header("Compare Universities")
+    st.markdown("Add universities with \"Add to Compare\" in Explore, or compare every institution in a region.")
+    catalog = load_catalog(version)
+    col_region, col_add = st.columns([3, 1])
+    with col_region:
+        region = st.selectbox("Region", catalog.universities['region'].cat.categories.tolist(), key="compare_region")
+    with col_add:
+        st.markdown("<div style='height: 1.75rem'></div>", unsafe_allow_html=True)
+        if st.button("Compare all in region", use_container_width=True):
+            st.session_state.comparison_list = catalog.universities.loc[
+                catalog.universities['region'] == region, 'id'].tolist()
+
+    if not st.session_state.comparison_list:
+        st.info("No universities selected for comparison.")
+    else:
+        comparison = load_comparison(version, tuple(st.session_state.comparison_list))
+        st.caption(f"Comparing {comparison.table.shape[1]} institutions. Highlighted rows differ between them.")
+        st.dataframe(highlight_differences(comparison), use_container_width=True)
+
+        st.subheader("Program and Facility Overlap")
+        if comparison.program_overlap is not None:
+            col_programs, col_facilities = st.columns(2)
+            with col_programs:
+                st.markdown("**Shared programs**")
+                st.dataframe(comparison.program_overlap, use_container_width=True)
+            with col_facilities:
+                st.markdown("**Shared facilities**")
+                st.dataframe(comparison.facility_overlap, use_container_width=True)
+            st.caption("Each cell counts what two institutions have in common; the diagonal is each one's own total.")
+        st.markdown("**Most similar pairs**, by the share of their combined programs they both offer")
+        st.dataframe(comparison.closest, use_container_width=True, hide_index=True)
+
+        if st.button("Clear Comparison List", type="secondary"):
+            st.session_state.comparison_list = []
+            st.rerun()
+    METRICS.lap('compare')
+
+def insights_section(version):
+    st.header("University Data Insights")
+    st.write("Overview of the university landscape in Tanzania.")
+
+    charts = load_insight_charts(version)
+    percentiles = charts['fee_percentiles']
+    if percentiles:
+        fee_cols = st.columns(3)
+        fee_cols[0].metric("Median Fees", f"{percentiles['p50']:,.0f} TZS")
+        fee_cols[1].metric("Middle 50% of Fees", f"{percentiles['p25']:,.0f} – {percentiles['p75']:,.0f}")
+        fee_cols[2].metric("90th Percentile Fees", f"{percentiles['p90']:,.0f} TZS")
+
+    col_chart1, col_chart2 = st.columns(2)
+    with col_chart1:
+        st.subheader("Universities by Region")
+        st_echarts(options=charts['region'], height="400px", key="region_chart")
+
+    with col_chart2:
+        st.subheader("Distribution of University Types")
+        st_echarts(options=charts['type'], height="450px", key="type_chart")
+
+    st.subheader("University Difficulty Distribution")
+    st_echarts(options=charts['difficulty'], height="400px", key="difficulty_chart")
+
+    col_chart3, col_chart4 = st.columns(2)
+    with col_chart3:
+        st.subheader("Fee Distribution")
+        st_echarts(options=charts['fee_histogram'], height="400px", key="fee_histogram_chart")
+
+    with col_chart4:
+        st.subheader("Fees by University Type")
+        st_echarts(options=charts['fee_by_type'], height="400px", key="fee_type_chart")
+
+    st.subheader("Programs by Interest Area")
+    st_echarts(options=charts['interest'], height="400px", key="interest_chart")
+    METRICS.lap('insights')
 
 # --- Streamlit app ---
 def main():
@@ -237,18 +357,15 @@ def main():
         .btn-secondary:hover { background-color: #cbd5e1; }
         .stButton>button { width: 100%; }
         .button-container { display: flex; gap: 0.5rem; margin-top: auto; }
+        .card-grid { display: grid; grid-template-columns: repeat(3, minmax(0, 1fr)); gap: 1rem; margin-top: 1rem; }
         .stDataFrame { overflow-x: auto; }
-        .stTabs [data-baseweb="tab-list"] { gap: 16px; justify-content: center; }
-        .stTabs [data-baseweb="tab"] { height: 50px; white-space: nowrap; border-bottom: 1px solid #ddd;
-            background-color: #f8fafc; border-radius: 0.5rem 0.5rem 0 0; padding: 10px 20px; transition: all 0.2s ease-in-out; }
-        .stTabs [aria-selected="true"] { border-bottom-color: #2563eb !important; color: #2563eb !important;
-            background-color: white !important; box-shadow: 0 2px 4px rgba(0,0,0,0.05); }
     </style>
     """, unsafe_allow_html=True)
     
     # --- Header ---
     st.markdown("<h1 class='st-title'>Stack<span>University</span></h1>", unsafe_allow_html=True)
     st.write("Your guide to Tanzanian universities. Discover, compare, and make informed decisions.")
+    METRICS.lap('page_setup')
     
     # --- Initialize Session State ---
     if 'search_text' not in st.session_state:
@@ -260,29 +377,36 @@ def main():
     if 'max_fees' not in st.session_state:
         st.session_state.max_fees = 10000000
     if 'sort_by' not in st.session_state:
-        st.session_state.sort_by = "Name (A-Z)"
+        st.session_state.sort_by = "Relevance"
     if 'comparison_list' not in st.session_state:
         st.session_state.comparison_list = []
-    if 'selected_uni' not in st.session_state:
-        st.session_state.selected_uni = None
+    # Session state holds ids only; records are looked up per data version when shown.
+    if 'selected_uni_id' not in st.session_state:
+        st.session_state.selected_uni_id = None
     if 'current_view' not in st.session_state:
         st.session_state.current_view = "home"
     if 'wizard_step' not in st.session_state:
         st.session_state.wizard_step = 0
     if 'wizard_preferences' not in st.session_state:
         st.session_state.wizard_preferences = {}
+    METRICS.lap('session_state')
 
     # --- Scrape/Load Data Button ---
     st.markdown("---")
     st.info("💡 **New data available!** Click 'Update Data' to refresh university listings from TCU.")
-    if st.button("Update Data (Scrape from TCU)", help="Fetches the latest university list.", type="primary"):
-        with st.spinner("Scraping university data..."):
-            scrape_university_data()
-            st.cache_data.clear()
-            st.rerun()
+    if st.button("Update Data (Scrape from TCU)", help="Fetches the latest university list in the background.", type="primary"):
+        try:
+            st.session_state.ingest_job = get_ingest_worker().start()
+        except IngestBusy as e:
+            st.warning(f"{e} The listings will refresh when it finishes.")
+    ingest_status()
     st.markdown("---")
+    METRICS.lap('data_update')
     
-    df = load_university_data()
+    version = current_data_version()
+    df = load_catalog(version).universities
+    engine = load_query_engine(version)
+    METRICS.lap('data_load')
 
     # --- Main Navigation ---
     if st.session_state.current_view == "home":
@@ -304,6 +428,7 @@ def main():
             if st.button("Explore All Universities", key="explore_all_btn", type="secondary"):
                 st.session_state.current_view = "explore"
                 st.rerun()
+        METRICS.lap('home')
 
     elif st.session_state.current_view == "wizard":
         st.header("Find Your Best Fit")
@@ -320,9 +445,12 @@ def main():
         
         st.info(f"Step {st.session_state.wizard_step + 1} of {len(wizard_steps)}: {wizard_steps[st.session_state.wizard_step]}")
 
+        prefs = st.session_state.wizard_preferences
+        facets = load_facet_index(version)
         if st.session_state.wizard_step == 0:
-            regions = ['Any'] + sorted(df['region'].unique().tolist())
-            pref_region = st.selectbox(wizard_steps[0], regions, key="wiz_region_select")
+            regions = ['Any'] + engine.regions
+            pref_region = st.selectbox(wizard_steps[0], regions, index=option_index(regions, prefs.get('region')),
+                                       key="wiz_region_select", format_func=counted(facets, prefs, 'region', 'Any'))
             if pref_region != 'Any':
                 st.session_state.wizard_preferences['region'] = pref_region
             else:
@@ -330,20 +458,24 @@ def main():
 
         elif st.session_state.wizard_step == 1:
             uni_types = ['Any', 'Public', 'Private']
-            pref_type = st.radio(wizard_steps[1], uni_types, key="wiz_type_radio")
+            pref_type = st.radio(wizard_steps[1], uni_types, index=option_index(uni_types, prefs.get('type')),
+                                 key="wiz_type_radio", format_func=counted(facets, prefs, 'type', 'Any'))
             if pref_type != 'Any':
                 st.session_state.wizard_preferences['type'] = pref_type
             else:
                 st.session_state.wizard_preferences.pop('type', None)
 
         elif st.session_state.wizard_step == 2:
-            pref_fees = st.slider(wizard_steps[2], 1000000, 10000000, 3000000, 500000, key="wiz_fees_slider")
+            pref_fees = st.select_slider(wizard_steps[2], BUDGET_STEPS, value=prefs.get('max_fees', 3000000),
+                                         key="wiz_fees_slider", format_func=counted(facets, prefs, 'max_fees', fmt="{:,}"))
             st.session_state.wizard_preferences['max_fees'] = pref_fees
             st.write(f"You selected: Up to {pref_fees:,} TZS")
 
         elif st.session_state.wizard_step == 3:
-            academic_interests = ['Any', 'STEM', 'Humanities', 'Business', 'Health Sciences', 'Agriculture', 'Law', 'Education']
-            pref_interest = st.selectbox(wizard_steps[3], academic_interests, key="wiz_interest_select")
+            academic_interests = ['Any'] + INTERESTS
+            pref_interest = st.selectbox(wizard_steps[3], academic_interests,
+                                         index=option_index(academic_interests, prefs.get('academic_interest')),
+                                         key="wiz_interest_select", format_func=counted(facets, prefs, 'academic_interest', 'Any'))
             if pref_interest != 'Any':
                 st.session_state.wizard_preferences['academic_interest'] = pref_interest
             else:
@@ -351,12 +483,16 @@ def main():
 
         elif st.session_state.wizard_step == 4:
             difficulty_levels = ['Any', 'Low', 'Medium', 'High', 'Very High']
-            pref_difficulty = st.radio(wizard_steps[4], difficulty_levels, key="wiz_difficulty_radio")
+            pref_difficulty = st.radio(wizard_steps[4], difficulty_levels, index=option_index(difficulty_levels, prefs.get('difficulty')),
+                                       key="wiz_difficulty_radio", format_func=counted(facets, prefs, 'difficulty', 'Any'))
             if pref_difficulty != 'Any':
                 st.session_state.wizard_preferences['difficulty'] = pref_difficulty
             else:
                 st.session_state.wizard_preferences.pop('difficulty', None)
 
+        if st.session_state.wizard_step < len(wizard_steps) - 1:
+            st.caption(f"{facets.count(prefs):,} universities match all your answers so far.")
+
         col_wiz_nav1, col_wiz_nav2 = st.columns(2)
         with col_wiz_nav1:
             if st.session_state.wizard_step > 0:
@@ -372,49 +508,45 @@ def main():
                 st.markdown("---")
                 st.subheader("Your Recommendations:")
                 
-                reco_df = df.copy()
                 prefs = st.session_state.wizard_preferences
-
-                if 'region' in prefs:
-                    reco_df = reco_df[reco_df['region'] == prefs['region']]
-                if 'type' in prefs:
-                    reco_df = reco_df[reco_df['type'] == prefs['type']]
-                if 'max_fees' in prefs:
-                    reco_df = reco_df[reco_df['avg_fees'] <= prefs['max_fees']]
-                if 'difficulty' in prefs:
-                    reco_df = reco_df[reco_df['difficulty'] == prefs['difficulty']]
-                
-                if 'academic_interest' in prefs and prefs['academic_interest'] != 'Any':
-                    interest_lower = prefs['academic_interest'].lower()
-                    reco_df = reco_df[
-                        reco_df['programs'].apply(lambda x: any(interest_lower in p['name'].lower() for p in x if isinstance(p, dict) and 'name' in p))
-                    ]
+                recommender = load_recommender(version)
+                positions, scores, misses, exact = recommender.top_k(prefs)
                 
-                if reco_df.empty:
+                if len(positions) == 0:
                     st.warning("No universities match your criteria. Try adjusting preferences.")
                 else:
-                    st.write(f"Found {len(reco_df)} recommendations:")
-                    for _, uni in reco_df.sort_values('difficulty').head(5).iterrows():
+                    if exact:
+                        st.write(f"Found {exact} universities matching all your preferences. Top {min(exact, len(positions))}:")
+                    else:
+                        st.info("No university matches every preference. These are the closest fits:")
+                    for pos, score, missed in zip(positions, scores, misses):
+                        uni = df.iloc[pos]
+                        differs = f"<p class='text-sm text-gray-500'>Differs on: {', '.join(CRITERIA_LABELS[m] for m in missed)}</p>" if missed else ""
+                        esc = html.escape
                         with st.container(border=True):
                             st.markdown(f"""
-                            <h3 class='text-xl font-bold'>{uni['name']} ({uni['acronym']})</h3>
-                            <p class='text-sm text-gray-500'>{uni['region']} | {uni['type']}</p>
+                            <h3 class='text-xl font-bold'>{esc(uni['name'])} ({esc(uni['acronym'])})</h3>
+                            <p class='text-sm text-gray-500'>{esc(uni['region'])} | {esc(uni['type'])}</p>
                             <div class='my-2'>
-                                <span class='st-tag bg-green-100 text-green-800'>{uni['difficulty']} Difficulty</span>
+                                <span class='st-tag bg-blue-100 text-blue-800'>{score:.0%} Match</span>
+                                <span class='st-tag bg-green-100 text-green-800'>{esc(uni['difficulty'])} Difficulty</span>
                             </div>
-                            <p class='text-gray-600 text-sm'>{uni['description']}</p>
+                            {differs}
+                            <p class='text-gray-600 text-sm'>{esc(uni['summary'])}</p>
                             """, unsafe_allow_html=True)
                             if st.button("View Details", key=f"reco_view_{uni['id']}", type="secondary"):
-                                st.session_state.selected_uni = uni
+                                st.session_state.selected_uni_id = int(uni['id'])
                                 st.session_state.current_view = "details"
                                 st.rerun()
 
         if st.button("Back to Home", key="wiz_back_home_btn", type="secondary"):
             st.session_state.current_view = "home"
             st.rerun()
+        METRICS.lap('wizard')
 
     elif st.session_state.current_view == "details":
-        uni = st.session_state.selected_uni
+        uni_id = st.session_state.selected_uni_id
+        uni = None if uni_id is None else load_university_details(version, uni_id)
         if uni is None:
             st.warning("No university selected. Please go back to explore.")
             if st.button("Back to Explore", key="details_fallback_btn", type="secondary"):
@@ -422,17 +554,19 @@ def main():
                 st.rerun()
             return
             
+        # Descriptions, facilities and programs come from scraped pages: escape them like the cards.
+        esc = html.escape
         st.header(f"{uni['name']} Details")
         st.markdown(f"""
-            <p class='text-gray-500'>{uni['location']}, {uni['region']}</p>
+            <p class='text-gray-500'>{esc(uni['location'] or '')}, {esc(uni['region'] or '')}</p>
             <div class='grid grid-cols-1 sm:grid-cols-3 gap-4 text-center my-6'>
                 <div class='bg-gray-50 p-3 rounded-lg'>
                     <div class='text-sm text-gray-500'>Type</div>
-                    <div class='font-semibold'>{uni['type']}</div>
+                    <div class='font-semibold'>{esc(uni['type'] or '')}</div>
                 </div>
                 <div class='bg-gray-50 p-3 rounded-lg'>
                     <div class='text-sm text-gray-500'>Difficulty</div>
-                    <div class='font-semibold'>{uni['difficulty']}</div>
+                    <div class='font-semibold'>{esc(uni['difficulty'] or '')}</div>
                 </div>
                 <div class='bg-gray-50 p-3 rounded-lg'>
                     <div class='text-sm text-gray-500'>Avg. Fees</div>
@@ -440,7 +574,7 @@ def main():
                 </div>
             </div>
             <h4 class='text-xl font-semibold'>About</h4>
-            <p class='text-gray-600'>{uni['description']}</p>
+            <p class='text-gray-600'>{esc(uni['description'] or '')}</p>
             """, unsafe_allow_html=True)
         
         with st.expander("Admission Requirements", expanded=True):
@@ -450,194 +584,84 @@ def main():
         with st.expander("Facilities", expanded=True):
             st.markdown("<div class='flex flex-wrap gap-2'>", unsafe_allow_html=True)
             for f in uni['facilities']:
-                st.markdown(f"<span class='st-tag bg-gray-100 text-gray-700'>{f}</span>", unsafe_allow_html=True)
+                st.markdown(f"<span class='st-tag bg-gray-100 text-gray-700'>{esc(f)}</span>", unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
 
         with st.expander("Programs Offered", expanded=True):
             if isinstance(uni['programs'], list) and uni['programs']:
                 for p in uni['programs']:
                     if isinstance(p, dict) and 'name' in p and 'duration' in p and 'prospects' in p and 'program_difficulty' in p:
-                        st.markdown(f"""
-                            <div class='border-t border-gray-200 pt-3 mt-3'>
-                                <h5 class='font-semibold'>{p['name']}</h5>
-                                <p class='text-sm text-gray-600'>Duration: {p['duration']} years | Difficulty: {p['program_difficulty']}</p>
-                                <p class='text-sm text-gray-700'>Career Prospects: {p['prospects']}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
+                        # Detail pages do not always give a duration, difficulty or prospects; leave out what is missing.
+                        facts = [f"Duration: {p['duration']} years" if p['duration'] else None,
+                                 f"Difficulty: {esc(p['program_difficulty'])}" if p['program_difficulty'] else None]
+                        lines = [f"<h5 class='font-semibold'>{esc(p['name'])}</h5>"]
+                        if any(facts):
+                            lines.append(f"<p class='text-sm text-gray-600'>{' | '.join(fact for fact in facts if fact)}</p>")
+                        if p['prospects']:
+                            lines.append(f"<p class='text-sm text-gray-700'>Career Prospects: {esc(p['prospects'])}</p>")
+                        st.markdown(f"<div class='border-t border-gray-200 pt-3 mt-3'>{''.join(lines)}</div>",
+                                    unsafe_allow_html=True)
                     else:
                         st.warning(f"Malformed program data for {uni['name']}: {p}")
             else:
                 st.info(f"No program details available for {uni['name']}.")
 
+        similar = load_similar_universities(version, uni_id)
+        if similar:
+            st.subheader("Similar Institutions")
+            st.caption("Closest by programs, facilities, type, fee band and difficulty.")
+            cols = st.columns(3)
+            for i, other in enumerate(similar):
+                with cols[i % 3]:
+                    st.markdown(f"""
+                        <div class='st-card'>
+                            <h3 class='text-lg font-bold'>{html.escape(other['name'])} ({html.escape(other['acronym'] or '')})</h3>
+                            <p class='text-sm text-gray-500'>{html.escape(other['region'] or '')} | {html.escape(other['type'] or '')}</p>
+                            <span class='st-tag bg-blue-100 text-blue-800'>{other['score']:.0%} Similar</span>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    if st.button("View Details", key=f"similar_view_{other['id']}", type="secondary"):
+                        st.session_state.selected_uni_id = other['id']
+                        st.rerun()
+
         if st.button("← Back to Explore", key="back_to_explore_btn", type="secondary"):
-            st.session_state.selected_uni = None
+            st.session_state.selected_uni_id = None
             st.session_state.current_view = "explore"
             st.rerun()
+        METRICS.lap('details')
 
     else:
-        tab1, tab2, tab3 = st.tabs(["Explore Universities", f"Compare ({len(st.session_state.comparison_list)})", "Data Insights"])
-        
-        with tab1:
-            st.header("Explore Universities")
-            st.markdown("Filter or search for universities and programs.")
-            col1, col2 = st.columns([1, 3])
-            with col1:
-                st.subheader("Filter Your Search")
-                st.session_state.search_text = st.text_input("Search by Name/Program", value=st.session_state.search_text, placeholder="e.g., UDSM, Computer Science", key="search_input")
-                st.session_state.region = st.selectbox("Region", ['All Regions'] + sorted(df['region'].unique().tolist()), index=0, key="region_select")
-                st.session_state.type_ = st.selectbox("University Type", ['All Types', 'Public', 'Private'], index=0, key="type_select")
-                st.session_state.max_fees = st.slider("Max Annual Fees (TZS)", 1000000, 10000000, 10000000, 500000, key="fees_slider")
-                st.session_state.sort_by = st.selectbox("Sort by", ["Name (A-Z)", "Name (Z-A)", "Fees (Low-High)", "Fees (High-Low)"], index=0, key="sort_by_select")
-                
-                if st.button("Reset Filters", type="secondary", key="reset_filters"):
-                    st.session_state.search_text = ""
-                    st.session_state.region = "All Regions"
-                    st.session_state.type_ = "All Types"
-                    st.session_state.max_fees = 10000000
-                    st.session_state.sort_by = "Name (A-Z)"
-                    st.rerun()
-            
-            filtered_df = df.copy()
-            if st.session_state.search_text:
-                search_text_lower = st.session_state.search_text.lower()
-                filtered_df = filtered_df[
-                    filtered_df['name'].str.lower().str.contains(search_text_lower, na=False) |
-                    filtered_df['programs'].apply(lambda x: any(search_text_lower in p['name'].lower() for p in x if isinstance(p, dict) and 'name' in p))
-                ]
-            if st.session_state.region != "All Regions":
-                filtered_df = filtered_df[filtered_df['region'] == st.session_state.region]
-            if st.session_state.type_ != "All Types":
-                filtered_df = filtered_df[filtered_df['type'] == st.session_state.type_]
-            filtered_df = filtered_df[filtered_df['avg_fees'] <= st.session_state.max_fees]
-            
-            sort_key = {
-                "Name (A-Z)": "name",
-                "Name (Z-A)": "name",
-                "Fees (Low-High)": "avg_fees",
-                "Fees (High-Low)": "avg_fees"
-            }[st.session_state.sort_by]
-            ascending = st.session_state.sort_by in ["Name (A-Z)", "Fees (Low-High)"]
-            filtered_df = filtered_df.sort_values(sort_key, ascending=ascending)
-            
-            with col2:
-                st.markdown(f"<p class='text-sm text-gray-600'><strong>{len(filtered_df)}</strong> results found.</p>", unsafe_allow_html=True)
-                if filtered_df.empty:
-                    st.info("No universities match your filters. Try adjusting criteria.")
-                
-                num_cols = 3
-                cols = st.columns(num_cols)
-                col_idx = 0
-                for _, uni in filtered_df.iterrows():
-                    with cols[col_idx]:
-                        with st.container(border=True):
-                            st.markdown(f"""
-                            <h3 class='text-xl font-bold'>{uni['name']} ({uni['acronym']})</h3>
-                            <p class='text-sm text-gray-500'>{uni['region']}</p>
-                            <div class='my-4'>
-                                <span class='st-tag bg-blue-100 text-blue-800'>{uni['type']}</span>
-                                <span class='st-tag bg-green-100 text-green-800'>{uni['difficulty']} Difficulty</span>
-                            </div>
-                            <p class='text-gray-600 text-sm flex-grow'>{uni['description']}</p>
-                            """, unsafe_allow_html=True)
-                            
-                            with st.container():
-                                st.markdown("<div class='button-container'>", unsafe_allow_html=True)
-                                if st.button("View Details", key=f"view_{uni['id']}", type="secondary"):
-                                    st.write(f"View Details clicked for {uni['name']}")
-                                    st.session_state.selected_uni = uni
-                                    st.session_state.current_view = "details"
-                                    st.rerun()
-                                is_comparing = uni['id'] in st.session_state.comparison_list
-                                if st.button("Remove" if is_comparing else "Add to Compare", key=f"compare_{uni['id']}", type="primary" if not is_comparing else "secondary"):
-                                    st.write(f"{'Remove' if is_comparing else 'Add to Compare'} clicked for {uni['name']}")
-                                    if is_comparing:
-                                        st.session_state.comparison_list.remove(uni['id'])
-                                    elif len(st.session_state.comparison_list) < 4:
-                                        st.session_state.comparison_list.append(uni['id'])
-                                    else:
-                                        st.error("You can only compare up to 4 universities.")
-                                    st.rerun()
-                                st.markdown("</div>", unsafe_allow_html=True)
-                    col_idx = (col_idx + 1) % num_cols
-        
-        with tab2:
-            st.header("Compare Universities")
-            st.markdown("Select up to 4 universities to compare.")
-            if not st.session_state.comparison_list:
-                st.info("No universities selected for comparison.")
-            else:
-                compare_df = df[df['id'].isin(st.session_state.comparison_list)]
-                
-                feature_names = ["Region", "Type", "Avg. Annual Fees", "Difficulty", "Number of Programs", "Admission Requirements", "Facilities"]
-                
-                comparison_data = []
-                for feature in feature_names:
-                    row_data = {"Feature": feature}
-                    for _, uni_row in compare_df.iterrows():
-                        if feature == "Avg. Annual Fees":
-                            row_data[uni_row['name']] = f"{uni_row['avg_fees']:,} TZS"
-                        elif feature == "Number of Programs":
-                            row_data[uni_row['name']] = len(uni_row['programs'])
-                        elif feature == "Facilities":
-                            row_data[uni_row['name']] = ", ".join(uni_row['facilities'])
-                        elif feature == "Admission Requirements":
-                            row_data[uni_row['name']] = uni_row.get('admission_requirements', 'N/A')
-                        else:
-                            row_data[uni_row['name']] = uni_row.get(feature.replace(" ", "_").lower(), 'N/A')
-                    comparison_data.append(row_data)
-
-                st.dataframe(pd.DataFrame(comparison_data).set_index("Feature"), use_container_width=True)
-                
-                if st.button("Clear Comparison List", type="secondary"):
-                    st.session_state.comparison_list = []
-                    st.rerun()
-        
-        with tab3:
-            st.header("University Data Insights")
-            st.write("Overview of the university landscape in Tanzania.")
-            
-            col_chart1, col_chart2 = st.columns(2)
-            with col_chart1:
-                st.subheader("Universities by Region")
-                region_counts = df['region'].value_counts().to_dict()
-                region_options = {
-                    "tooltip": {"trigger": "axis", "axisPointer": {"type": "shadow"}},
-                    "xAxis": {"type": "category", "data": list(region_counts.keys()), "axisLabel": {"interval": 0, "rotate": 45}},
-                    "yAxis": {"type": "value", "name": "Number of Universities"},
-                    "series": [{"data": list(region_counts.values()), "type": "bar", "itemStyle": {"color": "#3b82f6"}}]
-                }
-                st_echarts(options=region_options, height="400px", key="region_chart")
-            
-            with col_chart2:
-                st.subheader("Distribution of University Types")
-                type_counts = df['type'].value_counts().to_dict()
-                pie_colors = {"Public": "#3b82f6", "Private": "#22c55e"}
-                type_options = {
-                    "tooltip": {"trigger": "item", "formatter": "{a} <br/>{b}: {c} ({d}%)"},
-                    "legend": {"bottom": "0%", "left": "center", "data": list(type_counts.keys())},
-                    "series": [{
-                        "name": "University Type",
-                        "type": "pie",
-                        "radius": ["40%", "70%"],
-                        "avoidLabelOverlap": False,
-                        "label": {"show": False, "position": "center"},
-                        "emphasis": {"label": {"show": True, "fontSize": "20", "fontWeight": "bold"}},
-                        "labelLine": {"show": False},
-                        "data": [{"value": v, "name": k, "itemStyle": {"color": pie_colors.get(k, '#94a3b8')}} for k, v in type_counts.items()],
-                    }]
-                }
-                st_echarts(options=type_options, height="450px", key="type_chart")
-            
-            st.subheader("University Difficulty Distribution")
-            difficulty_order = ['Low', 'Medium', 'High', 'Very High']
-            difficulty_counts = df['difficulty'].value_counts().reindex(difficulty_order, fill_value=0).to_dict()
-            difficulty_options = {
-                "tooltip": {"trigger": "axis", "axisPointer": {"type": "shadow"}},
-                "xAxis": {"type": "category", "data": list(difficulty_counts.keys()), "axisLabel": {"interval": 0, "rotate": 0}},
-                "yAxis": {"type": "value", "name": "Number of Universities"},
-                "series": [{"data": list(difficulty_counts.values()), "type": "bar", "itemStyle": {"color": "#f97316"}}]
-            }
-            st_echarts(options=difficulty_options, height="400px", key="difficulty_chart")
+        # Only the chosen section runs; st.tabs would render all three on every rerun, and
+        # could not keep the Compare tab in step with card actions that rerun a fragment.
+        section = st.radio("Section", BROWSE_SECTIONS, horizontal=True, key="browse_section", label_visibility="collapsed")
+        if section == "Compare":
+            compare_section(version)
+        elif section == "Data Insights":
+            insights_section(version)
+        else:
+            explore_section(version)
+
+# --- Debug timing panel ---
+def debug_panel(rerun):
+    # Timings up to this point of the current rerun, plus this process's recent percentiles.
+    total_ms = sum(ms for _, ms in rerun.phases)
+    summary = METRICS.summary()
+    with st.expander("⏱ Rerun timings (debug)", expanded=True):
+        st.caption(f"This rerun: {total_ms:.1f} ms. Previous reruns in this process ({summary['reruns']}): "
+                   f"p50 {summary['total']['p50'] or 0:.1f} ms, p95 {summary['total']['p95'] or 0:.1f} ms.")
+        for name, values in sorted(summary['fragments'].items()):
+            st.caption(f"Fragment-only reruns of {name}: p50 {values['p50']:.1f} ms, p95 {values['p95']:.1f} ms.")
+        st.dataframe([{"Phase": name, "ms": round(ms, 2), "Share": f"{ms / total_ms:.0%}" if total_ms else "",
+                       "p50 ms": round(summary['phases'].get(name, {}).get('p50') or 0, 2),
+                       "p95 ms": round(summary['phases'].get(name, {}).get('p95') or 0, 2)}
+                      for name, ms in rerun.phases], use_container_width=True, hide_index=True)
+        st.dataframe([{"Loader": name, "Hits (rerun)": rerun.cache[name]['hits'],
+                       "Misses (rerun)": rerun.cache[name]['misses'],
+                       "Hits (process)": counts['hits'], "Misses (process)": counts['misses']}
+                      for name, counts in sorted(summary['cache'].items())], use_container_width=True, hide_index=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with METRICS.rerun() as rerun:
+        main()
+        if debug_enabled(st.query_params):
+            debug_panel(rerun)
\ No newline at end of file
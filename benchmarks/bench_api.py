@@ -0,0 +1,126 @@
+"""JSON API under concurrent clients: requests per second and p50/p99 latency per endpoint mix,
+plus what ETag revalidation and gzip save.
+
+The API runs as its own process (python api.py) on a synthetic catalog, so client threads do
+not share its interpreter. Each client holds one keep-alive connection and sends requests back
+to back.
+
+Run from the repository root:  python -m benchmarks.bench_api [--size 10000] [--clients 1 8 32]
+"""
+import argparse
+import http.client
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+from benchmarks.synthetic import synthetic_universities
+from database import init_db, sync_universities
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEARCHES = ["nursing", "comp sci", "medcine", "University of Arusha"]
+SORTS = ['relevance', 'name', '-fees']
+
+
+def scenarios(ids, regions, etag):
+    """name -> function(rng) giving (path, headers) for one request."""
+    gzip = {'Accept-Encoding': 'gzip'}
+    return {
+        'list pages': lambda rng: ("/universities?" + urlencode({
+            'region': rng.choice(regions), 'sort': rng.choice(SORTS), 'max_fees': rng.randrange(2, 11) * 1000000,
+            'limit': 20}), gzip),
+        'search': lambda rng: ("/search?" + urlencode({'q': rng.choice(SEARCHES), 'limit': 20}), gzip),
+        'detail': lambda rng: (f"/universities/{rng.choice(ids)}", gzip),
+        'aggregates': lambda rng: ("/aggregates", gzip),
+        'facets': lambda rng: ("/facets?" + urlencode({'region': rng.choice(regions),
+                                                       'type': rng.choice(['Public', 'Private'])}), gzip),
+        'poll (304)': lambda rng: ("/universities?limit=20", dict(gzip, **{'If-None-Match': etag})),
+    }
+
+
+def request(conn, path, headers):
+    conn.request('GET', path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    return response.status, dict(response.getheaders()), body
+
+
+def load(port, make_request, clients, duration):
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def client(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        mine = []
+        while time.perf_counter() < stop:
+            path, headers = make_request(rng)
+            start = time.perf_counter()
+            status, _, _ = request(conn, path, headers)
+            mine.append(time.perf_counter() - start)
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    ms = sorted(x * 1000 for x in latencies)
+    return len(ms) / elapsed, ms[len(ms) // 2], ms[min(len(ms) - 1, int(len(ms) * 0.99))], statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=3.0, help="seconds per scenario and client count")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        conn = init_db(path)
+        records = synthetic_universities(args.size)
+        sync_universities(conn, records)
+        conn.close()
+        ids = [r['id'] for r in records]
+        regions = sorted({r['region'] for r in records})
+
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'api.py'), '--db', path, '--port', '0'],
+                                  stdout=subprocess.PIPE, text=True, cwd=ROOT)
+        try:
+            port = int(re.search(r':(\d+) ', server.stdout.readline()).group(1))
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            start = time.perf_counter()
+            status, headers, body = request(conn, '/universities?limit=20', {})
+            first_ms = (time.perf_counter() - start) * 1000
+            _, _, gzipped = request(conn, '/universities?limit=100', {'Accept-Encoding': 'gzip'})
+            _, _, plain = request(conn, '/universities?limit=100', {})
+            conn.close()
+
+            print(f"{args.size} institutions; first request (loads the catalog) {first_ms:.0f} ms; "
+                  f"100-row page {len(plain):,} B plain, {len(gzipped):,} B gzip")
+            for name, make_request in scenarios(ids, regions, headers['ETag']).items():
+                for clients in args.clients:
+                    rps, p50, p99, statuses = load(port, make_request, clients, args.duration)
+                    codes = ', '.join(f"{code}: {count}" for code, count in sorted(statuses.items()))
+                    print(f"  {name:<11} {clients:>3} clients  {rps:8.0f} req/s   p50 {p50:7.2f} ms   "
+                          f"p99 {p99:7.2f} ms   ({codes})")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""In-memory catalog: the full DataFrame with per-row program/facility lists vs the compact
+summary Catalog, by retained memory, load time and the per-rerun copy cache_data made, plus
+the per-id details lookup that replaces the dropped columns.
+
+Run from the repository root:  python -m benchmarks.bench_catalog
+"""
+import argparse
+import gc
+import os
+import pickle
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_universities
+from catalog import SUMMARY_COLUMNS, read_catalog, summarize
+from database import init_db, read_universities, read_university_details, sync_universities
+
+
+def retained(load):
+    # Bytes still allocated once `load` returns, i.e. held by its result.
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = init_db(os.path.join(tmp, 'bench.db'))
+            sync_universities(conn, synthetic_universities(n))
+            old_ms, df = timed(lambda: read_universities(conn))
+            new_ms, catalog = timed(lambda: read_catalog(conn))
+            old_bytes, _ = retained(lambda: read_universities(conn))
+            new_bytes, _ = retained(lambda: read_catalog(conn))
+            sample = df['id'].iloc[::max(1, n // 200)].tolist()
+            details_ms, details = timed(lambda: [read_university_details(conn, uid) for uid in sample])
+            conn.close()
+
+        expected = df.assign(summary=df['description'].map(summarize))
+        assert (catalog.universities[SUMMARY_COLUMNS].astype(object) == expected[SUMMARY_COLUMNS].astype(object)).all().all()
+        for uni in details:
+            row = df.iloc[uni['id'] - 1]
+            assert uni == {column: row[column] for column in df.columns}, uni['id']
+        # cache_data hands every rerun its own unpickled copy of the frame.
+        blob = pickle.dumps(df)
+        unpickle_ms, _ = timed(lambda: pickle.loads(blob))
+        programs = len(catalog.programs)
+        print(f"{n} institutions, {programs} programs")
+        print(f"  lists in a DataFrame : {old_bytes / 2**20:7.1f} MiB  load {old_ms:7.0f} ms  "
+              f"per-rerun copy {unpickle_ms:6.0f} ms ({len(blob) / 2**20:.1f} MiB pickled)")
+        print(f"  summary Catalog      : {new_bytes / 2**20:7.1f} MiB  load {new_ms:7.0f} ms  "
+              f"shared, no per-rerun copy  {catalog.memory_usage()}")
+        print(f"  details by id        : {details_ms / len(sample):.3f} ms per uncached lookup")
+
+
+if __name__ == '__main__':
+    main()
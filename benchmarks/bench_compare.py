@@ -0,0 +1,91 @@
+"""Compare: the per-feature loop over per-id detail records vs the vectorized comparison with
+bitset program/facility overlap matrices, for a handful of institutions and for a whole region.
+
+Run from the repository root:  python -m benchmarks.bench_compare
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_universities
+from catalog import read_catalog
+from compare import FEATURES, bitsets, build_comparison, closest_pairs
+from database import init_db, read_comparison_details, read_university_details, sync_universities
+
+
+def loop_baseline(compare_rows):
+    # The pre-vectorized Compare tab: one pass over the institutions per feature, branching on its name.
+    comparison_data = []
+    for feature in FEATURES:
+        row_data = {"Feature": feature}
+        for uni_row in compare_rows:
+            if feature == "Avg. Annual Fees":
+                row_data[uni_row['name']] = f"{uni_row['avg_fees']:,} TZS"
+            elif feature == "Number of Programs":
+                row_data[uni_row['name']] = len(uni_row['programs'])
+            elif feature == "Facilities":
+                row_data[uni_row['name']] = ", ".join(uni_row['facilities'])
+            elif feature == "Admission Requirements":
+                row_data[uni_row['name']] = uni_row.get('admission_requirements', 'N/A')
+            else:
+                row_data[uni_row['name']] = uni_row.get(feature.replace(" ", "_").lower(), 'N/A')
+        comparison_data.append(row_data)
+    return pd.DataFrame(comparison_data).set_index("Feature")
+
+
+def set_overlaps(compare_rows, key):
+    # Pairwise shared counts with Python sets, to check the bitset matrices against.
+    sets = [set(p['name'] for p in uni[key]) if key == 'programs' else set(uni[key]) for uni in compare_rows]
+    return np.array([[len(a & b) for b in sets] for a in sets])
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = init_db(os.path.join(tmp, 'bench.db'))
+            sync_universities(conn, synthetic_universities(n))
+            catalog = read_catalog(conn)
+            df = catalog.universities
+            print(f"{n} institutions")
+            for label, ids in [("4 picked", df['id'].iloc[[0, n // 3, n // 2, n - 1]].tolist()),
+                               ("30 picked", df['id'].iloc[::max(1, n // 30)].head(30).tolist()),
+                               ("one region", df['id'][df['region'] == df['region'].iloc[0]].tolist())]:
+                old_ms, old = timed(lambda: loop_baseline([read_university_details(conn, i) for i in ids]), args.repeat)
+                new_ms, new = timed(lambda: build_comparison(catalog, ids, *read_comparison_details(conn, ids)),
+                                    args.repeat)
+                rows = catalog.rows(ids)
+                programs = bitsets(*catalog.program_codes(rows), len(rows))
+                facilities = bitsets(np.zeros(0, np.intp), np.zeros(0, np.intp), len(rows))
+                pairs_ms, _ = timed(lambda: closest_pairs(programs, facilities, new.table.columns.to_numpy()),
+                                    args.repeat)
+                assert (new.table.astype(str).to_numpy() == old.astype(str).to_numpy()).all()
+                if len(ids) <= 30:
+                    details = [read_university_details(conn, i) for i in ids]
+                    assert (new.program_overlap.to_numpy() == set_overlaps(details, 'programs')).all()
+                    assert (new.facility_overlap.to_numpy() == set_overlaps(details, 'facilities')).all()
+                print(f"  {label:<10} ({len(ids):5}): loop {old_ms:8.1f} ms   vectorized {new_ms:8.1f} ms "
+                      f"(of which closest program pairs {pairs_ms:6.1f} ms)   "
+                      f"{int(new.differing.sum())} of {len(FEATURES)} features differ")
+            conn.close()
+
+
+if __name__ == '__main__':
+    main()
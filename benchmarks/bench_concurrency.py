@@ -0,0 +1,115 @@
+"""Reader latency while an ingest is writing: per-call rollback-journal connections vs Database (WAL).
+
+Run from the repository root:  python -m benchmarks.bench_concurrency
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import synthetic_universities
+from database import Database, data_version, init_db, sync_universities
+
+
+THINK_TIME = 0.01
+
+
+def reader_work(conn):
+    # A typical rerun's reads: the version check plus one page of a filtered listing.
+    data_version(conn)
+    conn.execute('''SELECT u.id, u.name, count(p.position) FROM universities u
+                    JOIN programs p ON p.university_id = u.id
+                    WHERE u.region = 'Arusha' GROUP BY u.id ORDER BY u.name LIMIT 24''').fetchall()
+
+
+def run(label, open_reader, write, n_readers, catalog_update):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    writing = threading.Event()
+    done = threading.Event()
+
+    def reader():
+        writing.wait()
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                with open_reader() as conn:
+                    reader_work(conn)
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+            time.sleep(THINK_TIME)
+
+    threads = [threading.Thread(target=reader) for _ in range(n_readers)]
+    for thread in threads:
+        thread.start()
+    writing.set()
+    start = time.perf_counter()
+    write(catalog_update)
+    ingest = time.perf_counter() - start
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    ms = sorted(x * 1000 for x in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))] if ms else float('nan')
+    print(f"  {label:<32} ingest {ingest:5.2f} s | {len(ms):6d} reads, p50 {statistics.median(ms) if ms else float('nan'):7.2f} ms, "
+          f"p99 {p99:8.2f} ms, max {ms[-1] if ms else float('nan'):8.2f} ms | {len(errors)} errors")
+    return ms, errors
+
+
+class _Closing:
+    # Context manager opening a fresh connection per read, as every loader used to.
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=20000)
+    parser.add_argument('--readers', type=int, default=8)
+    args = parser.parse_args()
+
+    initial = synthetic_universities(args.size, seed=1)
+    update = synthetic_universities(args.size, seed=2)
+    print(f"{args.readers} readers during a sync rewriting {args.size} institutions")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        conn = init_db(legacy_path)
+        sync_universities(conn, initial)
+        conn.close()
+
+        def legacy_write(rows):
+            conn = init_db(legacy_path)
+            sync_universities(conn, rows)
+            conn.close()
+
+        run("rollback journal, per-call conns", lambda: _Closing(legacy_path), legacy_write, args.readers, update)
+
+        db = Database(os.path.join(tmp, 'wal.db'))
+        with db.write() as conn:
+            sync_universities(conn, initial)
+
+        def wal_write(rows):
+            with db.write() as conn:
+                sync_universities(conn, rows)
+
+        _, errors = run("Database (WAL, pooled readers)", db.read, wal_write, args.readers, update)
+        assert not errors, errors[:3]
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
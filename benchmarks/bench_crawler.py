@@ -0,0 +1,92 @@
+"""Per-institution detail crawl against a local fixture: cold crawl vs sequential fetching,
+revalidating re-crawls, offline replay from the compressed cache, and the ingest result.
+
+Run from the repository root:  python -m benchmarks.bench_crawler
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import requests
+
+from benchmarks.fixtures import FixtureServer, detail_content
+from crawler import HtmlCache, crawl, replay_details
+from database import Database, read_universities
+from ingest import run_ingest
+from scraper import fetch_listing_pages
+
+
+def sequential_baseline(urls):
+    # One plain GET after another, no cache: what a naive detail stage would do on every run.
+    with requests.Session() as session:
+        for url in urls:
+            session.get(url, timeout=15).raise_for_status()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=15, help="listing pages of 20 institutions each")
+    parser.add_argument('--latency', type=float, default=0.05, help="simulated server latency (s)")
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=100.0, help="per-host requests per second")
+    parser.add_argument('--changed', type=float, default=0.1, help="share of pages changed before the re-crawl")
+    args = parser.parse_args()
+
+    with FixtureServer(n_pages=args.pages, latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        cache = HtmlCache(os.path.join(tmp, 'cache'))
+        listing = fetch_listing_pages(server.url, cache=cache)
+        urls = [row['detail_url'] for rows in listing for row in rows]
+        print(f"{len(urls)} detail pages, {args.latency * 1000:.0f} ms server latency, "
+              f"{args.per_host} per host at <= {args.rate:g} req/s")
+
+        start = time.perf_counter()
+        sequential_baseline(urls)
+        print(f"  sequential, no cache  : {time.perf_counter() - start:6.2f} s")
+
+        def timed_crawl(label):
+            server.requests, server.not_modified, server.max_in_flight = 0, 0, 0
+            start = time.perf_counter()
+            counts = crawl(urls, cache, per_host=args.per_host, rate=args.rate)
+            print(f"  {label:<22}: {time.perf_counter() - start:6.2f} s  {counts}  "
+                  f"(max {server.max_in_flight} in flight at the host)")
+            assert server.max_in_flight <= args.per_host
+            return counts
+
+        counts = timed_crawl("cold crawl")
+        assert counts['downloaded'] == len(urls), counts
+        counts = timed_crawl("re-crawl, unchanged")
+        assert counts['not_modified'] == len(urls), counts
+
+        changed = range(1, int(len(urls) * args.changed) + 1)
+        for num in changed:
+            server.revisions[num] = 1
+        counts = timed_crawl(f"re-crawl, {len(changed)} changed")
+        assert counts['downloaded'] == len(changed) and counts['not_modified'] == len(urls) - len(changed), counts
+
+        start = time.perf_counter()
+        details = replay_details(urls, cache)
+        replay = time.perf_counter() - start
+        for num, url in enumerate(urls, start=1):
+            assert details[url] == detail_content(num, server.revisions.get(num, 0)), url
+        n_urls, bodies, on_disk = cache.size()
+        raw = sum(len(cache.get(url)) for url in urls)
+        print(f"  offline replay        : {replay:6.2f} s for {len(details)} pages ({replay / len(details) * 1000:.2f} ms/page)")
+        print(f"  cache                 : {n_urls} URLs, {bodies} bodies, {on_disk / 1024:.0f} KiB on disk "
+              f"for {raw / 1024:.0f} KiB of detail HTML")
+        cache.close()
+
+        db = Database(os.path.join(tmp, 'bench.db'))
+        start = time.perf_counter()
+        result = run_ingest(db, url=server.url, offline=True, cache_dir=os.path.join(tmp, 'cache'))
+        with db.read() as conn:
+            df = read_universities(conn)
+        db.close()
+        assert result['status'] == 'succeeded' and result['details']['parsed'] == len(urls), result
+        assert df['programs'].iloc[0] == detail_content(1, 1)['programs']
+        print(f"  offline ingest        : {time.perf_counter() - start:6.2f} s  {result['universities']} universities, "
+              f"details {result['details']}")
+
+
+if __name__ == '__main__':
+    main()
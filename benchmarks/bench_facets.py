@@ -0,0 +1,87 @@
+"""Live filter counts: a pandas filter per option vs per-value bitsets intersected by prefix, for a
+wizard walk (each step counts the next question's options given the answers so far) and an
+Explore sidebar render (region, type and budget counts given the other filters).
+
+Run from the repository root:  python -m benchmarks.bench_facets
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import interest_frame, synthetic_universities
+from catalog import Catalog
+from facets import FacetIndex
+
+WIZARD = [('region', 'Arusha'), ('type', 'Public'), ('max_fees', 3000000), ('academic_interest', 'STEM'),
+          ('difficulty', 'High')]
+SIDEBAR = {'region': 'Dar es Salaam', 'type': 'Private', 'max_fees': 5000000}
+
+
+def pandas_counts(df, interests, choices, facet, options):
+    # Every option filtered from scratch: the other choices, then the option itself.
+    mask = df['id'].notna()
+    for name, value in choices.items():
+        if name == facet or value is None:
+            continue
+        mask &= column_mask(df, interests, name, value)
+    return {option: int((mask & column_mask(df, interests, facet, option)).sum()) for option in options}
+
+
+def column_mask(df, interests, facet, value):
+    if facet == 'max_fees':
+        return df['avg_fees'] <= value
+    if facet == 'academic_interest':
+        return df['id'].isin(interests.loc[interests['interest'] == value, 'university_id'])
+    return df[facet] == value
+
+
+def walks(index, counts):
+    # The counts each screen shows: one facet per wizard step, three for the sidebar.
+    prefs = {}
+    for facet, value in WIZARD:
+        counts(prefs, facet, index.options[facet])
+        prefs[facet] = value
+    for facet in SIDEBAR:
+        counts(SIDEBAR, facet, index.options[facet])
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        records = synthetic_universities(n)
+        catalog = Catalog.from_records(records)
+        interests = interest_frame(records)
+        df = catalog.universities
+        start = time.perf_counter()
+        index = FacetIndex(catalog, interests)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        for facet, value in WIZARD:
+            assert index.counts(dict(WIZARD), facet) == pandas_counts(df, interests, dict(WIZARD), facet,
+                                                                      index.options[facet])
+        old_ms = timed(lambda: walks(index, lambda c, f, o: pandas_counts(df, interests, c, f, o)), args.repeat)
+
+        def cold():
+            # Bitsets prebuilt but nothing memoized, as for the first session on a new data version.
+            index._cache.clear()
+            walks(index, lambda c, f, o: index.counts(c, f))
+        cold_ms = timed(cold, args.repeat)
+        warm_ms = timed(lambda: walks(index, lambda c, f, o: index.counts(c, f)), args.repeat)
+        print(f"{n} institutions (bitsets built once per data version in {build_ms:.0f} ms)")
+        print(f"  pandas per option : {old_ms:9.2f} ms per wizard walk + sidebar render")
+        print(f"  bitsets, cold     : {cold_ms:9.2f} ms")
+        print(f"  bitsets, cached   : {warm_ms:9.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
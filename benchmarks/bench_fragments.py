@@ -0,0 +1,63 @@
+"""Explore card actions against a live Streamlit server: click-to-settled latency of
+"Add to Compare" as a fragment rerun vs a full-script rerun.
+
+Drives the app over Streamlit's websocket protocol the way a browser does (AppTest always
+reruns the whole script, so it cannot show fragment reruns). Pass --app to time another
+version of app.py, e.g. one saved from an earlier commit, whose clicks rerun the whole script.
+
+Run from the repository root:  python -m benchmarks.bench_fragments [--app old_app.py]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+from benchmarks.browser import Browser, free_port, start_server
+from benchmarks.synthetic import synthetic_universities
+from database import init_db, sync_universities
+from metrics import percentile
+
+
+async def measure(port, clicks):
+    browser = await Browser.connect(port)
+    await browser.rerun()
+    await browser.rerun(click='explore_all_btn')
+    await browser.rerun()
+    card = browser.keys('compare_')[0]
+    results = {}
+    for label, fragment in [("fragment rerun", True), ("full-script rerun", False)]:
+        timings = [await browser.rerun(click=card, fragment=fragment) for _ in range(clicks)]
+        results[label] = timings
+    browser.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app', default='app.py')
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--clicks', type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'bench.db')
+        conn = init_db(db)
+        sync_universities(conn, synthetic_universities(args.size))
+        conn.close()
+        port = free_port()
+        server = start_server(args.app, port, db)
+        try:
+            results = asyncio.run(measure(port, args.clicks))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.app}, {args.size} institutions, {args.clicks} 'Add to Compare' clicks each (click to settled page)")
+    for label, timings in results.items():
+        # The first clicks warm the server's caches; report the rest.
+        warm = timings[len(timings) // 4:]
+        print(f"  {label:<18}: p50 {percentile(warm, 0.5):7.1f} ms  p95 {percentile(warm, 0.95):7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Institution matching at ingest: blocked fuzzy matching vs comparing every pair, on a re-crawl
+of a synthetic catalog whose listing has moved on.
+
+The re-crawl lists the same institutions in a different order, with spelling noise in some
+names (case, "St."/"Saint", "Univ.", swapped letters, stray punctuation), head offices given
+as towns, addresses or variant spellings, some acronyms missing, a few listings repeated, a
+few institutions gone and a few new ones. Accuracy is measured against the known truth.
+
+Run from the repository root:  python -m benchmarks.bench_identity [--sizes 1000 10000 100000]
+"""
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+
+from benchmarks.synthetic import synthetic_universities
+from identity import NAME_THRESHOLD, IdentityIndex, identity, normalize_record, resolve_ids
+
+HEAD_OFFICES = {'Dar es Salaam': ["Dar-es-Salaam", "P.O. Box 35091, Dar es Salaam", "DAR ES SALAAM", "Dar es Salam"],
+                'Kilimanjaro': ["Moshi", "Moshi, Kilimanjaro"], 'Kagera': ["Bukoba"], 'Iringa': ["Mafinga", "IRINGA"],
+                'Morogoro': ["Mzumbe", "Morogoro Municipality"], 'Tanga': ["Lushoto"], 'Mbeya': ["Mbeya City"]}
+
+
+def misspell(name, rng):
+    words = name.split()
+    i = rng.randrange(len(words))
+    word = words[i]
+    change = rng.randrange(5)
+    if change == 0 and len(word) >= 5 and word.isalpha():
+        j = rng.randrange(1, len(word) - 2)
+        words[i] = word[:j] + word[j + 1] + word[j] + word[j + 2:]
+    elif change == 1:
+        return name.upper()
+    elif change == 2:
+        return name.replace("St. ", "Saint ").replace("University", "Univ.")
+    elif change == 3:
+        return name + " ."
+    else:
+        return "  ".join(words)
+    return ' '.join(words)
+
+
+def recrawl(records, rng, noise=0.3, churn=0.02):
+    """(re-crawled listing rows, the id each should get or None for a new institution)."""
+    rows, truth = [], []
+    for record in records:
+        if rng.random() < churn:
+            continue
+        row = dict(record)
+        if rng.random() < noise:
+            row['name'] = misspell(row['name'], rng)
+        if rng.random() < noise and row['region'] in HEAD_OFFICES:
+            row['region'] = rng.choice(HEAD_OFFICES[row['region']])
+        if rng.random() < noise / 3:
+            row['acronym'] = ''
+        copies = 2 if rng.random() < churn else 1
+        rows.extend([row] * copies)
+        truth.extend([record['id']] * copies)
+    # New institutions: numbered after the existing ones, as synthetic names carry their number.
+    for extra in synthetic_universities(len(records) + int(len(records) * churn), seed=1)[len(records):]:
+        rows.append(extra)
+        truth.append(None)
+    order = list(range(len(rows)))
+    rng.shuffle(order)
+    return [rows[i] for i in order], [truth[i] for i in order]
+
+
+def known_identities(records):
+    return [(*identity(normalize_record(record)), record['id']) for record in records]
+
+
+def naive_resolve(rows, known):
+    # Every row against every known identity, with the same cheap upper bounds first: the best
+    # name match above the threshold, else new.
+    ids, comparisons = [], 0
+    for row in rows:
+        ident = identity(normalize_record(row))
+        best, best_score = None, NAME_THRESHOLD
+        for key, acronym, region, university_id in known:
+            comparisons += 1
+            matcher = SequenceMatcher(None, ident.key, key, autojunk=False)
+            if matcher.real_quick_ratio() >= best_score and matcher.quick_ratio() >= best_score \
+                    and matcher.ratio() >= best_score:
+                best, best_score = university_id, matcher.ratio()
+        ids.append(best)
+    return ids, comparisons
+
+
+def accuracy(assigned, truth, n):
+    # Rows given their own id, new institutions given a fresh one; wrong merges are the costly errors.
+    right = sum(a == t if t is not None else a is not None and a > n for a, t in zip(assigned, truth))
+    wrong = sum(t is not None and a is not None and a <= n and a != t or t is None and a is not None and a <= n
+                for a, t in zip(assigned, truth))
+    return right / len(truth), wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--naive-max', type=int, default=1000, help="largest size to also run all-pairs matching on")
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        records = synthetic_universities(n)
+        rows, truth = recrawl(records, random.Random(n))
+        known = known_identities(records)
+        positional = sum(t == i + 1 for i, t in enumerate(truth))
+
+        start = time.perf_counter()
+        index = IdentityIndex(known, n + 1)
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        kept, _, stats = resolve_ids(rows, index)
+        match_ms = (time.perf_counter() - start) * 1000
+        # The id each row resolved to: replay against the final index, which now knows every spelling.
+        assigned = [index.exact[identity(normalize_record(row))] for row in rows]
+        right, wrong = accuracy(assigned, truth, n)
+
+        print(f"{n} institutions, re-crawl of {len(rows)} rows (listing-order ids would keep {positional} of them)")
+        print(f"  blocked   : {match_ms:8.0f} ms (+{build_ms:.0f} ms index)  {index.comparisons:>12,} name comparisons  "
+              f"{right:6.1%} correct, {wrong} wrong merges  ({', '.join(f'{k} {v}' for k, v in stats.items())})")
+        if n <= args.naive_max:
+            start = time.perf_counter()
+            naive, comparisons = naive_resolve(rows, known)
+            naive_ms = (time.perf_counter() - start) * 1000
+            right, wrong = accuracy([a if a is not None else n + 1 for a in naive], truth, n)
+            print(f"  all pairs : {naive_ms:8.0f} ms{'':14}{comparisons:>12,} name comparisons  "
+                  f"{right:6.1%} correct, {wrong} wrong merges")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Background ingest: the CLI's structured result, the job lock, and read latency for browsing
+sessions while IngestWorker re-scrapes a local fixture.
+
+Run from the repository root:  python -m benchmarks.bench_ingest
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.fixtures import FixtureServer
+from database import Database, read_universities
+from ingest import IngestBusy, IngestWorker
+
+THINK_TIME = 0.01
+
+
+def browse(db, stop, latencies):
+    # A browsing session's rerun reads: the version check plus the catalog.
+    while not stop.is_set():
+        start = time.perf_counter()
+        with db.read() as conn:
+            conn.execute('SELECT coalesce(max(id), 0) FROM sync_log').fetchone()
+            read_universities(conn)
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(THINK_TIME)
+
+
+def percentiles(ms):
+    ms = sorted(ms)
+    return f"p50 {statistics.median(ms):6.2f} ms, p99 {ms[min(len(ms) - 1, int(len(ms) * 0.99))]:6.2f} ms ({len(ms)} reads)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=0.15, help="simulated server latency (s)")
+    args = parser.parse_args()
+
+    with FixtureServer(n_pages=args.pages, latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        # Seed the catalog headlessly, as cron would.
+        cli = subprocess.run([sys.executable, '-m', 'ingest', '--db', path, '--url', server.url, '--no-details',
+                              '--cache-dir', os.path.join(tmp, 'cache')],
+                             capture_output=True, text=True, check=False)
+        result = json.loads(cli.stdout)
+        assert cli.returncode == 0 and result['status'] == 'succeeded', (cli.returncode, cli.stdout, cli.stderr)
+
+        db = Database(path)
+        # Listing only; benchmarks.bench_crawler covers the detail stage.
+        worker = IngestWorker(db, url=server.url, details=False, cache_dir=os.path.join(tmp, 'cache'))
+
+        idle, stop = [], threading.Event()
+        reader = threading.Thread(target=browse, args=(db, stop, idle))
+        reader.start()
+        time.sleep(1.0)
+        stop.set()
+        reader.join()
+
+        busy, stop = [], threading.Event()
+        reader = threading.Thread(target=browse, args=(db, stop, busy))
+        reader.start()
+        start = time.perf_counter()
+        job_id = worker.start()
+        try:
+            worker.start()
+            raise AssertionError("a second ingest started while one was running")
+        except IngestBusy:
+            pass
+        polls = 0
+        while worker.status(job_id)['status'] == 'running':
+            polls += 1
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        reader.join()
+        job = worker.status(job_id)
+        db.close()
+
+        assert job['status'] == 'succeeded', job
+        assert job['rows'] == args.pages * server.rows_per_page, job
+        print(f"{args.pages} pages x {server.rows_per_page} rows, {args.latency * 1000:.0f} ms server latency")
+        print(f"  CLI (exit {cli.returncode}): {cli.stdout.strip()}")
+        print(f"  background ingest took {elapsed:.2f} s ({polls} status polls); concurrent start rejected")
+        print(f"  browsing reads, idle          : {percentiles(idle)}")
+        print(f"  browsing reads, during ingest : {percentiles(busy)}")
+
+
+if __name__ == '__main__':
+    main()
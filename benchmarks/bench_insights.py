@@ -0,0 +1,56 @@
+"""Data Insights: per-rerun pandas aggregation vs aggregates materialized at ingest.
+
+Run from the repository root:  python -m benchmarks.bench_insights
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.bench_query import timed
+from benchmarks.synthetic import synthetic_universities
+from database import (DIFFICULTY_LEVELS, FEE_BIN_WIDTH, init_db, read_aggregates, read_universities,
+                      read_university_interests, refresh_aggregates, sync_universities)
+from insights import chart_options
+
+
+def pandas_baseline(df, interests):
+    # What the tab would have to compute from the loaded frame on every rerun.
+    return {
+        'region': df['region'].value_counts().to_dict(),
+        'type': df['type'].value_counts().to_dict(),
+        'difficulty': df['difficulty'].value_counts().reindex(DIFFICULTY_LEVELS, fill_value=0).to_dict(),
+        'fee_histogram': (df['avg_fees'] // FEE_BIN_WIDTH * FEE_BIN_WIDTH).value_counts().sort_index().to_dict(),
+        'fee_by_type': df.groupby('type')['avg_fees'].quantile([0, .25, .5, .75, 1]).to_dict(),
+        'interest': interests.groupby('interest')['programs'].sum().to_dict(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = init_db(os.path.join(tmp, 'bench.db'))
+            sync_universities(conn, synthetic_universities(n))
+            df, interests = read_universities(conn), read_university_interests(conn)
+
+            refresh_ms, _ = timed(lambda: refresh_aggregates(conn.cursor()), 1)
+            conn.commit()
+            base_ms, expected = timed(lambda: pandas_baseline(df, interests), args.repeat)
+            read_ms, charts = timed(lambda: chart_options(read_aggregates(conn)), args.repeat)
+            conn.close()
+
+        region = charts['region']
+        assert dict(zip(region['xAxis']['data'], region['series'][0]['data'])) == expected['region']
+        interest = charts['interest']
+        assert (dict(zip(interest['xAxis']['data'], interest['series'][0]['data']))
+                == {k: expected['interest'].get(k, 0) for k in interest['xAxis']['data']})
+        print(f"{n:6d} institutions  pandas per rerun {base_ms:8.2f} ms  materialized read + payloads {read_ms:6.2f} ms"
+              f"  (refresh at ingest {refresh_ms:7.2f} ms)")
+
+
+if __name__ == '__main__':
+    main()
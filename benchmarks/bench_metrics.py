@@ -0,0 +1,90 @@
+"""Rerun instrumentation: overhead of the laps and cache counters, and per-phase p50/p95 of
+real script runs under AppTest on a synthetic catalog.
+
+Run from the repository root:  python -m benchmarks.bench_metrics
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_universities
+from database import Database, sync_universities
+from metrics import Metrics, percentile
+
+VIEWS = ['home', 'explore']
+
+
+def overhead(calls):
+    # Cost of one lap and one counted cache hit, against the bare calls.
+    metrics = Metrics(log_path=None, prometheus_path=None)
+    cache = {}
+
+    def memo(fn):
+        def cached(*args):
+            if args not in cache:
+                cache[args] = fn(*args)
+            return cache[args]
+        cached.clear = cache.clear
+        return cached
+
+    def load(version):
+        return version
+
+    bare, counted = memo(load), metrics.cached(memo)(load)
+    timings = {}
+    with metrics.rerun():
+        for label, fn in [('bare cache hit', lambda: bare(1)), ('counted cache hit', lambda: counted(1)),
+                          ('lap', lambda: metrics.lap('phase'))]:
+            start = time.perf_counter()
+            for _ in range(calls):
+                fn()
+            timings[label] = (time.perf_counter() - start) / calls * 1e6
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--reruns', type=int, default=30, help="reruns per view")
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+
+    for label, us in overhead(args.calls).items():
+        print(f"  {label:<18}: {us:6.2f} µs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path, log = os.path.join(tmp, 'bench.db'), os.path.join(tmp, 'metrics.jsonl')
+        db = Database(path)
+        with db.write() as conn:
+            sync_universities(conn, synthetic_universities(args.size))
+        db.close()
+        # metrics.py reads its export settings at import, so the app gets a fresh import of it.
+        os.environ.update(STACKUNIVERSITY_DB=path, STACKUNIVERSITY_METRICS_LOG=log)
+        sys.modules.pop('metrics', None)
+        from streamlit.testing.v1 import AppTest
+
+        for view in VIEWS:
+            at = AppTest.from_file('app.py', default_timeout=120)
+            at.session_state.current_view = view
+            for _ in range(args.reruns + 1):
+                at.run()
+                assert not at.exception, at.exception
+
+        with open(log) as f:
+            records = [json.loads(line) for line in f]
+
+    print(f"{args.size} institutions, {args.reruns} warm reruns per view (first run of each view dropped)")
+    for i, view in enumerate(VIEWS):
+        warm = records[i * (args.reruns + 1) + 1:(i + 1) * (args.reruns + 1)]
+        totals = [r['total_ms'] for r in warm]
+        print(f"  {view:<16} total  p50 {percentile(totals, 0.5):7.2f} ms  p95 {percentile(totals, 0.95):7.2f} ms")
+        for phase in warm[0]['phases']:
+            values = [r['phases'][phase] for r in warm if phase in r['phases']]
+            print(f"    {phase:<16} p50 {percentile(values, 0.5):7.2f} ms  p95 {percentile(values, 0.95):7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Listing page parse throughput per backend on a saved corpus of fixture pages, vs the
+previous full-tree BeautifulSoup parse.
+
+Run from the repository root:  python -m benchmarks.bench_parser
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.fixtures import listing_rows, render_listing_page
+from scraper import LISTING_BACKENDS, listing_records, parse_listing_page
+
+
+def full_tree_baseline(body, page):
+    # The previous parser: decode, build the whole document tree, then select the rows.
+    soup = BeautifulSoup(body.decode('utf-8'), 'html.parser')
+    rows = []
+    for row in soup.select('table.views-table tbody tr'):
+        cells = row.find_all('td')
+        link = cells[1].find('a', href=True) if len(cells) > 1 else None
+        rows.append(([cell.text for cell in cells], link['href'] if link else None))
+    return list(listing_records(rows, page))
+
+
+def save_corpus(directory, n_pages, rows_per_page):
+    for page in range(1, n_pages + 1):
+        with open(os.path.join(directory, f"page-{page:04d}.html"), 'wb') as f:
+            f.write(render_listing_page(listing_rows(page, rows_per_page)).encode('utf-8'))
+
+
+def load_corpus(directory):
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            corpus.append((int(name[5:9]), f.read()))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--rows', type=int, default=20, help="institutions per page")
+    parser.add_argument('--corpus', help="directory of saved pages (page-NNNN.html); generated if omitted")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.corpus:
+            save_corpus(tmp, args.pages, args.rows)
+        corpus = load_corpus(args.corpus or tmp)
+    total_bytes = sum(len(body) for _, body in corpus)
+    print(f"{len(corpus)} pages, {total_bytes / 1e6:.1f} MB")
+
+    def run(label, parse):
+        start = time.perf_counter()
+        for page, body in corpus:
+            parse(body, page)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<22} {elapsed:6.2f} s  {len(corpus) / elapsed:7.0f} pages/s  {total_bytes / elapsed / 1e6:6.2f} MB/s")
+
+    run("full tree (previous)", full_tree_baseline)
+    for backend in ['stdlib', 'strainer', 'lxml']:
+        if backend not in LISTING_BACKENDS:
+            print(f"  {backend:<22} not installed")
+            continue
+        run(backend, lambda body, page: parse_listing_page(body, page, backend=backend))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Explore/wizard filtering: chained pandas masks vs the columnar QueryEngine.
+
+Run from the repository root:  python -m benchmarks.bench_query
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import synthetic_frame
+from query import Filters, QueryEngine, SORT_OPTIONS
+
+FILTER_SETS = [
+    Filters(max_fees=10000000, sort_by="Name (A-Z)"),
+    Filters(region="Arusha", max_fees=3000000, sort_by="Fees (Low-High)"),
+    Filters(region="Dodoma", type="Private", max_fees=5000000, sort_by="Name (Z-A)"),
+    Filters(type="Public", max_fees=2000000, difficulty="High", sort_by="Fees (High-Low)"),
+]
+
+
+def pandas_baseline(df, filters):
+    # The pre-engine Explore path: copy, chain boolean masks, then sort.
+    out = df.copy()
+    if filters.region is not None:
+        out = out[out['region'] == filters.region]
+    if filters.type is not None:
+        out = out[out['type'] == filters.type]
+    if filters.difficulty is not None:
+        out = out[out['difficulty'] == filters.difficulty]
+    out = out[out['avg_fees'] <= filters.max_fees]
+    key = 'name' if filters.sort_by.startswith("Name") else 'avg_fees'
+    return out.sort_values(key, ascending=filters.sort_by in ("Name (A-Z)", "Fees (Low-High)"), kind='stable')
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        df = synthetic_frame(n)
+        build_ms, engine = timed(lambda: QueryEngine(df, version=1), 1)
+        print(f"{n} institutions (engine build {build_ms:.1f} ms)")
+        for filters in FILTER_SETS:
+            base_ms, expected = timed(lambda: pandas_baseline(df, filters), args.repeat)
+            cold_ms, _ = timed(lambda: QueryEngine._compute(engine, filters), args.repeat)
+            warm_ms, ids = timed(lambda: engine.query(filters), args.repeat)
+            assert list(ids) == list(expected['id']), filters
+            print(f"  {len(ids):6d} hits  pandas {base_ms:8.2f} ms  engine {cold_ms:7.2f} ms  memoized {warm_ms:6.3f} ms"
+                  f"  [{filters.region or '-'} / {filters.type or '-'} / {filters.difficulty or '-'} / "
+                  f"<= {filters.max_fees:,} / {filters.sort_by}]")
+    assert set(SORT_OPTIONS) <= set(engine.sort_orders)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Wizard recommendations: hard filters + full sort vs vectorized weighted scoring with top-k.
+
+Run from the repository root:  python -m benchmarks.bench_recommend
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import interest_frame, synthetic_universities
+from catalog import Catalog
+from recommend import Recommender
+
+PREFS = [
+    {'max_fees': 3000000},
+    {'region': 'Arusha', 'type': 'Public', 'max_fees': 2000000, 'academic_interest': 'Health Sciences', 'difficulty': 'High'},
+    {'type': 'Private', 'max_fees': 5000000, 'academic_interest': 'STEM'},
+]
+
+
+def filter_baseline(df, prefs):
+    # The pre-scoring wizard step: copy, hard filters, substring interest match, alphabetical sort.
+    reco = df.copy()
+    for key in ('region', 'type', 'difficulty'):
+        if key in prefs:
+            reco = reco[reco[key] == prefs[key]]
+    if 'max_fees' in prefs:
+        reco = reco[reco['avg_fees'] <= prefs['max_fees']]
+    if 'academic_interest' in prefs:
+        interest = prefs['academic_interest'].lower()
+        reco = reco[reco['programs'].apply(lambda x: any(interest in p['name'].lower() for p in x))]
+    return reco.sort_values('difficulty').head(5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        records = synthetic_universities(n)
+        df = pd.DataFrame(records)
+        interests = interest_frame(records)
+        start = time.perf_counter()
+        recommender = Recommender(Catalog.from_records(records), interests)
+        build = (time.perf_counter() - start) * 1000
+        print(f"{n} institutions (scoring arrays built once per data version in {build:.0f} ms)")
+        for prefs in PREFS:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                old = filter_baseline(df, prefs)
+            old_ms = (time.perf_counter() - start) / args.repeat * 1000
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                positions, scores, _, exact = recommender.top_k(prefs)
+            new_ms = (time.perf_counter() - start) / args.repeat * 1000
+            print(f"  filter+sort {old_ms:8.2f} ms ({len(old)} shown)   scoring+top-k {new_ms:6.2f} ms "
+                  f"({exact} exact, best {scores[0]:.0%})   {prefs}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Listing scraper: sequential baseline vs the concurrent, rate-limited fetch engine.
+
+Run from the repository root:  python -m benchmarks.bench_scraper
+"""
+import argparse
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+from benchmarks.fixtures import FixtureServer
+from scraper import DEFAULT_HEADERS, fetch_listing_pages, listing_page_url
+
+
+def sequential_baseline(base_url, delay, max_pages):
+    # The pre-engine loop: a fresh connection per page and a fixed sleep in between.
+    count = 0
+    for page in range(1, max_pages + 1):
+        response = requests.get(listing_page_url(base_url, page), headers=DEFAULT_HEADERS, timeout=15)
+        response.raise_for_status()
+        rows = BeautifulSoup(response.text, 'html.parser').select('table.views-table tbody tr')
+        if not rows:
+            break
+        count += len(rows)
+        time.sleep(delay)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=0.15, help="simulated server latency (s)")
+    parser.add_argument('--delay', type=float, default=1.0, help="baseline sleep between pages (s)")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=4.0, help="engine requests per second")
+    args = parser.parse_args()
+
+    with FixtureServer(n_pages=args.pages, latency=args.latency) as server:
+        expected = args.pages * server.rows_per_page
+
+        start = time.perf_counter()
+        baseline_rows = sequential_baseline(server.url, args.delay, args.pages + 1)
+        baseline = time.perf_counter() - start
+        baseline_conns, server.connections, server.requests = server.connections, 0, 0
+
+        start = time.perf_counter()
+        pages = fetch_listing_pages(server.url, max_workers=args.workers, rate=args.rate)
+        engine = time.perf_counter() - start
+        engine_rows = sum(len(rows) for rows in pages)
+
+    print(f"{args.pages} pages x {server.rows_per_page} rows ({expected} expected), "
+          f"{args.latency * 1000:.0f} ms server latency")
+    print(f"  sequential + {args.delay:.1f}s sleep : {baseline:6.2f} s  ({baseline_rows} rows, {baseline_conns} connections)")
+    print(f"  engine ({args.workers} workers, {args.rate:g} req/s): {engine:6.2f} s  "
+          f"({engine_rows} rows, {server.connections} connections, {server.requests} requests)")
+    print(f"  speed-up: {baseline / engine:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
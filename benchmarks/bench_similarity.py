@@ -0,0 +1,78 @@
+"""Similar institutions: full rebuild of every neighbour list vs the incremental refresh a sync
+runs for a small batch of edits, checked against a full rebuild, plus the details-page read.
+
+Run from the repository root:  python -m benchmarks.bench_similarity
+"""
+import argparse
+import copy
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_universities
+from database import init_db, read_similar_universities, refresh_similarity, sync_universities
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def stored_scores(conn):
+    lists = {}
+    for uid, score in conn.execute('SELECT university_id, score FROM similar_universities ORDER BY university_id, position'):
+        lists.setdefault(uid, []).append(score)
+    return lists
+
+
+def edit(records, count, seed):
+    # `count` institutions get another's programs, a few disappear and a few new ones arrive.
+    rng = random.Random(seed)
+    records = copy.deepcopy(records)
+    for uni in rng.sample(records, count):
+        uni['programs'] = rng.choice(records)['programs']
+    records = [uni for uni in records if rng.random() > count / len(records) / 4]
+    added = synthetic_universities(count // 4, seed=seed)
+    for i, uni in enumerate(added):
+        uni['id'] = max(r['id'] for r in records) + 1 + i
+    return records + added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--edits', type=int, default=20)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = init_db(os.path.join(tmp, 'bench.db'))
+            records = synthetic_universities(n)
+            sync_universities(conn, records)
+            with conn:
+                full_ms, lists = timed(lambda: refresh_similarity(conn.cursor()))
+
+            records = edit(records, args.edits, seed=n)
+            sync_ms, changes = timed(lambda: sync_universities(conn, records))
+            incremental = stored_scores(conn)
+            changed = changes['inserted'] + changes['updated']
+            with conn:
+                refresh_ms, rewritten = timed(lambda: refresh_similarity(conn.cursor(), changed, changes['deleted']))
+                refresh_similarity(conn.cursor())
+            assert incremental == stored_scores(conn)
+
+            sample = [uid for uid, in conn.execute('SELECT id FROM universities ORDER BY random() LIMIT 200')]
+            read_ms, _ = timed(lambda: [read_similar_universities(conn, uid) for uid in sample])
+            conn.close()
+
+        print(f"{n} institutions")
+        print(f"  full rebuild        : {full_ms:9.0f} ms  ({lists} lists)")
+        print(f"  incremental refresh : {refresh_ms:9.0f} ms  ({rewritten} lists rewritten for {len(changed)} changed, "
+              f"{len(changes['deleted'])} deleted; whole sync {sync_ms:.0f} ms)")
+        print(f"  details-page read   : {read_ms / len(sample):9.3f} ms per institution")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Cold start: a fresh worker process loading the catalog from SQLite vs from the Arrow snapshot
+written at ingest, up to its first rendered Explore page, plus what writing the snapshot adds
+to an ingest.
+
+Each start is a new Python process, so nothing is cached in memory; the OS page cache is warm
+for both paths, as it is for a worker restarted on a busy host.
+
+Run from the repository root:  python -m benchmarks.bench_snapshot
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def worker(mode, path):
+    # One cold start, timed from the end of imports (the same for both paths) to the first page's card HTML.
+    from app import PAGE_SIZES, render_cards
+    from catalog import read_catalog
+    from database import Database, data_version, read_university_interests
+    from query import Filters, QueryEngine
+    from snapshot import load_snapshot
+    imported = time.perf_counter()
+
+    db = Database(path)
+    with db.read() as conn:
+        version = data_version(conn)
+        if mode == 'sqlite':
+            catalog, interests = read_catalog(conn), read_university_interests(conn)
+    if mode == 'snapshot':
+        catalog, interests = load_snapshot(db, version)
+    loaded = time.perf_counter()
+    engine = QueryEngine(catalog.universities, version)
+    render_cards(engine.select(Filters()).head(PAGE_SIZES[0]))
+    rendered = time.perf_counter()
+    db.close()
+    print(json.dumps({'load_ms': (loaded - imported) * 1000, 'first_page_ms': (rendered - imported) * 1000}))
+
+
+def cold_start(mode, path):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_snapshot', '--worker', mode, '--db', path],
+                         capture_output=True, text=True, cwd=ROOT, check=True).stdout
+    timings = json.loads(out.strip().splitlines()[-1])
+    timings['process_ms'] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--worker', choices=['sqlite', 'snapshot'], help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args.worker, args.db)
+
+    from benchmarks.synthetic import synthetic_universities
+    from database import init_db, sync_universities
+    from snapshot import SNAPSHOT_TABLES, snapshot_dir, write_snapshot
+
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            conn = init_db(path)
+            sync_universities(conn, synthetic_universities(n))
+            start = time.perf_counter()
+            version = write_snapshot(conn, snapshot_dir(path))
+            write_ms = (time.perf_counter() - start) * 1000
+            conn.close()
+            snapshot_bytes = sum(os.path.getsize(os.path.join(snapshot_dir(path), str(version), f'{name}.arrow'))
+                                 for name in SNAPSHOT_TABLES)
+
+            print(f"{n} institutions (database {os.path.getsize(path) / 2**20:.1f} MiB, snapshot "
+                  f"{snapshot_bytes / 2**20:.1f} MiB, written in {write_ms:.0f} ms)")
+            for mode in ('sqlite', 'snapshot'):
+                runs = [cold_start(mode, path) for _ in range(args.repeat)]
+                median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+                print(f"  {mode:<8}: catalog load {median['load_ms']:7.0f} ms   first page {median['first_page_ms']:7.0f} ms"
+                      f"   whole process {median['process_ms']:7.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
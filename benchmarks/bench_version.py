@@ -0,0 +1,68 @@
+"""Cross-process cache invalidation: cost of the per-rerun data version check, and how soon
+another server process sees an ingest.
+
+Run from the repository root:  python -m benchmarks.bench_version
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_universities
+from database import Database, data_version, sync_universities
+
+POLL_INTERVAL = 0.001
+
+
+def watch(path, start_version, ready, result):
+    # Another app process: poll the version the way each rerun does until the ingest shows up.
+    db = Database(path)
+    latencies = []
+    ready.set()
+    while True:
+        start = time.perf_counter()
+        with db.read() as conn:
+            version = data_version(conn)
+        latencies.append(time.perf_counter() - start)
+        if version != start_version:
+            result.put((time.time(), version, latencies))
+            return
+        time.sleep(POLL_INTERVAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        db = Database(path)
+        with db.write() as conn:
+            sync_universities(conn, synthetic_universities(args.size, seed=1))
+            before = data_version(conn)
+
+        ready, result = multiprocessing.Event(), multiprocessing.Queue()
+        watcher = multiprocessing.Process(target=watch, args=(path, before, ready, result))
+        watcher.start()
+        ready.wait()
+        time.sleep(0.2)
+        with db.write() as conn:
+            changes = sync_universities(conn, synthetic_universities(args.size, seed=2))
+            committed = time.time()
+        seen_at, seen_version, latencies = result.get(timeout=60)
+        watcher.join()
+        db.close()
+
+    assert seen_version == changes['log_id'], (seen_version, changes)
+    us = sorted(x * 1e6 for x in latencies)
+    print(f"{args.size} institutions, version {before} -> {seen_version}")
+    print(f"  version check over {len(us)} polls: p50 {statistics.median(us):.1f} us, "
+          f"p99 {us[min(len(us) - 1, int(len(us) * 0.99))]:.1f} us")
+    print(f"  other process saw the ingest within {max(seen_at - committed, 0) * 1000:.2f} ms of the sync returning")
+
+
+if __name__ == '__main__':
+    main()
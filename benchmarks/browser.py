@@ -0,0 +1,174 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import NamedTuple
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+from tornado.websocket import websocket_connect
+
+SETTLED = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY}
+WIDGETS = {'button', 'checkbox', 'number_input', 'radio', 'selectbox', 'slider', 'text_input'}
+
+
+# --- Local Streamlit server ---
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port, db, **env):
+    """`streamlit run app` on localhost against database `db`; extra keyword arguments are environment variables."""
+    env = dict(os.environ, STACKUNIVERSITY_DB=db, PYTHONPATH=os.getcwd(), **env)
+    server = subprocess.Popen([sys.executable, '-m', 'streamlit', 'run', app, '--server.headless', 'true',
+                               '--server.port', str(port), '--server.enableXsrfProtection', 'false',
+                               '--browser.gatherUsageStats', 'false'],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(300):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Streamlit server did not start")
+
+
+# --- Headless browser session ---
+class Widget(NamedTuple):
+    id: str
+    kind: str           # element type: 'button', 'selectbox', 'slider', ...
+    fragment_id: str    # '' outside fragments
+    options: list       # option labels (selectbox, radio, select_slider)
+    proto: object
+
+
+def _initial_value(kind, proto):
+    # What the frontend holds for a widget it has just created: the script's value if it
+    # set one through session state, else the widget's default.
+    if kind == 'button':
+        return None
+    value = proto.value if proto.set_value else proto.default
+    return list(value) if kind == 'slider' else value
+
+
+class Browser:
+    """A headless Streamlit client speaking the websocket protocol as the frontend does.
+
+    It keeps the value of every widget on the page and sends all of them with each rerun,
+    so scripts see the same widget state they would from a real browser. Widgets are known
+    by their user key, or by their label when they have none. Exceptions rendered by the
+    app are collected in `exceptions`.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}
+        self.values = {}
+        self.exceptions = []
+
+    @classmethod
+    async def connect(cls, port):
+        return cls(await websocket_connect(f"ws://127.0.0.1:{port}/_stcore/stream"))
+
+    def close(self):
+        self.ws.close()
+
+    def keys(self, prefix=''):
+        return [key for key in self.widgets if key.startswith(prefix)]
+
+    async def rerun(self, click=None, fragment=True):
+        """Rerun (clicking the button `click`); returns ms until the run settles."""
+        fragment_id = self.widgets[click].fragment_id if click is not None and fragment else ''
+        return await self._send(click, fragment_id)
+
+    async def click(self, key, fragment=True):
+        return await self.rerun(click=key, fragment=fragment)
+
+    async def set(self, key, value):
+        """Change widget `key` as a user would; returns ms until the run settles.
+
+        `value` is in the frontend's terms: the option index for selectboxes, radios and
+        select sliders, the text for text inputs, the number for number inputs.
+        """
+        widget = self.widgets[key]
+        self.values[key] = [float(value)] if widget.kind == 'slider' else value
+        return await self._send(None, widget.fragment_id)
+
+    def _widget_states(self, msg, click):
+        for key, widget in self.widgets.items():
+            if widget.kind == 'button':
+                if key == click:
+                    msg.add(id=widget.id, trigger_value=True)
+                continue
+            state = msg.add(id=widget.id)
+            value = self.values[key]
+            if widget.kind in ('selectbox', 'radio'):
+                state.int_value = value
+            elif widget.kind == 'text_input':
+                state.string_value = value
+            elif widget.kind == 'checkbox':
+                state.bool_value = value
+            elif widget.kind == 'slider':
+                state.double_array_value.data.extend(value)
+            elif widget.proto.data_type == NumberInput.INT:
+                state.int_value = int(value)
+            else:
+                state.double_value = value
+
+    async def _send(self, click, fragment_id):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        self._widget_states(msg.rerun_script.widget_states.widgets, click)
+        if fragment_id:
+            msg.rerun_script.fragment_id = fragment_id
+        start = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        seen, fragment_ids = {}, []
+        while True:
+            data = await self.ws.read_message()
+            if data is None:
+                raise RuntimeError("connection closed")
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof('type')
+            if kind == 'new_session':
+                seen, fragment_ids = {}, list(forward.new_session.fragment_ids_this_run)
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                self._read_element(forward.delta, seen)
+            elif kind == 'script_finished' and forward.script_finished in SETTLED:
+                self._settle(seen, fragment_ids)
+                return (time.perf_counter() - start) * 1000
+
+    def _read_element(self, delta, seen):
+        element = delta.new_element
+        kind = element.WhichOneof('type')
+        if kind == 'exception':
+            self.exceptions.append(f"{element.exception.type}: {element.exception.message}")
+        elif kind in WIDGETS:
+            proto = getattr(element, kind)
+            key = proto.id.split('-', 2)[-1]
+            if key == 'None':
+                key = proto.label
+            options = list(getattr(proto, 'options', []))
+            seen[key] = Widget(proto.id, kind, delta.fragment_id, options, proto)
+
+    def _settle(self, seen, fragment_ids):
+        # A full run replaces the page; a fragment run only the widgets of its fragments.
+        if fragment_ids:
+            kept = {key: w for key, w in self.widgets.items() if w.fragment_id not in fragment_ids}
+        else:
+            kept = {}
+        for key, widget in seen.items():
+            old = self.widgets.get(key)
+            # A changed id (e.g. new option labels) is a new widget to the frontend, so it starts over.
+            if old is None or old.id != widget.id or widget.kind != 'button' and widget.proto.set_value:
+                self.values[key] = _initial_value(widget.kind, widget.proto)
+        kept.update(seen)
+        self.widgets = kept
+        self.values = {key: self.values[key] for key in kept}
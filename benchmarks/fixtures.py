@@ -0,0 +1,186 @@
+import hashlib
+import html
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+REGIONS = ["Dar es Salaam", "Arusha", "Dodoma", "Mwanza", "Morogoro", "Mbeya", "Kilimanjaro", "Tanga", "Iringa", "Kagera"]
+TYPES = ["Public University", "Private University", "Public University College", "Private University College",
+         "Private Campus, Centre and Institute"]
+STEMS = ["Health and Allied Sciences", "Science and Technology", "Business Studies", "Education", "Agriculture",
+         "Arts and Social Sciences", "Law", "Medicine", "Engineering", "Information Technology"]
+
+
+# --- Synthetic TCU listing pages ---
+def listing_rows(page, rows_per_page=20):
+    rows = []
+    for idx in range(rows_per_page):
+        n = (page - 1) * rows_per_page + idx
+        name = f"Institute {n} of {STEMS[n % len(STEMS)]}"
+        acronym = f"I{n}{STEMS[n % len(STEMS)][0]}"
+        rows.append((n + 1, f"{name} ({acronym})", REGIONS[n % len(REGIONS)], TYPES[n % len(TYPES)]))
+    return rows
+
+
+def render_listing_page(rows):
+    body = "".join(
+        f"<tr><td>{num}</td><td><a href='/institution/{num}'>{html.escape(name)}</a></td>"
+        f"<td>{html.escape(region)}</td><td>{html.escape(kind)}</td></tr>"
+        for num, name, region, kind in rows
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Universities Registered in Tanzania</title></head><body>"
+        "<div class='region-header'><nav>" + "<a href='#'>link</a>" * 50 + "</nav></div>"
+        "<div class='view-content'><table class='views-table cols-4'>"
+        "<thead><tr><th>S/N</th><th>Name</th><th>Head Office</th><th>Category</th></tr></thead>"
+        f"<tbody>{body}</tbody></table></div>"
+        "<footer>" + "<p>Tanzania Commission for Universities</p>" * 20 + "</footer></body></html>"
+    )
+
+
+# --- Synthetic institution detail pages ---
+PROGRAM_TITLES = ["Computer Science", "Civil Engineering", "Nursing", "Medicine", "Pharmacy", "Laws (LLB)",
+                  "Education", "Business Administration", "Accounting", "Agriculture", "Veterinary Medicine",
+                  "Mass Communication", "Public Administration", "Architecture", "Data Science", "Tourism"]
+PROGRAM_LEVELS = [("Certificate in", 1), ("Diploma in", 2), ("BSc in", 3), ("Bachelor of", 4)]
+DETAIL_FACILITIES = ["Library", "Labs", "Hostels", "Computer Labs", "Sports Complex", "Hospital", "Farms",
+                     "E-Library", "Workshops", "Lecture Halls"]
+DIFFICULTIES = ["Low", "Medium", "High", "Very High"]
+
+
+def detail_content(num, revision=0):
+    # Structured content of institution `num`'s detail page; a new revision changes it.
+    rng = random.Random(num * 1000 + revision)
+    programs = []
+    for _ in range(rng.randint(2, 8)):
+        level, duration = rng.choice(PROGRAM_LEVELS)
+        programs.append({'name': f"{level} {rng.choice(PROGRAM_TITLES)}", 'duration': duration,
+                         'prospects': f"{rng.choice(PROGRAM_TITLES)} specialist",
+                         'program_difficulty': rng.choice(DIFFICULTIES)})
+    return {
+        'description': f"Institution {num} offers programmes in {STEMS[(num - 1) % len(STEMS)]} (revision {revision}).",
+        'programs': programs,
+        'facilities': rng.sample(DETAIL_FACILITIES, rng.randint(1, 5)),
+        'admission_requirements': f"Minimum of {rng.choice('ABCD')} grades in {rng.randint(2, 5)} subjects.",
+    }
+
+
+def render_detail_page(num, revision=0):
+    content = detail_content(num, revision)
+    programs = "".join(
+        f"<tr><td>{html.escape(p['name'])}</td><td>{p['duration']} years</td>"
+        f"<td>{html.escape(p['prospects'])}</td><td>{p['program_difficulty']}</td></tr>"
+        for p in content['programs']
+    )
+    facilities = "".join(f"<li>{html.escape(name)}</li>" for name in content['facilities'])
+    return (
+        f"<!DOCTYPE html><html><head><title>Institution {num}</title></head><body>"
+        "<div class='region-header'><nav>" + "<a href='#'>link</a>" * 50 + "</nav></div>"
+        f"<div class='field field-name-body'><p>{html.escape(content['description'])}</p></div>"
+        "<table class='views-table programmes'><thead><tr><th>Programme</th><th>Duration</th>"
+        f"<th>Career Prospects</th><th>Difficulty</th></tr></thead><tbody>{programs}</tbody></table>"
+        f"<div class='field field-name-field-facilities'><ul>{facilities}</ul></div>"
+        f"<div class='field field-name-field-admission'><p>{html.escape(content['admission_requirements'])}</p></div>"
+        "<footer>" + "<p>Tanzania Commission for Universities</p>" * 20 + "</footer></body></html>"
+    )
+
+
+# --- Local stand-in for the TCU site ---
+class FixtureServer:
+    """Serve `n_pages` listing pages (then empty pages) on localhost with a fixed per-request latency.
+
+    Every listed institution also has a detail page at /institution/<num>, served with ETag and
+    Last-Modified validators and answering conditional requests with 304. Bump
+    `revisions[num]` to change a page; set `errors[page]` to an HTTP status to fail a listing page.
+    """
+
+    def __init__(self, n_pages=10, rows_per_page=20, latency=0.05):
+        self.n_pages = n_pages
+        self.rows_per_page = rows_per_page
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.revisions = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with fixture._lock:
+                    fixture.connections += 1
+
+            def do_GET(self):
+                with fixture._lock:
+                    fixture.requests += 1
+                    fixture.in_flight += 1
+                    fixture.max_in_flight = max(fixture.max_in_flight, fixture.in_flight)
+                try:
+                    time.sleep(fixture.latency)
+                    if self.path.startswith('/institution/'):
+                        self.send_detail(int(self.path.rsplit('/', 1)[1]))
+                    else:
+                        self.send_listing()
+                finally:
+                    with fixture._lock:
+                        fixture.in_flight -= 1
+
+            def send_detail(self, num):
+                if not 1 <= num <= fixture.n_pages * fixture.rows_per_page:
+                    self.send_error(404)
+                    return
+                revision = fixture.revisions.get(num, 0)
+                payload = render_detail_page(num, revision).encode('utf-8')
+                etag = f'"{hashlib.sha1(payload).hexdigest()[:16]}"'
+                if self.headers.get('If-None-Match') == etag:
+                    with fixture._lock:
+                        fixture.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', formatdate(1700000000 + revision * 86400, usegmt=True))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def send_listing(self):
+                query = parse_qs(urlsplit(self.path).query)
+                page = int(query.get('page', ['1'])[0])
+                if page in fixture.errors:
+                    self.send_error(fixture.errors[page])
+                    return
+                rows = listing_rows(page, fixture.rows_per_page) if page <= fixture.n_pages else []
+                payload = render_listing_page(rows).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/universities"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,216 @@
+"""Concurrent-session load test of the Streamlit app: N simulated users against one live server,
+with per-interaction latency percentiles and the server process's memory.
+
+Each session is a headless browser on the websocket protocol (benchmarks/browser.py) following
+a script with think time between steps: either browsing (home -> Explore with region, type and
+budget filters and a search -> add to compare -> details -> Compare -> Data Insights) or a full
+wizard run to its recommendations. At the end of a script the tab closes and a new session
+starts, until the run's duration is up.
+
+Everything runs offline. The app's TCU listing URL points at a local fixture server, so with
+--ingest-at one extra session presses "Update Data" mid-run and the whole scrape, crawl and sync
+happen against local pages (the fixture's catalog then replaces the synthetic one, as a real
+update replaces stale listings).
+
+Run from the repository root:  python -m benchmarks.loadtest [--sessions 1 8 32] [--size 10000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.browser import Browser, free_port, start_server
+from benchmarks.fixtures import FixtureServer
+from benchmarks.synthetic import synthetic_universities
+from database import Database, init_db, sync_universities
+from ingest import read_job
+from metrics import percentile
+
+SEARCHES = ["nursing", "comp sci", "medcine", "University of Arusha", "UDSM", "law"]
+MEMORY_INTERVAL = 0.25
+
+
+# --- Session scripts ---
+async def pick(browser, key, rng, skip_first=False):
+    # A random option of selectbox/radio/select slider `key`, the first ("All") left out if asked.
+    options = browser.widgets[key].options
+    return await browser.set(key, rng.randrange(1 if skip_first else 0, len(options)))
+
+
+async def browse(browser, rng, step):
+    await step("open", browser.rerun())
+    await step("explore", browser.click('explore_all_btn'))
+    await step("filter region", pick(browser, 'region_select', rng, skip_first=True))
+    await step("filter type", pick(browser, 'type_select', rng, skip_first=True))
+    await step("filter budget", pick(browser, 'fees_slider', rng))
+    if not browser.keys('compare_'):
+        await step("reset filters", browser.click('reset_filters'))
+    for key in rng.sample(browser.keys('compare_'), min(2, len(browser.keys('compare_')))):
+        await step("add to compare", browser.click(key))
+    await step("view details", browser.click(rng.choice(browser.keys('view_'))))
+    # An update may remove the institution while it is open; the app then offers a fallback button.
+    for key in ['back_to_explore_btn', 'details_fallback_btn']:
+        if key in browser.widgets:
+            await step("back to explore", browser.click(key))
+    await step("search", browser.set('search_input', rng.choice(SEARCHES)))
+    await step("compare", browser.set('browse_section', 1))
+    await step("insights", browser.set('browse_section', 2))
+
+
+async def wizard(browser, rng, step):
+    await step("open", browser.rerun())
+    await step("start wizard", browser.click('start_wizard_btn'))
+    for key in ['wiz_region_select', 'wiz_type_radio', 'wiz_fees_slider', 'wiz_interest_select']:
+        await step("wizard answer", pick(browser, key, rng))
+        await step("wizard next", browser.click('wiz_next_btn'))
+    await step("recommendations", pick(browser, 'wiz_difficulty_radio', rng))
+    if browser.keys('reco_view_'):
+        await step("view details", browser.click(browser.keys('reco_view_')[0]))
+
+
+SCRIPTS = {'browse': browse, 'wizard': wizard}
+
+
+# --- Load ---
+class Run:
+    """Latencies per interaction, completed scripts and errors, shared by all sessions."""
+
+    def __init__(self, think):
+        self.think = think
+        self.latencies = {}
+        self.scripts = {name: 0 for name in SCRIPTS}
+        self.errors = []
+
+    async def session(self, port, seed, stop, wizard_share):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            name = 'wizard' if rng.random() < wizard_share else 'browse'
+            browser = await Browser.connect(port)
+
+            async def step(label, action):
+                self.latencies.setdefault(label, []).append(await action)
+                await asyncio.sleep(rng.uniform(0, 2 * self.think))
+
+            try:
+                await SCRIPTS[name](browser, rng, step)
+                self.scripts[name] += 1
+            except Exception as e:  # a missing widget or dropped connection; note it and start over
+                self.errors.append(f"{name}: {type(e).__name__}: {e}")
+            finally:
+                self.errors.extend(f"{name}: app exception {message}" for message in browser.exceptions)
+                browser.close()
+
+    async def update_data(self, port, delay):
+        await asyncio.sleep(delay)
+        browser = await Browser.connect(port)
+        await browser.rerun()
+        self.latencies["update data"] = [await browser.click('Update Data (Scrape from TCU)')]
+        browser.close()
+
+
+def memory_kib(pid, field):
+    # VmRSS (current) or VmHWM (peak) of process `pid` from /proc; None where there is no /proc.
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+async def sample_memory(pid, samples, stop):
+    while time.perf_counter() < stop:
+        samples.append(memory_kib(pid, 'VmRSS'))
+        await asyncio.sleep(MEMORY_INTERVAL)
+
+
+async def load(port, pid, args, sessions):
+    run = Run(args.think)
+    stop = time.perf_counter() + args.duration
+    samples = []
+    tasks = [run.session(port, seed, stop, args.wizard_share) for seed in range(sessions)]
+    tasks.append(sample_memory(pid, samples, stop))
+    if args.ingest_at is not None:
+        tasks.append(run.update_data(port, args.ingest_at))
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return run, samples, time.perf_counter() - start
+
+
+# --- Report ---
+def mib(kib):
+    return "n/a" if kib is None else f"{kib / 1024:.0f} MiB"
+
+
+def report(run, samples, elapsed, idle_kib, pid):
+    interactions = sum(len(ms) for ms in run.latencies.values())
+    scripts = ', '.join(f"{count} {name}" for name, count in run.scripts.items())
+    print(f"  {interactions} interactions in {elapsed:.0f} s ({scripts} scripts completed)")
+    print(f"  {'interaction':<17}{'count':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    everything = []
+    for label, ms in run.latencies.items():
+        everything.extend(ms)
+        print(f"  {label:<17}{len(ms):>6}{percentile(ms, 0.5):>9.0f}{percentile(ms, 0.95):>9.0f}"
+              f"{percentile(ms, 0.99):>9.0f}{max(ms):>9.0f}")
+    if everything:
+        print(f"  {'all':<17}{len(everything):>6}{percentile(everything, 0.5):>9.0f}"
+              f"{percentile(everything, 0.95):>9.0f}{percentile(everything, 0.99):>9.0f}{max(everything):>9.0f}")
+    rss = [kib for kib in samples if kib is not None]
+    print(f"  server memory: {mib(idle_kib)} idle, {mib(max(rss) if rss else None)} peak RSS under load, "
+          f"{mib(memory_kib(pid, 'VmRSS'))} after, {mib(memory_kib(pid, 'VmHWM'))} high-water mark")
+    for error in run.errors[:10]:
+        print(f"  error: {error}")
+    if len(run.errors) > 10:
+        print(f"  ... and {len(run.errors) - 10} more errors")
+
+
+def report_update(db):
+    database = Database(db)
+    with database.read() as conn:
+        job = read_job(conn)
+    database.close()
+    if job is None or job['finished_at'] is None:
+        print(f"  update data: {job['status'] if job else 'not started'} when the run ended")
+    else:
+        print(f"  update data: {job['status']} in {job['finished_at'] - job['started_at']:.1f} s ({job['message']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app', default='app.py')
+    parser.add_argument('--size', type=int, default=10000, help="synthetic institutions to seed")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 8, 32], help="concurrent sessions per run")
+    parser.add_argument('--duration', type=float, default=30.0, help="seconds per run")
+    parser.add_argument('--think', type=float, default=0.5, help="mean think time between interactions, seconds")
+    parser.add_argument('--wizard-share', type=float, default=0.25, help="fraction of scripts that are wizard runs")
+    parser.add_argument('--ingest-at', type=float, help="press 'Update Data' this many seconds into each run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer(n_pages=5, latency=0.01) as fixture:
+        for sessions in args.sessions:
+            # A fresh database and server per run, so runs do not warm each other's caches.
+            db = os.path.join(tmp, f'load{sessions}.db')
+            conn = init_db(db)
+            sync_universities(conn, synthetic_universities(args.size))
+            conn.close()
+            port = free_port()
+            server = start_server(args.app, port, db, STACKUNIVERSITY_TCU_URL=fixture.url,
+                                  STACKUNIVERSITY_CACHE=os.path.join(tmp, f'cache{sessions}'))
+            try:
+                idle_kib = memory_kib(server.pid, 'VmRSS')
+                run, samples, elapsed = asyncio.run(load(port, server.pid, args, sessions))
+                print(f"{args.app}, {args.size} institutions, {sessions} concurrent sessions, "
+                      f"{args.think:.1f} s mean think time")
+                report(run, samples, elapsed, idle_kib, server.pid)
+                if args.ingest_at is not None:
+                    report_update(db)
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Timed hot paths on seeded synthetic catalogs, written as JSON and checked against a stored baseline.
+
+Each case is timed separately at every size: catalog load (from SQLite and from the Arrow
+snapshot), Explore filtering and search, wizard recommendations, live filter counts,
+comparisons (four institutions and a whole region) and insights aggregation. A case
+regresses when its best run is more than --tolerance slower than the baseline's, and by at
+least MIN_DELTA_MS. The best run is far less noisy than the median on a shared machine, and
+the default tolerance (2x) still catches the algorithmic slowdowns that matter. Baselines
+are machine-specific: refresh them with --update-baseline after an intended change or on new
+hardware.
+
+Run from the repository root:  python -m benchmarks.suite [--sizes 1000 10000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_facets import walks
+from benchmarks.bench_query import FILTER_SETS
+from benchmarks.bench_recommend import PREFS
+from benchmarks.synthetic import synthetic_universities
+from catalog import read_catalog
+from compare import build_comparison
+from database import (init_db, read_aggregates, read_comparison_details, read_university_interests, refresh_aggregates,
+                      sync_universities)
+from facets import FacetIndex
+from insights import chart_options
+from query import QueryEngine
+from recommend import Recommender
+from search import search_universities
+from snapshot import publish_snapshot, read_snapshot
+
+SIZES = [1000, 10000, 100000]
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+TOLERANCE = 1.0
+MIN_DELTA_MS = 2.0
+SEARCHES = ["nursing", "comp sci", "medcine", "University of Arusha"]
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': round(statistics.median(times), 3), 'min_ms': round(min(times), 3), 'repeat': repeat}
+
+
+def run_size(n, repeat):
+    """Every case's timings for an `n`-institution catalog, keyed by case name."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = init_db(os.path.join(tmp, 'suite.db'))
+        records = synthetic_universities(n)
+        sync_universities(conn, records)
+        catalog = read_catalog(conn)
+        df = catalog.universities
+        interests = read_university_interests(conn)
+        engine = QueryEngine(df, version=1)
+        recommender = Recommender(catalog, interests, version=1)
+        ids = df['id'].iloc[[0, n // 3, n // 2, n - 1]].tolist()
+        region_ids = df['id'][df['region'] == df['region'].iloc[0]].tolist()
+
+        # Loads shrink the repeat count: they are the slowest cases by far.
+        slow = max(1, repeat // 3)
+        results['load'] = measure(lambda: read_catalog(conn), slow)
+        results['load.interests'] = measure(lambda: read_university_interests(conn), slow)
+        publish_snapshot(os.path.join(tmp, 'snapshots'), 1, catalog, interests)
+        results['load.snapshot'] = measure(lambda: read_snapshot(os.path.join(tmp, 'snapshots'), 1), slow)
+        results['explore.build'] = measure(lambda: QueryEngine(df, version=1), slow)
+        results['explore.filter'] = measure(lambda: [QueryEngine._compute(engine, f) for f in FILTER_SETS], repeat)
+        results['explore.search'] = measure(lambda: [search_universities(conn, text) for text in SEARCHES], repeat)
+        results['wizard.build'] = measure(lambda: Recommender(catalog, interests, version=1), slow)
+        results['wizard.top_k'] = measure(lambda: [recommender.top_k(prefs) for prefs in PREFS], repeat)
+        results['facets.build'] = measure(lambda: FacetIndex(catalog, interests, version=1), slow)
+        facets = FacetIndex(catalog, interests, version=1)
+
+        def facet_counts():
+            facets._cache.clear()
+            walks(facets, lambda choices, facet, options: facets.counts(choices, facet))
+        results['facets.counts'] = measure(facet_counts, repeat)
+        results['compare'] = measure(lambda: build_comparison(catalog, ids, *read_comparison_details(conn, ids)), repeat)
+        results['compare.region'] = measure(
+            lambda: build_comparison(catalog, region_ids, *read_comparison_details(conn, region_ids)), slow)
+        results['insights.refresh'] = measure(lambda: refresh_aggregates(conn.cursor()), slow)
+        conn.commit()
+        results['insights.read'] = measure(lambda: chart_options(read_aggregates(conn)), repeat)
+        conn.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """(case, size, baseline ms, current ms, ratio, regressed) for every case present in both."""
+    rows = []
+    for size, cases in results.items():
+        for case, timing in cases.items():
+            before = baseline.get(size, {}).get(case)
+            if before is None:
+                continue
+            ratio = timing['min_ms'] / max(before['min_ms'], 1e-6)
+            regressed = (timing['min_ms'] > before['min_ms'] * (1 + tolerance)
+                         and timing['min_ms'] - before['min_ms'] > MIN_DELTA_MS)
+            rows.append((case, size, before['min_ms'], timing['min_ms'], ratio, regressed))
+    return rows
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=False).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'commit': commit, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=9)
+    parser.add_argument('--output', help="write results as JSON to this file ('-' for stdout)")
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--update-baseline', action='store_true', help="store these results as the new baseline")
+    args = parser.parse_args()
+
+    results = {}
+    for n in args.sizes:
+        start = time.perf_counter()
+        results[str(n)] = run_size(n, args.repeat)
+        print(f"{n} institutions ({time.perf_counter() - start:.1f} s)", file=sys.stderr)
+    report = {'environment': environment(), 'results': results}
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    rows = compare(results, baseline, args.tolerance)
+    out = sys.stderr if args.output == '-' else sys.stdout
+    print(f"{'case (best run)':<18} {'size':>7} {'baseline':>10} {'current':>10} {'ratio':>7}", file=out)
+    for case, size, before, after, ratio, regressed in rows:
+        print(f"{case:<18} {size:>7} {before:8.2f}ms {after:8.2f}ms {ratio:6.2f}x{'  REGRESSION' if regressed else ''}",
+              file=out)
+    missing = [f"{case}@{size}" for size, cases in results.items() for case in cases
+               if case not in baseline.get(size, {})]
+    if missing:
+        print(f"no baseline for: {', '.join(missing)}", file=out)
+
+    if args.update_baseline:
+        merged = dict(baseline, **results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'environment': report['environment'], 'results': merged}, f, indent=2)
+            f.write('\n')
+        print(f"baseline updated: {args.baseline}", file=out)
+        return 0
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import argparse
+import random
+
+import pandas as pd
+
+from database import COLUMNS, DIFFICULTY_LEVELS, init_db, sync_universities
+from benchmarks.fixtures import REGIONS
+from taxonomy import classify_program
+
+PROGRAM_FIELDS = ["Computer Science", "Civil Engineering", "Nursing", "Medicine", "Pharmacy", "Laws (LLB)",
+                  "Education", "Business Administration", "Accounting", "Agriculture", "Veterinary Medicine",
+                  "Mass Communication", "Public Administration", "Architecture", "Land Management",
+                  "Data Science", "Economics", "Tourism", "Environmental Science", "Fine Arts"]
+PROGRAM_LEVELS = [("Certificate in", 1), ("Diploma in", 2), ("BSc in", 3), ("Bachelor of", 4), ("MSc in", 2)]
+FACILITIES = ["Library", "Labs", "Dorms", "Hostels", "Computer Labs", "Sports Complex", "Hospital", "Farms",
+              "E-Library", "Chapel", "Mosque", "Workshops", "GIS Lab", "Research Centers", "Lecture Halls"]
+NAME_PATTERNS = ["University of {place}", "{place} University", "{place} Institute of {field}",
+                 "{place} University College of {field}", "St. {saint} University of {place}"]
+SAINTS = ["Augustine", "Joseph", "John", "Francis", "Mary", "Paul"]
+
+
+# --- Seeded synthetic catalog ---
+def synthetic_universities(n, seed=0):
+    """`n` university records in the same shape as database.SAMPLE_DATA rows, reproducible from `seed`."""
+    rng = random.Random(seed)
+    records = []
+    for uid in range(1, n + 1):
+        place = rng.choice(REGIONS)
+        field = rng.choice(PROGRAM_FIELDS)
+        name = rng.choice(NAME_PATTERNS).format(place=place, field=field, saint=rng.choice(SAINTS)) + f" {uid}"
+        kind = rng.choice(["Public", "Private"])
+        programs = []
+        for _ in range(rng.randint(1, 8)):
+            level, duration = rng.choice(PROGRAM_LEVELS)
+            programs.append({"name": f"{level} {rng.choice(PROGRAM_FIELDS)}", "duration": duration,
+                             "prospects": f"{rng.choice(PROGRAM_FIELDS)} specialist",
+                             "program_difficulty": rng.choice(DIFFICULTY_LEVELS)})
+        records.append({
+            'id': uid,
+            'name': name,
+            'acronym': ''.join(word[0] for word in name.split() if word[0].isupper()) + str(uid),
+            'region': place,
+            'type': kind,
+            'avg_fees': rng.randrange(800000, 9000000, 50000) if kind == "Private" else rng.randrange(800000, 3500000, 50000),
+            'difficulty': rng.choice(DIFFICULTY_LEVELS),
+            'location': f"{place} Town",
+            'description': f"A {kind.lower()} institution in {place} known for {field}.",
+            'facilities': rng.sample(FACILITIES, rng.randint(1, 6)),
+            'programs': programs,
+            'admission_requirements': f"Minimum of {rng.choice('ABCD')} grades in {rng.randint(2, 5)} subjects.",
+        })
+    return records
+
+
+def synthetic_frame(n, seed=0):
+    return pd.DataFrame(synthetic_universities(n, seed), columns=COLUMNS)
+
+
+def interest_frame(records):
+    # What database.read_university_interests returns for these records.
+    counts = {}
+    for uni in records:
+        for program in uni['programs']:
+            for interest in classify_program(program['name']):
+                counts[uni['id'], interest] = counts.get((uni['id'], interest), 0) + 1
+    return pd.DataFrame([(uid, interest, n) for (uid, interest), n in counts.items()],
+                        columns=['university_id', 'interest', 'programs'])
+
+
+def main():
+    # Seed a database for trying the app at scale:
+    #   python -m benchmarks.synthetic --size 10000 --db /tmp/big.db
+    #   STACKUNIVERSITY_DB=/tmp/big.db streamlit run app.py
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic catalog into a database.")
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', required=True)
+    args = parser.parse_args()
+    conn = init_db(args.db)
+    changes = sync_universities(conn, synthetic_universities(args.size, args.seed), source='synthetic')
+    conn.close()
+    print(f"{args.db}: {len(changes['inserted'])} inserted, {len(changes['updated'])} updated, "
+          f"{len(changes['deleted'])} deleted")
+
+
+if __name__ == '__main__':
+    main()
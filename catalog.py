@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from database import DIFFICULTY_LEVELS
+
+# What the list views (Explore cards, wizard results, filters, scoring) need per institution.
+# Full descriptions, admission text, program details and facilities are loaded per id on
+# demand, with database.read_university_details.
+SUMMARY_COLUMNS = ['id', 'name', 'acronym', 'region', 'type', 'avg_fees', 'difficulty', 'summary']
+# Card blurbs: the description cut to this many characters.
+SUMMARY_LENGTH = 160
+# Text columns with few distinct values, held as pandas categoricals (one copy of each string).
+CATEGORICAL_COLUMNS = ['region', 'type']
+
+
+def _narrow_ints(column):
+    # Smallest integer dtype that holds the column; a nullable one if it has gaps.
+    if column.isna().any():
+        return column.astype('Int32')
+    return pd.to_numeric(column, downcast='integer')
+
+
+def summarize(description):
+    # Python twin of the SQL in read_catalog, for catalogs built from records.
+    if description is None or len(description) <= SUMMARY_LENGTH:
+        return description
+    return description[:SUMMARY_LENGTH].rstrip(' ') + '…'
+
+
+# --- Columnar catalog ---
+class Catalog:
+    """The list-view columns of one catalog version, held compactly.
+
+    `universities` has one row per institution, ordered by id, with categorical region, type
+    and difficulty and the narrowest integer fees. `programs` is an exploded child table of
+    program names whose `row` column is the owning university's row offset; it is sorted by
+    it, so offsets[i]:offsets[i + 1] is a slice (a view) holding row i's programs. Treat a
+    Catalog as read-only: the app shares one per data version.
+    """
+
+    def __init__(self, universities, programs):
+        self.universities = universities
+        self.programs = programs
+        self.program_offsets = self._offsets(programs['row'].to_numpy(), len(universities))
+
+    @staticmethod
+    def _offsets(rows, n):
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+        return offsets
+
+    @classmethod
+    def from_frames(cls, universities, programs):
+        """Build from a SUMMARY_COLUMNS frame and (university_id, name) program rows in display order."""
+        universities = universities[SUMMARY_COLUMNS].sort_values('id', kind='stable').reset_index(drop=True)
+        for column in CATEGORICAL_COLUMNS:
+            universities[column] = universities[column].astype('category')
+        universities['difficulty'] = pd.Categorical(universities['difficulty'], categories=DIFFICULTY_LEVELS,
+                                                    ordered=True)
+        universities['avg_fees'] = _narrow_ints(universities['avg_fees'])
+
+        rows = np.searchsorted(universities['id'].to_numpy(), programs['university_id'].to_numpy()).astype(np.int32)
+        order = np.argsort(rows, kind='stable')
+        programs = pd.DataFrame({'row': rows[order], 'name': pd.Categorical(programs['name'].to_numpy()[order])})
+        return cls(universities, programs)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from university records shaped like database.SAMPLE_DATA rows (e.g. synthetic catalogs)."""
+        universities = pd.DataFrame([dict(r, summary=summarize(r['description'])) for r in records])
+        programs = pd.DataFrame([(r['id'], p['name']) for r in records for p in r['programs']],
+                                columns=['university_id', 'name'])
+        return cls.from_frames(universities, programs)
+
+    def __len__(self):
+        return len(self.universities)
+
+    def program_counts(self):
+        return np.diff(self.program_offsets)
+
+    def rows(self, university_ids):
+        """Row offsets of these ids; -1 for ids not in the catalog."""
+        ids = self.universities['id'].to_numpy()
+        rows = np.searchsorted(ids, university_ids)
+        found = rows < len(ids)
+        found[found] = ids[rows[found]] == np.asarray(university_ids)[found]
+        return np.where(found, rows, -1)
+
+    def program_codes(self, rows):
+        """(owner, code) pairs for the programs of `rows`: owner is a position in `rows`, code the name's category code."""
+        starts = self.program_offsets[rows]
+        lengths = self.program_offsets[np.asarray(rows) + 1] - starts
+        owners = np.repeat(np.arange(len(starts)), lengths)
+        index = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return owners, self.programs['name'].cat.codes.to_numpy()[index]
+
+    def memory_usage(self):
+        """Bytes held by each table, counting the strings themselves."""
+        return {
+            'universities': int(self.universities.memory_usage(deep=True).sum()),
+            'programs': int(self.programs.memory_usage(deep=True).sum() + self.program_offsets.nbytes),
+        }
+
+
+def read_catalog(conn):
+    universities = pd.read_sql_query(f'''SELECT {', '.join(SUMMARY_COLUMNS[:-1])},
+                                                CASE WHEN length(description) > {SUMMARY_LENGTH}
+                                                     THEN rtrim(substr(description, 1, {SUMMARY_LENGTH})) || '…'
+                                                     ELSE description END AS summary
+                                         FROM universities ORDER BY id''', conn)
+    programs = pd.read_sql_query('SELECT university_id, name FROM programs ORDER BY university_id, position', conn)
+    return Catalog.from_frames(universities, programs)
@@ -0,0 +1,148 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+FEATURES = ["Region", "Type", "Avg. Annual Fees", "Difficulty", "Number of Programs", "Admission Requirements", "Facilities"]
+# Overlap matrices are shown as tables up to this many institutions; above it only the closest pairs are.
+MATRIX_DISPLAY_LIMIT = 30
+CLOSEST_PAIRS = 20
+# Upper bound on the words ANDed at once while building an overlap matrix.
+OVERLAP_CHUNK = 1 << 22
+
+
+class Comparison(NamedTuple):
+    table: pd.DataFrame             # FEATURES x institutions, display strings and counts
+    differing: pd.Series            # per feature, True where the institutions do not all agree
+    program_overlap: pd.DataFrame   # shared program names per pair, or None above MATRIX_DISPLAY_LIMIT
+    facility_overlap: pd.DataFrame  # shared facilities per pair, or None above MATRIX_DISPLAY_LIMIT
+    closest: pd.DataFrame           # the CLOSEST_PAIRS pairs sharing the most programs (by Jaccard)
+
+
+# --- Set overlap ---
+def bitsets(owners, codes, n):
+    """One row of uint64 words per owner with a bit set for each of its codes, from (owner, code) pairs."""
+    codes = np.unique(codes, return_inverse=True)[1].astype(np.uint64)
+    words = int(codes.max() // 64 + 1) if len(codes) else 1
+    bits = np.zeros((n, words), dtype=np.uint64)
+    np.bitwise_or.at(bits, (owners, (codes // 64).astype(np.intp)), np.left_shift(np.uint64(1), codes % 64))
+    return bits
+
+
+def _row_chunks(n, words):
+    # Row ranges small enough that a chunk's AND against every row stays under OVERLAP_CHUNK words.
+    step = max(1, OVERLAP_CHUNK // max(1, n * words))
+    return [slice(start, min(start + step, n)) for start in range(0, n, step)]
+
+
+def shared_counts(bits, rows=slice(None), columns=slice(None)):
+    """Codes shared by each of `rows` with each of `columns`: an AND and a popcount per word."""
+    block, other = bits[rows], bits[columns]
+    shared = np.zeros((len(block), len(other)), dtype=np.int32)
+    for word in range(bits.shape[1]):
+        shared += np.bitwise_count(block[:, None, word] & other[None, :, word])
+    return shared
+
+
+def overlap_matrix(bits):
+    """result[i, j] = number of codes owners i and j share."""
+    chunks = [shared_counts(bits, rows) for rows in _row_chunks(*bits.shape)]
+    return np.concatenate(chunks) if chunks else np.zeros((0, 0), np.int32)
+
+
+def closest_pairs(programs, facilities, labels, limit=CLOSEST_PAIRS):
+    """The `limit` pairs with the highest program Jaccard (shared / combined), then most shared facilities.
+
+    Works through the pairs a chunk of rows at a time, so no n x n matrix is held.
+    """
+    n = len(labels)
+    sizes = np.bitwise_count(programs).sum(axis=1, dtype=np.int32)
+    best = [(np.zeros(0, np.intp), np.zeros(0, np.intp), np.zeros(0, np.int32), np.zeros(0), np.zeros(0, np.int32))]
+    for rows in _row_chunks(n, programs.shape[1]):
+        # Each pair once: row i against the columns right of it.
+        shared = shared_counts(programs, rows, slice(rows.start, None))
+        union = sizes[rows, None] + sizes[None, rows.start:]
+        union -= shared
+        np.maximum(union, 1, out=union)
+        jaccard = shared.astype(np.float32)
+        jaccard /= union
+        block = rows.stop - rows.start
+        jaccard[:, :block][np.tri(block, dtype=bool)] = -1
+        jaccard = jaccard.ravel()
+        if len(jaccard) > limit:
+            # Keep everything tied with the limit-th best, so the facility tie-break stays exact.
+            flat = np.flatnonzero(jaccard >= -np.partition(-jaccard, limit - 1)[limit - 1])
+        else:
+            flat = np.arange(len(jaccard))
+        flat = flat[jaccard[flat] >= 0]
+        i, j = np.divmod(flat, n - rows.start)
+        shared, jaccard = shared[i, j], jaccard[flat]
+        i += rows.start
+        j += rows.start
+        facility = np.bitwise_count(facilities[i] & facilities[j]).sum(axis=1, dtype=np.int32)
+        best.append((i, j, shared, jaccard, facility))
+        i, j, shared, jaccard, facility = (np.concatenate(part) for part in zip(*best))
+        order = np.lexsort((-facility, -jaccard))[:limit]
+        best = [(i[order], j[order], shared[order], jaccard[order], facility[order])]
+    i, j, shared, jaccard, facility = best[0]
+    return pd.DataFrame({"Institution": labels[i], "Compared with": labels[j], "Shared programs": shared,
+                         "Program overlap": jaccard.round(2), "Shared facilities": facility})
+
+
+# --- Comparison table ---
+def _unique_labels(names, acronyms, ids):
+    # Column labels must be unique; repeated names get their acronym appended, and the id too
+    # when the acronym repeats as well.
+    labels = names.astype(object)
+    for key, suffix in ((names, lambda i: acronyms[i]),
+                        (labels, lambda i: f"{acronyms[i]}, #{ids[i]}" if acronyms[i] else f"#{ids[i]}")):
+        _, inverse, counts = np.unique(key.astype(str), return_inverse=True, return_counts=True)
+        for i in np.flatnonzero(counts[inverse] > 1):
+            labels[i] = f"{names[i]} ({suffix(i)})"
+    return labels
+
+
+def _take(column, rows, missing='N/A'):
+    # The column's values at `rows` as objects, without materializing a whole categorical column.
+    values = np.asarray(column.array.take(rows), dtype=object)
+    values[pd.isna(values)] = missing
+    return values
+
+
+def build_comparison(catalog, university_ids, details, facilities):
+    """Comparison of the given institutions, in that order; ids no longer in the catalog are skipped.
+
+    `details` and `facilities` are the frames database.read_comparison_details returns for them.
+    """
+    rows = catalog.rows(university_ids)
+    rows = rows[rows >= 0]
+    unis = catalog.universities
+    ids = unis['id'].to_numpy()[rows]
+    labels = _unique_labels(_take(unis['name'], rows), _take(unis['acronym'], rows, ''), ids)
+
+    # (owner, name) facility rows, grouped by owner in display order.
+    owners = pd.Index(ids).get_indexer(facilities['university_id'])
+    facility_names = facilities['name'].to_numpy(dtype=object)[owners >= 0]
+    owners = owners[owners >= 0]
+    names = facility_names[np.argsort(owners, kind='stable')]
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(owners, minlength=len(ids)))])
+    requirements = np.append(details['admission_requirements'].to_numpy(dtype=object), 'N/A')
+    values = np.array([
+        _take(unis['region'], rows),
+        _take(unis['type'], rows),
+        [f"{fee:,} TZS" if fee is not None else 'N/A' for fee in _take(unis['avg_fees'], rows, None)],
+        _take(unis['difficulty'], rows),
+        catalog.program_counts()[rows].astype(str),
+        requirements[pd.Index(details['id']).get_indexer(ids)],
+        [", ".join(names[start:end]) for start, end in zip(bounds[:-1], bounds[1:])],
+    ], dtype=object).reshape(len(FEATURES), len(ids))
+    table = pd.DataFrame(values, index=pd.Index(FEATURES, name="Feature"), columns=labels)
+    differing = pd.Series((values != values[:, :1]).any(axis=1), index=FEATURES)
+
+    programs = bitsets(*catalog.program_codes(rows), len(rows))
+    facilities = bitsets(owners, pd.factorize(facility_names)[0], len(rows))
+    closest = closest_pairs(programs, facilities, labels)
+    if len(rows) > MATRIX_DISPLAY_LIMIT:
+        return Comparison(table, differing, None, None, closest)
+    return Comparison(table, differing, pd.DataFrame(overlap_matrix(programs), index=labels, columns=labels),
+                      pd.DataFrame(overlap_matrix(facilities), index=labels, columns=labels), closest)
@@ -0,0 +1,227 @@
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+from database import DIFFICULTY_LEVELS
+from scraper import (PAGE_LIMIT, REQUEST_TIMEOUT, REQUESTS_PER_SECOND, TokenBucket, listing_page_url, make_session,
+                     parse_listing_page)
+
+# Override with the STACKUNIVERSITY_CACHE environment variable.
+CACHE_DIR = os.environ.get('STACKUNIVERSITY_CACHE',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'html'))
+# Pages in flight overall, and per host; each host also gets its own REQUESTS_PER_SECOND budget.
+MAX_WORKERS = 16
+PER_HOST_LIMIT = 4
+COMPRESS_LEVEL = 6
+
+
+# --- On-disk page cache ---
+class HtmlCache:
+    """Content-addressed, gzip-compressed store of fetched pages.
+
+    Bodies live under objects/<sha256[:2]>/<sha256>.html.gz, so identical pages are stored
+    once. index.sqlite maps each URL to its current body and to the validators (ETag,
+    Last-Modified) used to revalidate it. Safe to share between threads.
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or CACHE_DIR)
+        os.makedirs(os.path.join(self.root, 'objects'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = sqlite3.connect(os.path.join(self.root, 'index.sqlite'), check_same_thread=False)
+        with self._index:
+            self._index.execute('''CREATE TABLE IF NOT EXISTS pages
+                                   (url TEXT PRIMARY KEY, digest TEXT, etag TEXT, last_modified TEXT,
+                                    fetched_at REAL, checked_at REAL)''')
+
+    def _path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], f"{digest}.html.gz")
+
+    def lookup(self, url):
+        """The index entry for `url` as a dict, or None if it was never cached."""
+        with self._lock:
+            row = self._index.execute('SELECT digest, etag, last_modified, fetched_at, checked_at FROM pages WHERE url = ?',
+                                      (url,)).fetchone()
+        return dict(zip(['digest', 'etag', 'last_modified', 'fetched_at', 'checked_at'], row)) if row else None
+
+    def read(self, digest):
+        with open(self._path(digest), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def get(self, url):
+        entry = self.lookup(url)
+        return self.read(entry['digest']) if entry else None
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """Store `body` as the current version of `url`; returns its digest."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(gzip.compress(body, COMPRESS_LEVEL, mtime=0))
+            os.replace(tmp, path)
+        now = time.time()
+        with self._lock, self._index:
+            self._index.execute('''INSERT INTO pages (url, digest, etag, last_modified, fetched_at, checked_at)
+                                   VALUES (?, ?, ?, ?, ?, ?)
+                                   ON CONFLICT (url) DO UPDATE SET digest = excluded.digest, etag = excluded.etag,
+                                       last_modified = excluded.last_modified, fetched_at = excluded.fetched_at,
+                                       checked_at = excluded.checked_at''',
+                                (url, digest, etag, last_modified, now, now))
+        return digest
+
+    def touch(self, url):
+        # A 304 confirmed the cached copy is still current.
+        with self._lock, self._index:
+            self._index.execute('UPDATE pages SET checked_at = ? WHERE url = ?', (time.time(), url))
+
+    def size(self):
+        """(cached URLs, distinct bodies, bytes on disk for the bodies)."""
+        with self._lock:
+            urls, bodies = self._index.execute('SELECT count(*), count(DISTINCT digest) FROM pages').fetchone()
+        on_disk = sum(entry.stat().st_size for sub in os.scandir(os.path.join(self.root, 'objects')) if sub.is_dir()
+                      for entry in os.scandir(sub.path))
+        return urls, bodies, on_disk
+
+    def close(self):
+        with self._lock:
+            self._index.close()
+
+
+# --- Concurrent detail crawl ---
+class HostLimits:
+    """Per-host concurrency cap and request rate, created on first use of each host."""
+
+    def __init__(self, per_host=PER_HOST_LIMIT, rate=REQUESTS_PER_SECOND):
+        self.per_host = per_host
+        self.rate = rate
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (threading.BoundedSemaphore(self.per_host),
+                                     TokenBucket(self.rate, capacity=self.per_host))
+            return self._hosts[host]
+
+
+def crawl(urls, cache, session=None, max_workers=MAX_WORKERS, per_host=PER_HOST_LIMIT, rate=REQUESTS_PER_SECOND,
+          on_fetch=None):
+    """Bring every URL in `urls` up to date in `cache`, revalidating copies it already holds.
+
+    Returns the crawl counts: 'downloaded', 'not_modified' and 'failed'. A failed URL keeps its
+    previous cached copy, if any. `on_fetch(url, status)` is called as each URL completes.
+    """
+    own_session = session is None
+    if own_session:
+        session = make_session(max_workers)
+    limits = HostLimits(per_host, rate)
+    counts = {'downloaded': 0, 'not_modified': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def fetch(url):
+        entry = cache.lookup(url)
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        semaphore, bucket = limits.get(url)
+        try:
+            with semaphore:
+                bucket.acquire()
+                response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 304 and entry:
+                cache.touch(url)
+                status = 'not_modified'
+            else:
+                response.raise_for_status()
+                cache.put(url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                status = 'downloaded'
+        except Exception:
+            status = 'failed'
+        with lock:
+            counts[status] += 1
+        if on_fetch:
+            on_fetch(url, status)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(fetch, dict.fromkeys(urls)))
+    finally:
+        if own_session:
+            session.close()
+    return counts
+
+
+# --- Detail page parsing ---
+def _text(node):
+    return ' '.join(node.get_text(' ').split()) if node else None
+
+
+def parse_detail_page(html):
+    """Description, programs, facilities and admission text from an institution's page.
+
+    Only the fields present on the page are returned, so callers can keep defaults for the rest.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    details = {}
+    description = _text(soup.select_one('.field-name-body'))
+    if description:
+        details['description'] = description
+
+    programs = []
+    for row in soup.select('table.programmes tbody tr'):
+        cells = [_text(cell) for cell in row.find_all('td')]
+        if not cells or not cells[0]:
+            continue
+        duration = re.search(r'\d+', cells[1]) if len(cells) > 1 and cells[1] else None
+        difficulty = cells[3] if len(cells) > 3 and cells[3] in DIFFICULTY_LEVELS else None
+        programs.append({'name': cells[0], 'duration': int(duration.group()) if duration else None,
+                         'prospects': cells[2] if len(cells) > 2 and cells[2] else None, 'program_difficulty': difficulty})
+    if programs:
+        details['programs'] = programs
+
+    facilities = [_text(item) for item in soup.select('.field-name-field-facilities li')]
+    if facilities:
+        details['facilities'] = [name for name in facilities if name]
+    admission = _text(soup.select_one('.field-name-field-admission'))
+    if admission:
+        details['admission_requirements'] = admission
+    return details
+
+
+# --- Offline replay ---
+def replay_details(urls, cache):
+    """Parse each URL's cached page without touching the network; URLs never cached are skipped."""
+    details = {}
+    for url in dict.fromkeys(urls):
+        body = cache.get(url)
+        if body is not None:
+            details[url] = parse_detail_page(body)
+    return details
+
+
+def replay_listing(base_url, cache, page_limit=PAGE_LIMIT):
+    """The listing as fetch_listing_pages would return it, parsed from cached pages only."""
+    pages = []
+    for page in range(1, page_limit + 1):
+        url = listing_page_url(base_url, page)
+        body = cache.get(url)
+        rows = parse_listing_page(body, page, base_url=url) if body is not None else []
+        if not rows:
+            break
+        pages.append(rows)
+    return pages
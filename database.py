@@ -0,0 +1,635 @@
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from identity import IdentityIndex, acronym_key, canonical_region, name_key
+from similarity import SIMILAR_K, candidates, feature_matrix, nearest
+from taxonomy import INTERESTS, classify_program
+
+# Override with the STACKUNIVERSITY_DB environment variable; relative paths resolve against
+# the working directory, the default against this file.
+DB_PATH = os.environ.get('STACKUNIVERSITY_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'universities.db'))
+
+# Field order of a university record (and of the SAMPLE_DATA tuples).
+COLUMNS = ['id', 'name', 'acronym', 'region', 'type', 'avg_fees', 'difficulty', 'location',
+           'description', 'facilities', 'programs', 'admission_requirements']
+# Columns of the universities table; programs and facilities live in their own tables.
+UNIVERSITY_COLUMNS = ['id', 'name', 'acronym', 'region', 'type', 'avg_fees', 'difficulty', 'location',
+                      'description', 'admission_requirements']
+DIFFICULTY_LEVELS = ['Low', 'Medium', 'High', 'Very High']
+# Fee histogram bucket width (TZS) and the percentiles kept for the Data Insights tab.
+FEE_BIN_WIDTH = 500000
+FEE_PERCENTILES = [10, 25, 50, 75, 90]
+
+
+# --- Schema migrations ---
+# Each migration runs once, in order, inside its own transaction; PRAGMA user_version
+# records how many have been applied. Never edit a released migration, append a new one.
+def _migration_base_schema(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS universities
+                 (id INTEGER PRIMARY KEY, name TEXT, acronym TEXT, region TEXT, type TEXT,
+                  avg_fees INTEGER, difficulty TEXT, location TEXT, description TEXT,
+                  facilities TEXT, programs TEXT, admission_requirements TEXT)''')
+    if 'content_hash' not in {row[1] for row in c.execute('PRAGMA table_info(universities)')}:
+        c.execute('ALTER TABLE universities ADD COLUMN content_hash TEXT')
+    c.execute('''CREATE TABLE IF NOT EXISTS sync_log
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT, synced_at REAL, source TEXT,
+                  inserted TEXT, updated TEXT, deleted TEXT)''')
+
+
+def _migration_normalize_programs(c):
+    # Move the JSON-in-TEXT programs/facilities columns into their own tables.
+    legacy = c.execute('SELECT id, programs, facilities FROM universities').fetchall()
+
+    c.execute('''CREATE TABLE universities_new
+                 (id INTEGER PRIMARY KEY, name TEXT, acronym TEXT, region TEXT, type TEXT,
+                  avg_fees INTEGER, difficulty TEXT, location TEXT, description TEXT,
+                  admission_requirements TEXT, content_hash TEXT)''')
+    # content_hash is reset so the next sync rewrites each row once with the new hash layout.
+    c.execute('''INSERT INTO universities_new
+                 SELECT id, name, acronym, region, type, avg_fees, difficulty, location, description,
+                        admission_requirements, NULL
+                 FROM universities''')
+    c.execute('DROP TABLE universities')
+    c.execute('ALTER TABLE universities_new RENAME TO universities')
+
+    c.execute('''CREATE TABLE programs
+                 (university_id INTEGER NOT NULL REFERENCES universities(id), position INTEGER NOT NULL,
+                  name TEXT NOT NULL, duration INTEGER, prospects TEXT, program_difficulty TEXT,
+                  difficulty_rank INTEGER, PRIMARY KEY (university_id, position))''')
+    c.execute('CREATE INDEX idx_programs_name ON programs (name COLLATE NOCASE)')
+    c.execute('CREATE INDEX idx_programs_difficulty ON programs (difficulty_rank)')
+    c.execute('''CREATE TABLE facilities
+                 (university_id INTEGER NOT NULL REFERENCES universities(id), position INTEGER NOT NULL,
+                  name TEXT NOT NULL, PRIMARY KEY (university_id, position))''')
+    c.execute('CREATE INDEX idx_facilities_name ON facilities (name COLLATE NOCASE)')
+
+    program_rows, facility_rows = [], []
+    for uid, programs, facilities in legacy:
+        program_rows.extend((uid, pos, p['name'], p.get('duration'), p.get('prospects'), p.get('program_difficulty'),
+                             difficulty_rank(p.get('program_difficulty')))
+                            for pos, p in enumerate(json.loads(programs or '[]')))
+        facility_rows.extend((uid, pos, name) for pos, name in enumerate(json.loads(facilities or '[]')))
+    c.executemany('''INSERT INTO programs (university_id, position, name, duration, prospects,
+                                             program_difficulty, difficulty_rank)
+                     VALUES (?, ?, ?, ?, ?, ?, ?)''', program_rows)
+    c.executemany('INSERT INTO facilities (university_id, position, name) VALUES (?, ?, ?)', facility_rows)
+
+
+def _migration_search_index(c):
+    # Full-text index over names, acronyms and program names; rowid is the university id.
+    c.execute('''CREATE VIRTUAL TABLE search_index USING fts5
+                 (name, acronym, programs, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')''')
+    c.execute("CREATE VIRTUAL TABLE search_vocab USING fts5vocab(search_index, 'row')")
+    c.execute('''INSERT INTO search_index (rowid, name, acronym, programs)
+                 SELECT u.id, u.name, u.acronym,
+                        (SELECT group_concat(p.name, ' ') FROM programs p WHERE p.university_id = u.id)
+                 FROM universities u''')
+
+
+def _migration_program_interests(c):
+    # Interest categories per program, classified once at ingest (see taxonomy.py).
+    c.execute('''CREATE TABLE program_interests
+                 (university_id INTEGER NOT NULL, position INTEGER NOT NULL, interest TEXT NOT NULL,
+                  PRIMARY KEY (university_id, position, interest))''')
+    c.execute('CREATE INDEX idx_program_interests_interest ON program_interests (interest, university_id)')
+    c.executemany('INSERT INTO program_interests (university_id, position, interest) VALUES (?, ?, ?)',
+                  [(uid, pos, interest)
+                   for uid, pos, name in c.execute('SELECT university_id, position, name FROM programs').fetchall()
+                   for interest in classify_program(name)])
+
+
+def _migration_aggregates(c):
+    # Filled by refresh_aggregates once every migration has run.
+    c.execute('''CREATE TABLE aggregates
+                 (metric TEXT, series TEXT, position INTEGER, label TEXT, value REAL,
+                  PRIMARY KEY (metric, series, position))''')
+
+
+def _migration_ingest_jobs(c):
+    # One row per ingest run, from the UI or the CLI; doubles as the cross-process ingest lock.
+    c.execute('''CREATE TABLE ingest_jobs
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT, status TEXT, started_at REAL,
+                  heartbeat_at REAL, finished_at REAL, pages INTEGER DEFAULT 0, rows INTEGER DEFAULT 0,
+                  message TEXT, result TEXT)''')
+    c.execute('CREATE INDEX idx_ingest_jobs_status ON ingest_jobs (status)')
+
+
+def _migration_similar_universities(c):
+    # Filled by refresh_similarity once every migration has run.
+    c.execute('''CREATE TABLE similar_universities
+                 (university_id INTEGER NOT NULL, position INTEGER NOT NULL, similar_id INTEGER NOT NULL,
+                  score REAL, PRIMARY KEY (university_id, position))''')
+    c.execute('CREATE INDEX idx_similar_universities_similar ON similar_universities (similar_id)')
+
+
+def _migration_university_identities(c):
+    # Every (name key, acronym, region) an institution has been listed under, so ingest keeps its id
+    # across spellings and runs (see identity.py). Rows outlive deletions: a returning institution gets its id back.
+    c.execute('''CREATE TABLE university_identities
+                 (name_key TEXT NOT NULL, acronym TEXT NOT NULL, region TEXT NOT NULL,
+                  university_id INTEGER NOT NULL, PRIMARY KEY (name_key, acronym, region))''')
+    c.execute('CREATE INDEX idx_university_identities_university ON university_identities (university_id)')
+    c.executemany('INSERT OR IGNORE INTO university_identities VALUES (?, ?, ?, ?)',
+                  [(name_key(name), acronym_key(acronym), canonical_region(region), uid)
+                   for uid, name, acronym, region in c.execute('SELECT id, name, acronym, region FROM universities').fetchall()])
+
+
+MIGRATIONS = [
+    _migration_base_schema,
+    _migration_normalize_programs,
+    _migration_search_index,
+    _migration_program_interests,
+    _migration_aggregates,
+    _migration_ingest_jobs,
+    _migration_similar_universities,
+    _migration_university_identities,
+]
+
+
+def migrate(conn):
+    # BEGIN IMMEDIATE takes the write lock before user_version is read, so processes opening
+    # the same file at once apply each migration exactly once.
+    c = conn.cursor()
+    while True:
+        c.execute('BEGIN IMMEDIATE')
+        try:
+            version = c.execute('PRAGMA user_version').fetchone()[0]
+            if version >= len(MIGRATIONS):
+                c.execute('COMMIT')
+                return
+            MIGRATIONS[version](c)
+            c.execute(f'PRAGMA user_version = {version + 1}')
+            if version + 1 == len(MIGRATIONS):
+                # Derived tables are rebuilt against the final schema rather than frozen into a migration.
+                refresh_aggregates(c)
+                refresh_similarity(c)
+            c.execute('COMMIT')
+        except Exception:
+            c.execute('ROLLBACK')
+            raise
+
+
+# --- Database Initialization ---
+def init_db(path=None):
+    # A standalone, migrated read/write connection, for scripts. The app goes through Database.
+    conn = sqlite3.connect(path or DB_PATH)
+    migrate(conn)
+    return conn
+
+
+# --- Connection manager ---
+BUSY_TIMEOUT_MS = 10000
+READ_POOL_SIZE = 8
+READ_PRAGMAS = ['PRAGMA query_only = ON', 'PRAGMA cache_size = -16000', 'PRAGMA mmap_size = 268435456',
+                'PRAGMA temp_store = MEMORY']
+WRITE_PRAGMAS = ['PRAGMA synchronous = NORMAL', 'PRAGMA cache_size = -32000', 'PRAGMA temp_store = MEMORY']
+
+
+class Database:
+    """One process-wide handle on the catalog database.
+
+    The file is migrated and switched to WAL once, on construction. Readers borrow pooled
+    read-only connections, so they read the last committed snapshot and are never blocked
+    by an ingest; all writes are serialized through a single writer connection.
+    """
+
+    def __init__(self, path=None, read_pool_size=READ_POOL_SIZE):
+        self.path = os.path.abspath(path or DB_PATH)
+        self._readers = queue.LifoQueue(maxsize=read_pool_size)
+        self._write_lock = threading.Lock()
+        self._writer = self._connect(readonly=False)
+        self._writer.execute('PRAGMA journal_mode = WAL')
+        migrate(self._writer)
+
+    def _connect(self, readonly):
+        if readonly:
+            conn = sqlite3.connect(f"file:{quote(self.path)}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+        for pragma in READ_PRAGMAS if readonly else WRITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def read(self):
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect(readonly=True)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def write(self):
+        with self._write_lock:
+            yield self._writer
+
+    def close(self):
+        with self._write_lock:
+            self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+
+# --- Reading ---
+def read_universities(conn):
+    """Universities as a DataFrame, with `programs`/`facilities` as lists built from their tables."""
+    df = pd.read_sql_query(f"SELECT {', '.join(UNIVERSITY_COLUMNS)} FROM universities ORDER BY id", conn)
+    programs = defaultdict(list)
+    for uid, name, duration, prospects, program_difficulty in conn.execute(
+            'SELECT university_id, name, duration, prospects, program_difficulty FROM programs ORDER BY university_id, position'):
+        programs[uid].append({'name': name, 'duration': duration, 'prospects': prospects,
+                              'program_difficulty': program_difficulty})
+    facilities = defaultdict(list)
+    for uid, name in conn.execute('SELECT university_id, name FROM facilities ORDER BY university_id, position'):
+        facilities[uid].append(name)
+    df['programs'] = [programs.get(uid, []) for uid in df['id']]
+    df['facilities'] = [facilities.get(uid, []) for uid in df['id']]
+    return df[COLUMNS]
+
+
+def read_university_details(conn, university_id):
+    """One university as a dict in the COLUMNS shape, programs and facilities as lists; None if it is gone."""
+    row = conn.execute(f"SELECT {', '.join(UNIVERSITY_COLUMNS)} FROM universities WHERE id = ?",
+                       (university_id,)).fetchone()
+    if row is None:
+        return None
+    uni = dict(zip(UNIVERSITY_COLUMNS, row))
+    uni['programs'] = [{'name': name, 'duration': duration, 'prospects': prospects, 'program_difficulty': difficulty}
+                       for name, duration, prospects, difficulty in conn.execute(
+                           'SELECT name, duration, prospects, program_difficulty FROM programs '
+                           'WHERE university_id = ? ORDER BY position', (university_id,))]
+    uni['facilities'] = [name for name, in conn.execute(
+        'SELECT name FROM facilities WHERE university_id = ? ORDER BY position', (university_id,))]
+    return uni
+
+
+def read_comparison_details(conn, university_ids):
+    """(id, admission_requirements) and (university_id, name) facility rows for a set of ids, in one query each."""
+    ids = json.dumps([int(uid) for uid in university_ids])
+    universities = pd.read_sql_query('''SELECT id, admission_requirements FROM universities
+                                        WHERE id IN (SELECT value FROM json_each(?))''', conn, params=(ids,))
+    facilities = pd.read_sql_query('''SELECT university_id, name FROM facilities
+                                      WHERE university_id IN (SELECT value FROM json_each(?))
+                                      ORDER BY university_id, position''', conn, params=(ids,))
+    return universities, facilities
+
+
+def read_similar_universities(conn, university_id):
+    """The stored most-similar institutions for one university, best first, as dicts."""
+    return [dict(zip(('id', 'name', 'acronym', 'region', 'type', 'score'), row)) for row in conn.execute(
+        '''SELECT u.id, u.name, u.acronym, u.region, u.type, s.score FROM similar_universities s
+           JOIN universities u ON u.id = s.similar_id
+           WHERE s.university_id = ? ORDER BY s.position''', (university_id,))]
+
+
+def read_programs(conn):
+    return pd.read_sql_query('''SELECT university_id, name, duration, prospects, program_difficulty, difficulty_rank
+                                FROM programs ORDER BY university_id, position''', conn)
+
+
+def read_university_interests(conn):
+    """Long-form (university_id, interest, programs) counts of programs per interest category."""
+    return pd.read_sql_query('''SELECT university_id, interest, count(*) AS programs FROM program_interests
+                                GROUP BY university_id, interest''', conn)
+
+
+def read_aggregates(conn):
+    """The materialized (metric, series, position, label, value) rows, in display order."""
+    return pd.read_sql_query('SELECT metric, series, position, label, value FROM aggregates ORDER BY metric, series, position',
+                             conn)
+
+
+# --- Materialized aggregates ---
+def _quantiles(sorted_fees, percentiles):
+    return np.percentile(np.asarray(sorted_fees, dtype=np.float64), percentiles).tolist()
+
+
+def refresh_aggregates(c):
+    """Recompute every Data Insights aggregate from the current tables, inside the caller's transaction.
+
+    Metrics: region/type/difficulty counts, a fixed-width fee histogram, overall fee
+    percentiles, per-type fee five-number summaries and per-interest program/institution counts.
+    """
+    rows = []
+
+    def add(metric, pairs, series=''):
+        rows.extend((metric, series, pos, str(label), value) for pos, (label, value) in enumerate(pairs))
+
+    for metric, column in (('region_count', 'region'), ('type_count', 'type')):
+        add(metric, c.execute(f'''SELECT {column}, count(*) FROM universities WHERE {column} IS NOT NULL
+                                  GROUP BY {column} ORDER BY count(*) DESC, {column}''').fetchall())
+    difficulty = dict(c.execute('SELECT difficulty, count(*) FROM universities GROUP BY difficulty').fetchall())
+    add('difficulty_count', [(level, difficulty.get(level, 0)) for level in DIFFICULTY_LEVELS])
+    add('fee_histogram', c.execute('''SELECT avg_fees / ? * ?, count(*) FROM universities WHERE avg_fees IS NOT NULL
+                                      GROUP BY 1 ORDER BY 1''', (FEE_BIN_WIDTH, FEE_BIN_WIDTH)).fetchall())
+
+    fees_by_type = defaultdict(list)
+    for kind, fees in c.execute('SELECT type, avg_fees FROM universities WHERE avg_fees IS NOT NULL ORDER BY avg_fees'):
+        fees_by_type[kind].append(fees)
+    all_fees = sorted(fee for fees in fees_by_type.values() for fee in fees)
+    if all_fees:
+        add('fee_percentile', zip((f'p{p}' for p in FEE_PERCENTILES), _quantiles(all_fees, FEE_PERCENTILES)))
+    for kind, fees in sorted(fees_by_type.items(), key=lambda item: str(item[0])):
+        add('fee_by_type', zip(['min', 'q1', 'median', 'q3', 'max'], _quantiles(fees, [0, 25, 50, 75, 100])),
+            series=str(kind))
+
+    interests = {interest: (programs, institutions) for interest, programs, institutions in c.execute(
+        'SELECT interest, count(*), count(DISTINCT university_id) FROM program_interests GROUP BY interest')}
+    add('interest_programs', [(i, interests.get(i, (0, 0))[0]) for i in INTERESTS])
+    add('interest_institutions', [(i, interests.get(i, (0, 0))[1]) for i in INTERESTS])
+
+    c.execute('DELETE FROM aggregates')
+    c.executemany('INSERT INTO aggregates (metric, series, position, label, value) VALUES (?, ?, ?, ?, ?)', rows)
+
+
+# --- Similar universities ---
+def _similarity_vectors(c):
+    universities = pd.DataFrame(c.execute('SELECT id, type, avg_fees, difficulty FROM universities ORDER BY id').fetchall(),
+                                columns=['id', 'type', 'avg_fees', 'difficulty'])
+    programs = pd.DataFrame(c.execute('SELECT university_id, name FROM programs').fetchall(),
+                            columns=['university_id', 'name'])
+    facilities = pd.DataFrame(c.execute('SELECT university_id, name FROM facilities').fetchall(),
+                              columns=['university_id', 'name'])
+    return feature_matrix(universities, programs, facilities)
+
+
+def _stored_lists(c, university_ids):
+    return pd.DataFrame(c.execute('''SELECT university_id, similar_id, score FROM similar_universities
+                                     WHERE university_id IN (SELECT value FROM json_each(?))
+                                     ORDER BY university_id, position''', (json.dumps(university_ids),)).fetchall(),
+                        columns=['university_id', 'similar_id', 'score'])
+
+
+def refresh_similarity(c, changed=None, deleted=()):
+    """Bring the stored similar-institution lists up to date, inside the caller's transaction.
+
+    Given the ids a sync inserted or updated (`changed`) and `deleted`, only the lists those
+    edits can affect are rewritten: the changed institutions' own, lists that named a changed
+    or deleted institution (recomputed), and lists a changed institution now gets into
+    (merged). With no `changed`, or nothing stored yet, every list is rebuilt. Returns the
+    number of lists rewritten.
+    """
+    ids, vectors = _similarity_vectors(c)
+    k = min(SIMILAR_K, len(ids) - 1)
+    merged = pd.DataFrame(columns=['university_id', 'similar_id', 'score'])
+
+    if changed is None or c.execute('SELECT 1 FROM similar_universities LIMIT 1').fetchone() is None:
+        c.execute('DELETE FROM similar_universities')
+        recompute = ids
+    else:
+        touched = sorted(set(changed) | set(deleted))
+        stale = {uid for uid, in c.execute('''SELECT DISTINCT university_id FROM similar_universities
+                                               WHERE similar_id IN (SELECT value FROM json_each(?))''',
+                                            (json.dumps(touched),))} - set(touched)
+        recompute = np.array(sorted(set(changed) | stale), dtype=np.int64)
+
+        # A list takes a changed institution only if it reaches the list's last entry, or the list is short.
+        floor = np.full(len(ids), -np.inf)
+        last = np.array(c.execute('SELECT university_id, score FROM similar_universities WHERE position = ?',
+                                  (k - 1,)).fetchall(), dtype=np.float64).reshape(-1, 2)
+        # Lists of deleted institutions are still stored; searchsorted would give their floor to a neighbour.
+        rows = np.searchsorted(ids, last[:, 0])
+        present = rows < len(ids)
+        present[present] = ids[rows[present]] == last[present, 0]
+        floor[rows[present]] = last[present, 1]
+        floor[np.searchsorted(ids, recompute)] = np.inf
+        rows, neighbours, scores = candidates(vectors, np.searchsorted(ids, sorted(set(changed))), floor)
+        if len(rows):
+            merged = pd.concat([_stored_lists(c, sorted(set(ids[rows].tolist()))),
+                                pd.DataFrame({'university_id': ids[rows], 'similar_id': ids[neighbours], 'score': scores})])
+            merged = merged.sort_values(['university_id', 'score', 'similar_id'], ascending=[True, False, True])
+            merged = merged.groupby('university_id').head(k)
+        c.executemany('DELETE FROM similar_universities WHERE university_id = ?',
+                      [(int(uid),) for uid in set(touched) | stale | set(merged['university_id'])])
+
+    neighbours, scores = nearest(vectors, np.searchsorted(ids, recompute), k)
+    lists = [(int(uid), position, int(ids[row]), float(score))
+             for uid, row_neighbours, row_scores in zip(recompute, neighbours, scores)
+             for position, (row, score) in enumerate(zip(row_neighbours, row_scores))]
+    lists.extend(zip(merged['university_id'].tolist(), merged.groupby('university_id').cumcount().tolist(),
+                     merged['similar_id'].tolist(), merged['score'].tolist()))
+    c.executemany('INSERT INTO similar_universities (university_id, position, similar_id, score) VALUES (?, ?, ?, ?)',
+                  lists)
+    return len(recompute) + merged['university_id'].nunique()
+
+
+# --- Institution identities ---
+def read_identity_index(conn):
+    """An identity.IdentityIndex of every identity synced so far; new ids continue after the largest one used."""
+    known = conn.execute('SELECT name_key, acronym, region, university_id FROM university_identities').fetchall()
+    next_id = conn.execute('SELECT coalesce(max(id), 0) + 1 FROM universities').fetchone()[0]
+    return IdentityIndex(known, next_id)
+
+
+def save_identities(c, rows):
+    # (name key, acronym, region, university id) rows from identity.resolve_ids, inside the caller's transaction.
+    c.executemany('''INSERT OR REPLACE INTO university_identities (name_key, acronym, region, university_id)
+                     VALUES (?, ?, ?, ?)''', rows)
+
+
+# --- Incremental sync ---
+def _insert_children(c, universities):
+    # `universities` is an iterable of (id, programs, facilities); everything goes in two executemany calls.
+    program_rows, interest_rows, facility_rows = [], [], []
+    for uid, programs, facilities in universities:
+        program_rows.extend((uid, pos, p['name'], p.get('duration'), p.get('prospects'), p.get('program_difficulty'),
+                             difficulty_rank(p.get('program_difficulty')))
+                            for pos, p in enumerate(programs))
+        interest_rows.extend((uid, pos, interest) for pos, p in enumerate(programs)
+                             for interest in classify_program(p['name']))
+        facility_rows.extend((uid, pos, name) for pos, name in enumerate(facilities))
+    c.executemany('''INSERT INTO programs (university_id, position, name, duration, prospects,
+                                             program_difficulty, difficulty_rank)
+                     VALUES (?, ?, ?, ?, ?, ?, ?)''', program_rows)
+    c.executemany('INSERT INTO program_interests (university_id, position, interest) VALUES (?, ?, ?)',
+                  interest_rows)
+    c.executemany('INSERT INTO facilities (university_id, position, name) VALUES (?, ?, ?)', facility_rows)
+
+
+def difficulty_rank(level):
+    return DIFFICULTY_LEVELS.index(level) + 1 if level in DIFFICULTY_LEVELS else None
+
+
+def search_row(uni):
+    return (uni['id'], uni['name'], uni['acronym'], ' '.join(p['name'] for p in uni['programs']))
+
+
+def university_row(uni):
+    return tuple(uni[col] for col in UNIVERSITY_COLUMNS)
+
+
+def content_hash(uni):
+    content = {col: uni[col] for col in COLUMNS if col != 'id'}
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def sync_universities(conn, universities, source='scrape', delete_missing=True, identities=()):
+    """Diff `universities` against the table and apply only the changes, in one transaction.
+
+    `identities` (rows from identity.resolve_ids) are saved in that same transaction, so the
+    ids written and the spellings that map to them are committed together or not at all.
+    Returns the change log entry: lists of 'inserted', 'updated' and 'deleted' ids, plus the
+    'log_id' of the sync_log row recording them (None when nothing changed).
+    """
+    existing = dict(conn.execute('SELECT id, content_hash FROM universities'))
+    incoming = {uni['id']: (uni, content_hash(uni)) for uni in universities}
+
+    inserted = sorted(uid for uid in incoming if uid not in existing)
+    updated = sorted(uid for uid, (_, digest) in incoming.items() if uid in existing and existing[uid] != digest)
+    deleted = sorted(uid for uid in existing if uid not in incoming) if delete_missing else []
+    changes = {'inserted': inserted, 'updated': updated, 'deleted': deleted, 'log_id': None}
+    if not has_changes(changes):
+        with conn:
+            save_identities(conn, identities)
+        return changes
+
+    placeholders = ', '.join('?' * (len(UNIVERSITY_COLUMNS) + 1))
+    assignments = ', '.join(f'{col} = excluded.{col}' for col in UNIVERSITY_COLUMNS[1:] + ['content_hash'])
+    stale = [(uid,) for uid in updated + deleted]
+    with conn:
+        c = conn.cursor()
+        c.executemany('DELETE FROM programs WHERE university_id = ?', stale)
+        c.executemany('DELETE FROM program_interests WHERE university_id = ?', stale)
+        c.executemany('DELETE FROM facilities WHERE university_id = ?', stale)
+        c.executemany('DELETE FROM universities WHERE id = ?', [(uid,) for uid in deleted])
+        c.executemany(f'''INSERT INTO universities ({', '.join(UNIVERSITY_COLUMNS)}, content_hash)
+                          VALUES ({placeholders})
+                          ON CONFLICT(id) DO UPDATE SET {assignments}''',
+                      [university_row(incoming[uid][0]) + (incoming[uid][1],) for uid in inserted + updated])
+        _insert_children(c, ((uid, incoming[uid][0]['programs'], incoming[uid][0]['facilities'])
+                             for uid in inserted + updated))
+        c.executemany('DELETE FROM search_index WHERE rowid = ?', stale)
+        c.executemany('INSERT INTO search_index (rowid, name, acronym, programs) VALUES (?, ?, ?, ?)',
+                      [search_row(incoming[uid][0]) for uid in inserted + updated])
+        refresh_aggregates(c)
+        refresh_similarity(c, inserted + updated, deleted)
+        save_identities(c, identities)
+        c.execute('''INSERT INTO sync_log (synced_at, source, inserted, updated, deleted)
+                     VALUES (?, ?, ?, ?, ?)''',
+                  (time.time(), source, json.dumps(inserted), json.dumps(updated), json.dumps(deleted)))
+    changes['log_id'] = c.lastrowid
+    return changes
+
+
+def data_version(conn):
+    # Id of the latest sync that changed something; 0 for a database never synced.
+    return conn.execute('SELECT coalesce(max(id), 0) FROM sync_log').fetchone()[0]
+
+
+def has_changes(changes):
+    return bool(changes['inserted'] or changes['updated'] or changes['deleted'])
+
+
+# --- Sample data ---
+def insert_sample_data(conn):
+    # Fallback only: never overwrite rows that are already present.
+    existing = {row[0] for row in conn.execute('SELECT id FROM universities')}
+    missing = [dict(zip(COLUMNS, row)) for row in SAMPLE_DATA if row[0] not in existing]
+    return sync_universities(conn, missing, source='sample', delete_missing=False)
+
+
+SAMPLE_DATA = [
+    (1, "University of Dar es Salaam", "UDSM", "Dar es Salaam", "Public", 1500000, "High", "Mlimani",
+     "The oldest and largest public university in Tanzania.", ["Library", "Labs", "Dorms", "Sports Complex"],
+     [
+         {"name": "BSc in Computer Science", "duration": 3, "prospects": "Software Developer, Data Scientist", "program_difficulty": "High"},
+         {"name": "Bachelor of Laws (LLB)", "duration": 4, "prospects": "Lawyer, Legal Advisor", "program_difficulty": "High"}
+     ], "Minimum of B+ average in Science subjects."),
+    (2, "Sokoine University of Agriculture", "SUA", "Morogoro", "Public", 1300000, "Medium", "Morogoro Town",
+     "Leading in agriculture and veterinary sciences.", ["Farms", "Labs", "Library"],
+     [
+         {"name": "BSc in Agriculture", "duration": 3, "prospects": "Agricultural Officer", "program_difficulty": "Medium"},
+         {"name": "Doctor of Veterinary Medicine", "duration": 5, "prospects": "Veterinary Doctor", "program_difficulty": "High"}
+     ], "Minimum of C grades in Science subjects."),
+    (3, "Ardhi University", "ARU", "Dar es Salaam", "Public", 1400000, "Medium", "Ubungo",
+     "Specializes in land and environmental sciences.", ["GIS Lab", "Library", "Dorms"],
+     [
+         {"name": "BSc in Land Management", "duration": 4, "prospects": "Valuer, Land Officer", "program_difficulty": "Medium"},
+         {"name": "BSc in Architecture", "duration": 5, "prospects": "Architect", "program_difficulty": "Very High"}
+     ], "Minimum of C grades in Math, Physics, Geography."),
+    (4, "University of Dodoma", "UDOM", "Dodoma", "Public", 1200000, "Medium", "Dodoma City",
+     "Large university with diverse programs.", ["Lecture Halls", "Library", "Hostels"],
+     [
+         {"name": "Bachelor of Arts in Education", "duration": 3, "prospects": "Teacher", "program_difficulty": "Medium"},
+         {"name": "BSc in Nursing", "duration": 4, "prospects": "Nurse", "program_difficulty": "High"}
+     ], "Average pass in relevant subjects."),
+    (5, "St. Augustine University of Tanzania", "SAUT", "Mwanza", "Private", 2000000, "Medium", "Mwanza City",
+     "Prominent private university with multiple campuses.", ["Library", "Hostels", "Computer Labs"],
+     [
+         {"name": "Bachelor of Arts in Mass Communication", "duration": 3, "prospects": "Journalist", "program_difficulty": "Medium"},
+         {"name": "Bachelor of Business Administration", "duration": 3, "prospects": "Manager", "program_difficulty": "Medium"}
+     ], "Minimum of D grades in 4 subjects."),
+    (6, "Mzumbe University", "MU", "Morogoro", "Public", 1350000, "High", "Mzumbe Town",
+     "Renowned for public administration and law.", ["Library", "Computer Labs", "Dorms"],
+     [
+         {"name": "Bachelor of Public Administration", "duration": 3, "prospects": "Civil Servant", "program_difficulty": "High"},
+         {"name": "Bachelor of Laws (LLB)", "duration": 4, "prospects": "Lawyer", "program_difficulty": "High"}
+     ], "Strong passes in Arts subjects."),
+    (7, "Hubert Kairuki Memorial University", "HKMU", "Dar es Salaam", "Private", 4500000, "High", "Mikocheni",
+     "Specialized in health sciences.", ["Hospital", "Labs", "Library"],
+     [
+         {"name": "Doctor of Medicine", "duration": 5, "prospects": "Medical Doctor", "program_difficulty": "Very High"},
+         {"name": "BSc in Nursing", "duration": 4, "prospects": "Nurse", "program_difficulty": "High"}
+     ], "High passes in Chemistry, Biology, Physics."),
+    (8, "Nelson Mandela African Institution of Science and Technology", "NM-AIST", "Arusha", "Public", 3000000, "Very High", "Tengeru",
+     "Postgraduate-focused STEM institution.", ["Advanced Labs", "Research Centers"],
+     [
+         {"name": "MSc in Data Science", "duration": 2, "prospects": "Data Scientist", "program_difficulty": "Very High"}
+     ], "Strong Bachelor's in STEM field."),
+    (9, "Muhimbili University of Health and Allied Sciences", "MUHAS", "Dar es Salaam", "Public", 1600000, "High", "Upanga",
+     "Premier health sciences institution.", ["Teaching Hospital", "Labs", "Library"],
+     [
+         {"name": "Bachelor of Pharmacy", "duration": 4, "prospects": "Pharmacist", "program_difficulty": "High"},
+         {"name": "Doctor of Dental Surgery", "duration": 5, "prospects": "Dentist", "program_difficulty": "Very High"}
+     ], "High passes in Chemistry, Biology, Physics."),
+    (10, "Open University of Tanzania", "OUT", "Dar es Salaam", "Public", 1000000, "Low", "Kinondoni",
+     "Offers distance learning programs.", ["E-Library", "Online Platforms"],
+     [
+         {"name": "Bachelor of Business Administration (ODL)", "duration": 3, "prospects": "Business Manager", "program_difficulty": "Medium"}
+     ], "Passes in 4 subjects."),
+    (11, "Tumaini University Makumira", "TUMA", "Arusha", "Private", 1800000, "Medium", "Makumira",
+     "Faith-based university with diverse programs.", ["Library", "Hostels", "Chapel"],
+     [
+         {"name": "Bachelor of Education", "duration": 3, "prospects": "Teacher", "program_difficulty": "Medium"}
+     ], "Minimum of D grades in 4 subjects."),
+    (12, "Catholic University of Health and Allied Sciences", "CUHAS", "Mwanza", "Private", 3500000, "High", "Bugando",
+     "Focuses on health sciences.", ["Hospital", "Labs", "Library"],
+     [
+         {"name": "Doctor of Medicine", "duration": 5, "prospects": "Medical Doctor", "program_difficulty": "Very High"}
+     ], "High passes in Chemistry, Biology, Physics."),
+    (13, "St. Joseph University in Tanzania", "SJUIT", "Dar es Salaam", "Private", 2500000, "Medium", "Mbezi",
+     "Specializes in engineering and health sciences.", ["Labs", "Library", "Workshops"],
+     [
+         {"name": "BSc in Civil Engineering", "duration": 4, "prospects": "Civil Engineer", "program_difficulty": "High"}
+     ], "Minimum of C grades in Math, Physics."),
+    (14, "Teofilo Kisanji University", "TEKU", "Mbeya", "Private", 1700000, "Medium", "Mbeya City",
+     "Offers diverse academic programs.", ["Library", "Hostels", "Computer Labs"],
+     [
+         {"name": "Bachelor of Business Administration", "duration": 3, "prospects": "Manager", "program_difficulty": "Medium"}
+     ], "Minimum of D grades in 4 subjects."),
+    (15, "Muslim University of Morogoro", "MUM", "Morogoro", "Private", 1600000, "Medium", "Morogoro",
+     "Faith-based with focus on arts and sciences.", ["Library", "Mosque", "Hostels"],
+     [
+         {"name": "Bachelor of Arts in Education", "duration": 3, "prospects": "Teacher", "program_difficulty": "Medium"}
+     ], "Minimum of D grades in 4 subjects.")
+]
@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from database import DIFFICULTY_LEVELS
+from taxonomy import INTERESTS
+
+# Budget choices offered by the wizard and Explore fee sliders, in TZS.
+BUDGET_STEPS = tuple(range(1000000, 10000001, 500000))
+# Facets in the order their choices are intersected, so Explore and the wizard share prefixes.
+FACETS = ('search', 'region', 'type', 'max_fees', 'academic_interest', 'difficulty')
+CACHE_SIZE = 1024
+
+
+def pack(mask):
+    """A boolean mask as a bitset of uint64 words: bit i (little-endian) is mask[i]."""
+    packed = np.zeros(-(-len(mask) // 64) * 8, dtype=np.uint8)
+    bits = np.packbits(mask, bitorder='little')
+    packed[:len(bits)] = bits
+    return packed.view(np.uint64)
+
+
+# --- Facet index ---
+class FacetIndex:
+    """Live match counts for every option of every filter over one version of the catalog.
+
+    Each (facet, value) choice is a packed bitset of the institutions that satisfy it (for
+    max_fees, those at or under the budget). The matches for a set of choices are the AND of
+    their bitsets taken in FACETS order and memoized per prefix, so a further choice costs one
+    intersection; a facet's option counts are then one AND and popcount per option. Results
+    live in a bounded LRU keyed by (data version, choices).
+
+    `interests` is the long-form table from database.read_university_interests. `search` maps
+    query text to university ids, as for query.QueryEngine, and backs the 'search' facet.
+    """
+
+    def __init__(self, catalog, interests, version=None, search=None, cache_size=CACHE_SIZE):
+        df = catalog.universities
+        self.catalog = catalog
+        self.version = version
+        self.search = search
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = len(df)
+        self._all = pack(np.ones(self.size, dtype=bool))
+        self._none = pack(np.zeros(self.size, dtype=bool))
+
+        self._bits = {}
+        for facet in ('region', 'type', 'difficulty'):
+            codes = df[facet].cat.codes.to_numpy()
+            for code, value in enumerate(df[facet].cat.categories):
+                self._bits[facet, value] = pack(codes == code)
+        rows = catalog.rows(interests['university_id'].to_numpy())
+        has_programs = (rows >= 0) & (interests['programs'].to_numpy() > 0)
+        for value in INTERESTS:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[rows[has_programs & (interests['interest'] == value).to_numpy()]] = True
+            self._bits['academic_interest', value] = pack(mask)
+        fees = df['avg_fees'].to_numpy(dtype=np.float64, na_value=np.nan)
+        self._fee_order = np.argsort(fees, kind='stable')
+        self._sorted_fees = fees[self._fee_order]
+        for budget in BUDGET_STEPS:
+            self._bits['max_fees', budget] = self._budget(budget)
+
+        self.options = {
+            'region': list(df['region'].cat.categories),
+            'type': list(df['type'].cat.categories),
+            'max_fees': list(BUDGET_STEPS),
+            'academic_interest': list(INTERESTS),
+            'difficulty': list(DIFFICULTY_LEVELS),
+        }
+        # Every option's bitset stacked per facet, so one broadcast AND covers them all.
+        self._stacks = {facet: np.stack([self._bitset(facet, value) for value in values]) if values
+                        else np.zeros((0, len(self._all)), dtype=np.uint64)
+                        for facet, values in self.options.items()}
+
+    def _budget(self, budget):
+        cut = np.searchsorted(self._sorted_fees, budget, side='right')
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self._fee_order[:cut]] = True
+        return pack(mask)
+
+    def _bitset(self, facet, value):
+        if (facet, value) in self._bits:
+            return self._bits[facet, value]
+        if facet == 'max_fees':
+            return self._budget(value)
+        if facet == 'search':
+            mask = np.zeros(self.size, dtype=bool)
+            rows = self.catalog.rows(np.asarray(self.search(value), dtype=np.int64))
+            mask[rows[rows >= 0]] = True
+            return pack(mask)
+        # Values absent from this catalog version match nothing.
+        return self._none
+
+    @staticmethod
+    def _choices(choices, exclude=None):
+        # (facet, value) pairs in FACETS order, without unanswered ones or the facet being counted.
+        choices = dict(choices)
+        return tuple((facet, choices[facet]) for facet in FACETS
+                     if facet != exclude and choices.get(facet) not in (None, ''))
+
+    def _cached(self, key, compute):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        result = compute()
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _matches(self, choices):
+        if not choices:
+            return self._all
+        return self._cached((self.version, 'matches', choices),
+                            lambda: self._matches(choices[:-1]) & self._bitset(*choices[-1]))
+
+    def count(self, choices):
+        """Institutions matching every choice; `choices` maps facet to value (None for any)."""
+        return int(np.bitwise_count(self._matches(self._choices(choices))).sum())
+
+    def counts(self, choices, facet):
+        """{option: matches} for each of `facet`'s options, given the choices on the other facets."""
+        choices = self._choices(choices, exclude=facet)
+
+        def compute():
+            totals = np.bitwise_count(self._stacks[facet] & self._matches(choices)).sum(axis=1)
+            return dict(zip(self.options[facet], totals.tolist()))
+        return self._cached((self.version, 'counts', facet, choices), compute)
@@ -0,0 +1,242 @@
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher, get_close_matches
+from functools import lru_cache
+from typing import NamedTuple
+
+# The 31 regions of Tanzania (26 mainland, 5 in Zanzibar), as the Region filter shows them.
+REGIONS = ['Arusha', 'Dar es Salaam', 'Dodoma', 'Geita', 'Iringa', 'Kagera', 'Katavi', 'Kigoma', 'Kilimanjaro',
+           'Lindi', 'Manyara', 'Mara', 'Mbeya', 'Morogoro', 'Mtwara', 'Mwanza', 'Njombe', 'Pwani', 'Rukwa',
+           'Ruvuma', 'Shinyanga', 'Simiyu', 'Singida', 'Songwe', 'Tabora', 'Tanga',
+           'Kaskazini Pemba', 'Kaskazini Unguja', 'Kusini Pemba', 'Kusini Unguja', 'Mjini Magharibi']
+# Other names a head office goes by: English region names, districts and towns, mapped to their region.
+REGION_ALIASES = {
+    'Dar es Salaam': ['dar', 'dsm', 'ilala', 'kinondoni', 'temeke', 'ubungo', 'kigamboni', 'mlimani'],
+    'Pwani': ['coast', 'kibaha', 'bagamoyo', 'mkuranga', 'kisarawe'],
+    'Kilimanjaro': ['moshi', 'rombo', 'hai', 'mwanga'],
+    'Kagera': ['bukoba', 'karagwe', 'ngara'],
+    'Ruvuma': ['songea', 'mbinga'],
+    'Mara': ['musoma', 'tarime', 'bunda'],
+    'Rukwa': ['sumbawanga'],
+    'Katavi': ['mpanda'],
+    'Songwe': ['tunduma', 'vwawa', 'mbozi'],
+    'Mbeya': ['tukuyu', 'rungwe', 'uyole'],
+    'Iringa': ['mafinga', 'mkwawa'],
+    'Njombe': ['makambako'],
+    'Manyara': ['babati', 'mbulu'],
+    'Arusha': ['karatu', 'usa river', 'tengeru', 'monduli'],
+    'Shinyanga': ['kahama'],
+    'Simiyu': ['bariadi'],
+    'Tanga': ['lushoto', 'korogwe', 'muheza'],
+    'Morogoro': ['ifakara', 'mzumbe', 'kilosa'],
+    'Mwanza': ['nyamagana', 'ilemela', 'bugando'],
+    'Mjini Magharibi': ['zanzibar', 'unguja', 'zanzibar urban west', 'urban west'],
+    'Kaskazini Pemba': ['pemba north', 'north pemba', 'wete'],
+    'Kusini Pemba': ['pemba south', 'south pemba', 'chake chake'],
+    'Kaskazini Unguja': ['unguja north', 'north unguja', 'zanzibar north'],
+    'Kusini Unguja': ['unguja south', 'south unguja', 'zanzibar south'],
+}
+# Spellings folded together in name keys.
+NAME_ABBREVIATIONS = {'univ': 'university', 'uni': 'university', 'inst': 'institute', 'coll': 'college',
+                      'st': 'saint', 'mt': 'mount', 'tech': 'technology', 'center': 'centre', 'tz': 'tanzania',
+                      'sci': 'science', 'sciences': 'science', 'studies': 'study'}
+NAME_STOPWORDS = {'the', 'of', 'and', 'for', 'in', 'at', 'a'}
+# Words that tell apart institutions whose names are otherwise the same ("... Mwanza Campus").
+QUALIFIER_WORDS = {'campus', 'centre', 'college', 'school', 'branch'}
+
+# Names at least this similar (difflib ratio of their keys) can be the same institution.
+NAME_THRESHOLD = 0.88
+# Near-identical records within one run are the same listing seen twice.
+DUPLICATE_THRESHOLD = 0.97
+# Blocks larger than this say little about a record ("university" in Arusha) and are not searched.
+MAX_BLOCK = 64
+
+
+# --- Normalization ---
+def fold(text):
+    """Lower-case ASCII words: accents, punctuation and spacing variants removed."""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower().replace('&', ' and ')).split())
+
+
+_REGION_NAMES = {fold(name): name for name in REGIONS}
+_REGION_NAMES.update({alias: region for region, aliases in REGION_ALIASES.items() for alias in aliases})
+_LONGEST_ALIAS = max(len(name.split()) for name in _REGION_NAMES)
+
+
+def _places(words):
+    # Regions named in a word sequence, by exact phrase, last mention first.
+    found = []
+    for end in range(len(words), 0, -1):
+        for size in range(min(_LONGEST_ALIAS, end), 0, -1):
+            region = _REGION_NAMES.get(' '.join(words[end - size:end]))
+            if region:
+                found.append(region)
+                break
+    return found
+
+
+@lru_cache(maxsize=4096)
+def canonical_region(head_office):
+    """The REGIONS entry a head office string refers to, or the cleaned string if none does.
+
+    Tries the whole string, then the last place named in it ("P.O. Box 35091, Dar es Salaam"),
+    then close spellings ("Dar-es-Salam"). Head offices repeat heavily, so results are memoized.
+    """
+    folded = fold(head_office)
+    if folded in _REGION_NAMES:
+        return _REGION_NAMES[folded]
+    places = _places(folded.split())
+    if places:
+        return places[0]
+    close = get_close_matches(folded, _REGION_NAMES, n=1, cutoff=0.85)
+    if close:
+        return _REGION_NAMES[close[0]]
+    return ' '.join((head_office or '').split()).strip(' ,.-') or 'Unknown'
+
+
+def name_key(name):
+    """Canonical key of an institution name: folded, abbreviations expanded, stopwords dropped."""
+    words = (NAME_ABBREVIATIONS.get(word, word) for word in fold(name).split())
+    return ' '.join(word for word in words if word not in NAME_STOPWORDS)
+
+
+def acronym_key(acronym):
+    return re.sub(r'[^A-Z0-9]', '', unicodedata.normalize('NFKD', acronym or '').upper())
+
+
+class Identity(NamedTuple):
+    key: str        # name_key of the name
+    acronym: str    # acronym_key of the acronym, '' if none
+    region: str     # canonical_region of the head office
+
+
+def identity(record):
+    return Identity(name_key(record['name']), acronym_key(record.get('acronym')), record['region'])
+
+
+def normalize_record(record):
+    """`record` with its name cleaned and its region canonical; the raw head office stays as `location`."""
+    return dict(record, name=' '.join(record['name'].split()).strip(' ,.-'),
+                region=canonical_region(record['region']),
+                location=' '.join((record.get('location') or record['region']).split()))
+
+
+@lru_cache(maxsize=65536)
+def _qualifiers(key):
+    # Words of `key` that set it apart: numbers, place names and QUALIFIER_WORDS.
+    words = key.split()
+    places = {word for region in _places(words) for word in fold(region).split()}
+    return frozenset(word for word in words if word.isdigit() or word in QUALIFIER_WORDS or word in places)
+
+
+def _conflicting(key, other):
+    # True if one name has a qualifier the other lacks: a different number, or a place or "campus" that
+    # the other does not spell at all (a misspelling, "Morogroo", is not a conflict).
+    mine, theirs = _qualifiers(key), _qualifiers(other)
+    for word in mine ^ theirs:
+        if word.isdigit() or not get_close_matches(word, (other if word in mine else key).split(), n=1, cutoff=0.75):
+            return True
+    return False
+
+
+# --- Matching ---
+class IdentityIndex:
+    """Identities seen so far, each mapped to its university id, with blocks for fuzzy lookups.
+
+    An identity is looked up exactly first. Failing that, it is compared with the identities
+    that share its acronym, its name key, or its region and one of its name words (blocking),
+    so each lookup costs a handful of comparisons however many institutions there are.
+    Candidates must agree on the words that set institutions apart (numbers, places,
+    "campus"), and on the acronym when both have one.
+    """
+
+    def __init__(self, known=(), next_id=1):
+        self.exact = {}
+        self.blocks = defaultdict(list)
+        self.next_id = next_id
+        self.comparisons = 0
+        for key, acronym, region, university_id in known:
+            self.add(Identity(key, acronym, region), university_id)
+
+    @staticmethod
+    def _block_keys(ident):
+        keys = [f'k:{ident.key}']
+        if ident.acronym:
+            keys.append(f'a:{ident.acronym}')
+        keys.extend(f'r:{ident.region}:{word}' for word in set(ident.key.split()))
+        return keys
+
+    def add(self, ident, university_id):
+        if ident in self.exact:
+            return
+        self.exact[ident] = university_id
+        for block in self._block_keys(ident):
+            self.blocks[block].append(ident)
+        self.next_id = max(self.next_id, university_id + 1)
+
+    def new_id(self):
+        self.next_id += 1
+        return self.next_id - 1
+
+    def _score(self, ident, other):
+        # Name similarity if `other` may be the same institution as `ident`, else 0.
+        if _conflicting(ident.key, other.key):
+            return 0.0
+        if ident.acronym and other.acronym and ident.acronym != other.acronym and ident.key != other.key:
+            return 0.0
+        if ident.region != other.region and not (ident.acronym and ident.acronym == other.acronym):
+            return 0.0
+        self.comparisons += 1
+        matcher = SequenceMatcher(None, ident.key, other.key, autojunk=False)
+        if matcher.real_quick_ratio() < NAME_THRESHOLD or matcher.quick_ratio() < NAME_THRESHOLD:
+            return 0.0
+        return matcher.ratio()
+
+    def match(self, ident, claimed=()):
+        """(university id, 'exact' or 'fuzzy') for `ident`, or (None, None).
+
+        An id in `claimed` is already taken by another record of this run; it is only
+        returned for a near-identical record, i.e. the same listing seen twice.
+        """
+        if ident in self.exact:
+            return self.exact[ident], 'exact'
+        best, best_score = None, NAME_THRESHOLD
+        candidates = set()
+        for block in self._block_keys(ident):
+            members = self.blocks.get(block, ())
+            if len(members) <= MAX_BLOCK:
+                candidates.update(members)
+        for other in candidates:
+            score = self._score(ident, other)
+            if self.exact[other] in claimed and score < DUPLICATE_THRESHOLD:
+                continue
+            if score >= best_score and (best is None or score > best_score or other < best):
+                best, best_score = other, score
+        return (self.exact[best], 'fuzzy') if best is not None else (None, None)
+
+
+def resolve_ids(records, index):
+    """Normalize `records` and give each the stable id of the institution it is.
+
+    Returns (records with their ids, one per institution; identity rows (key, acronym,
+    region, id) to remember, including every spelling seen this run; counts of 'exact',
+    'fuzzy' and 'new' matches and of 'duplicates' dropped).
+    """
+    kept, rows = {}, []
+    stats = {'exact': 0, 'fuzzy': 0, 'new': 0, 'duplicates': 0}
+    for record in records:
+        record = normalize_record(record)
+        ident = identity(record)
+        university_id, how = index.match(ident, kept)
+        if university_id is None:
+            university_id, how = index.new_id(), 'new'
+        if university_id in kept:
+            stats['duplicates'] += 1
+        else:
+            kept[university_id] = dict(record, id=university_id)
+            stats[how] += 1
+        index.add(ident, university_id)
+        rows.append((*ident, university_id))
+    return list(kept.values()), rows, stats
@@ -0,0 +1,264 @@
+import argparse
+import json
+import sys
+import threading
+import time
+
+import requests
+
+from crawler import HtmlCache, crawl, replay_details, replay_listing
+from database import Database, data_version, insert_sample_data, read_identity_index, sync_universities
+from identity import resolve_ids
+from scraper import TCU_LISTING_URL, fetch_listing_pages
+from snapshot import snapshot_dir, write_snapshot
+
+# Placeholders for institutions whose detail page could not be fetched or lacks a field.
+GENERIC_PROGRAMS = [
+    {"name": "General Studies", "duration": 3, "prospects": "Diverse career paths", "program_difficulty": "Medium"},
+    {"name": "Diploma in Business", "duration": 2, "prospects": "Small business management", "program_difficulty": "Low"}
+]
+GENERIC_FACILITIES = ["Library", "Labs"]
+# A running job whose heartbeat is older than this is taken to have crashed and stops blocking new ingests.
+JOB_STALE_AFTER = 15 * 60
+# Detail crawl progress is written to the job every this many pages.
+DETAIL_PROGRESS_EVERY = 25
+JOB_COLUMNS = ['id', 'source', 'status', 'started_at', 'heartbeat_at', 'finished_at', 'pages', 'rows', 'message', 'result']
+
+
+class IngestBusy(Exception):
+    """Another ingest is already running against this database."""
+
+
+# --- Records ---
+def build_records(pages, details=None):
+    """University records from fetch_listing_pages output, in listing order and without ids (see resolve_ids).
+
+    `details` maps detail URLs to crawler.parse_detail_page output, which overrides the placeholders.
+    """
+    details = details or {}
+    records = []
+    for rows in pages:
+        for row in rows:
+            records.append({
+                **row,
+                'description': f"This is a {row['type']} institution located in {row['region']}, Tanzania. It is renowned for its contributions to various fields of study.",
+                'facilities': GENERIC_FACILITIES,
+                'programs': GENERIC_PROGRAMS,
+                'admission_requirements': "Minimum of D grades in 4 relevant subjects (placeholder).",
+                **details.get(row.get('detail_url'), {}),
+            })
+    return records
+
+
+# --- Job bookkeeping ---
+def claim_job(conn, source):
+    """Record a new running job, or raise IngestBusy if one is live. Needs the writer connection."""
+    now = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        running = conn.execute("SELECT id FROM ingest_jobs WHERE status = 'running' AND heartbeat_at > ?",
+                               (now - JOB_STALE_AFTER,)).fetchone()
+        if running:
+            raise IngestBusy(f"Data update {running[0]} is already running.")
+        conn.execute("UPDATE ingest_jobs SET status = 'abandoned', finished_at = ? WHERE status = 'running'", (now,))
+        job_id = conn.execute('''INSERT INTO ingest_jobs (source, status, started_at, heartbeat_at, message)
+                                 VALUES (?, 'running', ?, ?, 'Starting')''', (source, now, now)).lastrowid
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return job_id
+
+
+def update_job(conn, job_id, **fields):
+    # Progress update; also refreshes the heartbeat that keeps the job's lock alive.
+    fields['heartbeat_at'] = time.time()
+    with conn:
+        conn.execute(f"UPDATE ingest_jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+                     (*fields.values(), job_id))
+
+
+def finish_job(conn, job_id, result):
+    update_job(conn, job_id, status=result['status'], finished_at=time.time(), message=result['message'],
+               result=json.dumps(result))
+
+
+def read_job(conn, job_id=None):
+    """A job as a dict (latest job if `job_id` is None), with `result` decoded; None if there is none."""
+    if job_id is None:
+        row = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM ingest_jobs ORDER BY id DESC LIMIT 1").fetchone()
+    else:
+        row = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(zip(JOB_COLUMNS, row))
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+
+# --- Pipeline ---
+def run_ingest(db, source='cli', url=TCU_LISTING_URL, fetch=fetch_listing_pages, job_id=None, details=True,
+               offline=False, cache_dir=None):
+    """Scrape the TCU listing and institution pages into `db` as one recorded job; returns its structured result.
+
+    Raw pages go to a crawler.HtmlCache under `cache_dir`; with `offline` nothing is fetched
+    and everything is re-parsed from that cache. Falls back to the sample data if the listing
+    fails or is empty, and to placeholders for institutions without a usable detail page.
+    Raises IngestBusy if another ingest holds the job lock; every other failure is reported
+    in the result.
+    """
+    if job_id is None:
+        with db.write() as conn:
+            job_id = claim_job(conn, source)
+    start = time.perf_counter()
+    progress = {'pages': 0, 'rows': 0}
+    lock = threading.Lock()
+
+    def on_page(page, page_url, n_rows):
+        # Empty pages past the end of the listing are fetched too, but are not listing pages.
+        if not n_rows:
+            return
+        with lock:
+            progress['pages'] += 1
+            progress['rows'] += n_rows
+            fields = dict(progress, message=f"Fetched page {page} ({n_rows} universities)")
+        with db.write() as conn:
+            update_job(conn, job_id, **fields)
+
+    result = {'job_id': job_id, 'status': 'succeeded', 'message': None}
+    cache = None
+    try:
+        cache = HtmlCache(cache_dir)
+        try:
+            if offline:
+                pages = replay_listing(url, cache)
+            else:
+                pages = fetch(url, on_page=on_page, cache=cache)
+        except requests.exceptions.RequestException as e:
+            pages, result['message'] = [], f"Network or HTTP error during scraping: {e}."
+        except Exception as e:
+            pages, result['message'] = [], f"An unexpected error occurred during scraping: {e}."
+        # Count what was kept: pages after a gap or a failure were fetched but are dropped.
+        progress.update(pages=len(pages), rows=sum(len(rows) for rows in pages))
+
+        detail_pages = {}
+        detail_urls = [row['detail_url'] for rows in pages for row in rows if row.get('detail_url')]
+        if details and detail_urls:
+            result['details'] = crawl_details(db, job_id, detail_urls, cache, offline)
+            detail_pages = result['details'].pop('pages')
+        records = build_records(pages, detail_pages)
+        if records:
+            # Stable ids: each record is matched to the institution it was listed as before, whatever its spelling.
+            with db.read() as conn:
+                index = read_identity_index(conn)
+            records, identities, result['matching'] = resolve_ids(records, index)
+
+        with db.write() as conn:
+            if records:
+                update_job(conn, job_id, message=f"Saving {len(records)} universities")
+                changes = sync_universities(conn, records, identities=identities)
+                result['message'] = (f"Successfully scraped {len(records)} universities from TCU: "
+                                     f"{len(changes['inserted'])} new, {len(changes['updated'])} updated, "
+                                     f"{len(changes['deleted'])} removed.")
+            else:
+                result['status'] = 'fallback'
+                result['message'] = (result['message'] or "Scraping returned no data.") + " Using sample data."
+                changes = insert_sample_data(conn)
+            result['version'] = data_version(conn)
+        result.update(universities=len(records), inserted=len(changes['inserted']),
+                      updated=len(changes['updated']), deleted=len(changes['deleted']))
+        # Workers cold-start from this columnar copy; without one they read SQLite, so a failure is only reported.
+        try:
+            with db.read() as conn:
+                write_snapshot(conn, snapshot_dir(db.path))
+        except OSError as e:
+            result['snapshot_error'] = str(e)
+    except Exception as e:
+        result.update(status='failed', message=f"Data update failed: {e}")
+    finally:
+        if cache is not None:
+            cache.close()
+    result.update(progress, duration=round(time.perf_counter() - start, 3))
+    with db.write() as conn:
+        finish_job(conn, job_id, result)
+    return result
+
+
+def crawl_details(db, job_id, urls, cache, offline=False):
+    """Refresh (unless `offline`) and parse the detail pages; returns crawl counts plus 'pages' by URL.
+
+    A failed crawl is reported under 'error' rather than failing the ingest, which then uses
+    whatever the cache already holds.
+    """
+    counts = {'downloaded': 0, 'not_modified': 0, 'failed': 0}
+    if not offline:
+        done = [0]
+        lock = threading.Lock()
+
+        def on_fetch(detail_url, status):
+            with lock:
+                done[0] += 1
+                n = done[0]
+            if n % DETAIL_PROGRESS_EVERY == 0 or n == len(urls):
+                with db.write() as conn:
+                    update_job(conn, job_id, message=f"Fetched {n} of {len(urls)} institution pages")
+
+        try:
+            counts = crawl(urls, cache, on_fetch=on_fetch)
+        except Exception as e:
+            counts['error'] = f"Detail crawl failed: {e}"
+    pages = replay_details(urls, cache)
+    return dict(counts, parsed=len(pages), pages=pages)
+
+
+class IngestWorker:
+    """Runs ingests on a background thread so no session waits on a scrape.
+
+    The job lock lives in the database, so an ingest already running in another process
+    (say, the CLI from cron) blocks start() too.
+    """
+
+    def __init__(self, db, **options):
+        self.db = db
+        self.options = options
+
+    def start(self, source='ui'):
+        """Claim a job and run it in the background; returns its id or raises IngestBusy."""
+        with self.db.write() as conn:
+            job_id = claim_job(conn, source)
+        thread = threading.Thread(target=run_ingest, args=(self.db,), name=f"ingest-{job_id}", daemon=True,
+                                  kwargs=dict(self.options, source=source, job_id=job_id))
+        thread.start()
+        return job_id
+
+    def status(self, job_id=None):
+        with self.db.read() as conn:
+            return read_job(conn, job_id)
+
+
+# --- Command line ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the university catalog from TCU without the UI (e.g. from cron). "
+                                                 "Prints the job result as JSON.")
+    parser.add_argument('--db', help="Database file (default: STACKUNIVERSITY_DB or universities.db)")
+    parser.add_argument('--url', default=TCU_LISTING_URL, help="Listing URL to scrape")
+    parser.add_argument('--cache-dir', help="Raw page cache (default: STACKUNIVERSITY_CACHE or .cache/html)")
+    parser.add_argument('--no-details', action='store_true', help="Skip the per-institution detail crawl")
+    parser.add_argument('--offline', action='store_true', help="Re-parse cached pages without fetching anything")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    try:
+        result = run_ingest(db, source='cli', url=args.url, details=not args.no_details, offline=args.offline,
+                            cache_dir=args.cache_dir)
+    except IngestBusy as e:
+        print(json.dumps({'status': 'busy', 'message': str(e)}))
+        return 2
+    finally:
+        db.close()
+    print(json.dumps(result))
+    return 0 if result['status'] == 'succeeded' else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+from database import FEE_BIN_WIDTH
+
+BAR_COLORS = {'region': '#3b82f6', 'difficulty': '#f97316', 'fees': '#8b5cf6', 'interest': '#14b8a6'}
+TYPE_COLORS = {"Public": "#3b82f6", "Private": "#22c55e"}
+
+
+# --- Chart payloads ---
+def _metric(aggregates, metric):
+    rows = aggregates[aggregates['metric'] == metric]
+    return rows['label'].tolist(), rows['value'].tolist(), rows['series'].tolist()
+
+
+def _counts(values):
+    return [int(v) for v in values]
+
+
+def _bar(labels, values, color, y_name, rotate=0):
+    return {
+        "tooltip": {"trigger": "axis", "axisPointer": {"type": "shadow"}},
+        "xAxis": {"type": "category", "data": labels, "axisLabel": {"interval": 0, "rotate": rotate}},
+        "yAxis": {"type": "value", "name": y_name},
+        "series": [{"data": values, "type": "bar", "itemStyle": {"color": color}}],
+    }
+
+
+def _millions(fees):
+    return f"{fees / 1e6:g}M"
+
+
+def chart_options(aggregates):
+    """ECharts option dicts for the Data Insights tab, built from database.read_aggregates rows.
+
+    Also returns the overall fee percentiles under 'fee_percentiles' ({'p50': ..., ...}).
+    """
+    charts = {}
+    labels, values, _ = _metric(aggregates, 'region_count')
+    charts['region'] = _bar(labels, _counts(values), BAR_COLORS['region'], "Number of Universities", rotate=45)
+
+    labels, values, _ = _metric(aggregates, 'type_count')
+    charts['type'] = {
+        "tooltip": {"trigger": "item", "formatter": "{a} <br/>{b}: {c} ({d}%)"},
+        "legend": {"bottom": "0%", "left": "center", "data": labels},
+        "series": [{
+            "name": "University Type",
+            "type": "pie",
+            "radius": ["40%", "70%"],
+            "avoidLabelOverlap": False,
+            "label": {"show": False, "position": "center"},
+            "emphasis": {"label": {"show": True, "fontSize": "20", "fontWeight": "bold"}},
+            "labelLine": {"show": False},
+            "data": [{"value": v, "name": k, "itemStyle": {"color": TYPE_COLORS.get(k, '#94a3b8')}}
+                     for k, v in zip(labels, _counts(values))],
+        }]
+    }
+
+    labels, values, _ = _metric(aggregates, 'difficulty_count')
+    charts['difficulty'] = _bar(labels, _counts(values), BAR_COLORS['difficulty'], "Number of Universities")
+
+    labels, values, _ = _metric(aggregates, 'fee_histogram')
+    bins = [f"{_millions(int(start))}–{_millions(int(start) + FEE_BIN_WIDTH)}" for start in labels]
+    charts['fee_histogram'] = _bar(bins, _counts(values), BAR_COLORS['fees'], "Number of Universities", rotate=45)
+
+    labels, values, series = _metric(aggregates, 'fee_by_type')
+    types = list(dict.fromkeys(series))
+    summaries = {kind: [] for kind in types}
+    for kind, value in zip(series, values):
+        summaries[kind].append(round(value))
+    charts['fee_by_type'] = {
+        "tooltip": {"trigger": "item"},
+        "xAxis": {"type": "category", "data": types},
+        "yAxis": {"type": "value", "name": "Average Fees (TZS)"},
+        "series": [{"name": "Fees", "type": "boxplot", "data": [summaries[kind] for kind in types],
+                    "itemStyle": {"color": "#e0e7ff", "borderColor": BAR_COLORS['region']}}],
+    }
+
+    labels, values, _ = _metric(aggregates, 'interest_programs')
+    _, institutions, _ = _metric(aggregates, 'interest_institutions')
+    charts['interest'] = {
+        "tooltip": {"trigger": "axis", "axisPointer": {"type": "shadow"}},
+        "legend": {"bottom": "0%", "left": "center", "data": ["Programs", "Universities"]},
+        "xAxis": {"type": "category", "data": labels, "axisLabel": {"interval": 0, "rotate": 30}},
+        "yAxis": {"type": "value"},
+        "series": [
+            {"name": "Programs", "data": _counts(values), "type": "bar", "itemStyle": {"color": BAR_COLORS['interest']}},
+            {"name": "Universities", "data": _counts(institutions), "type": "bar", "itemStyle": {"color": "#94a3b8"}},
+        ],
+    }
+
+    labels, values, _ = _metric(aggregates, 'fee_percentile')
+    charts['fee_percentiles'] = dict(zip(labels, values))
+    return charts
@@ -0,0 +1,236 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+# STACKUNIVERSITY_DEBUG=1 (or ?debug=1 in the app URL) shows the per-rerun timing panel.
+DEBUG_ENV = 'STACKUNIVERSITY_DEBUG'
+# Optional exports: one JSON line per rerun, and a Prometheus text file (e.g. for
+# node_exporter's textfile collector) rewritten at most every PROMETHEUS_INTERVAL seconds.
+METRICS_LOG = os.environ.get('STACKUNIVERSITY_METRICS_LOG')
+PROMETHEUS_FILE = os.environ.get('STACKUNIVERSITY_PROMETHEUS_FILE')
+PROMETHEUS_INTERVAL = 10.0
+# Reruns kept for the percentiles.
+WINDOW = 1000
+QUANTILES = [0.5, 0.95]
+
+
+def percentile(values, q):
+    # Nearest-rank percentile of an unsorted sequence; None if empty.
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+# --- One script run ---
+class Rerun:
+    """Phase timings and loader cache hits/misses of one script run.
+
+    Phases are laps: lap(name) closes the phase that started at the previous lap. `scope` is
+    'app' for a full script run, or the fragment's name for a fragment-only rerun.
+    """
+
+    def __init__(self, scope='app'):
+        self.scope = scope
+        self.started_at = time.time()
+        self._start = self._last = time.perf_counter()
+        self.phases = []
+        self.cache = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self.total_ms = None
+        self.status = 'ok'
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._last) * 1000))
+        self._last = now
+
+    def finish(self, status='ok'):
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+        self.status = status
+
+    def record(self):
+        return {'ts': round(self.started_at, 3), 'scope': self.scope, 'status': self.status,
+                'total_ms': round(self.total_ms, 3),
+                'phases': {name: round(ms, 3) for name, ms in self.phases},
+                'cache': {name: dict(counts) for name, counts in self.cache.items()}}
+
+
+# --- Process-wide aggregation ---
+class Metrics:
+    """Rerun latencies, phase timings and loader cache counters for this server process.
+
+    Each Streamlit session runs its script on its own thread, so the current rerun is
+    thread-local; lap() and cache counting outside a rerun (e.g. in a fragment not timed with
+    fragment()) are no-ops apart from the process totals.
+    """
+
+    def __init__(self, window=WINDOW, log_path=METRICS_LOG, prometheus_path=PROMETHEUS_FILE):
+        self.log_path = log_path
+        self.prometheus_path = prometheus_path
+        self.totals = deque(maxlen=window)
+        self.phases = defaultdict(lambda: deque(maxlen=window))
+        self.fragments = defaultdict(lambda: deque(maxlen=window))
+        self.cache = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self.count = 0
+        self.sum_ms = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._prometheus_written = 0.0
+
+    def current(self):
+        return getattr(self._local, 'rerun', None)
+
+    @contextmanager
+    def rerun(self, scope='app'):
+        """Time one script run; its record is aggregated and exported when the block exits."""
+        rerun = self._local.rerun = Rerun(scope)
+        try:
+            yield rerun
+        except BaseException as e:
+            # Streamlit's rerun/stop requests unwind the script with exceptions.
+            rerun.finish(type(e).__name__)
+            raise
+        else:
+            rerun.finish()
+        finally:
+            self._local.rerun = None
+            self._record(rerun)
+
+    @contextmanager
+    def fragment(self, name):
+        """Time a fragment body: its own record on fragment-only reruns, plain laps inside a full run."""
+        if self.current() is not None:
+            yield
+            return
+        with self.rerun(scope=name):
+            yield
+
+    def lap(self, name):
+        rerun = self.current()
+        if rerun is not None:
+            rerun.lap(name)
+
+    def cached(self, cache_decorator):
+        """Apply a Streamlit cache decorator and count hits and misses per loader.
+
+        The wrapped body only runs on a miss, so misses are counted inside it and hits are
+        the remaining calls. wraps() keeps each loader's own name and source in its cache key.
+        """
+        def decorate(fn):
+            name = fn.__name__
+
+            @wraps(fn)
+            def body(*args, **kwargs):
+                self._count(name, 'misses')
+                return fn(*args, **kwargs)
+
+            cached = cache_decorator(body)
+
+            @wraps(fn)
+            def call(*args, **kwargs):
+                misses = getattr(self._local, 'misses', 0)
+                try:
+                    return cached(*args, **kwargs)
+                finally:
+                    if getattr(self._local, 'misses', 0) == misses:
+                        self._count(name, 'hits')
+
+            call.clear = cached.clear
+            return call
+        return decorate
+
+    def _count(self, name, kind):
+        if kind == 'misses':
+            self._local.misses = getattr(self._local, 'misses', 0) + 1
+        with self._lock:
+            self.cache[name][kind] += 1
+        rerun = self.current()
+        if rerun is not None:
+            rerun.cache[name][kind] += 1
+
+    def _record(self, rerun):
+        with self._lock:
+            if rerun.scope == 'app':
+                self.count += 1
+                self.sum_ms += rerun.total_ms
+                self.totals.append(rerun.total_ms)
+            else:
+                self.fragments[rerun.scope].append(rerun.total_ms)
+            for name, ms in rerun.phases:
+                self.phases[name].append(ms)
+            write_prometheus = (self.prometheus_path
+                                and time.monotonic() - self._prometheus_written >= PROMETHEUS_INTERVAL)
+            if write_prometheus:
+                self._prometheus_written = time.monotonic()
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(rerun.record()) + '\n')
+        if write_prometheus:
+            self.write_prometheus()
+
+    def summary(self):
+        """p50/p95 of rerun, fragment rerun and phase latencies (ms) over the window, plus cache counters."""
+        with self._lock:
+            totals = list(self.totals)
+            fragments = {name: list(values) for name, values in self.fragments.items()}
+            phases = {name: list(values) for name, values in self.phases.items()}
+            cache = {name: dict(counts) for name, counts in self.cache.items()}
+            count, sum_ms = self.count, self.sum_ms
+        return {
+            'reruns': count,
+            'sum_ms': sum_ms,
+            'total': {f"p{int(q * 100)}": percentile(totals, q) for q in QUANTILES},
+            'fragments': {name: {f"p{int(q * 100)}": percentile(values, q) for q in QUANTILES}
+                          for name, values in fragments.items()},
+            'phases': {name: {f"p{int(q * 100)}": percentile(values, q) for q in QUANTILES}
+                       for name, values in phases.items()},
+            'cache': cache,
+        }
+
+    def prometheus_text(self):
+        summary = self.summary()
+        lines = ['# HELP stackuniversity_rerun_seconds Streamlit script rerun latency.',
+                 '# TYPE stackuniversity_rerun_seconds summary']
+        for label, ms in summary['total'].items():
+            if ms is not None:
+                lines.append(f'stackuniversity_rerun_seconds{{quantile="{int(label[1:]) / 100:g}"}} {ms / 1000:.6f}')
+        lines += [f"stackuniversity_rerun_seconds_count {summary['reruns']}",
+                  f"stackuniversity_rerun_seconds_sum {summary['sum_ms'] / 1000:.6f}",
+                  '# HELP stackuniversity_fragment_seconds Latency of fragment-only reruns.',
+                  '# TYPE stackuniversity_fragment_seconds gauge']
+        for fragment, values in sorted(summary['fragments'].items()):
+            for label, ms in values.items():
+                lines.append(f'stackuniversity_fragment_seconds{{fragment="{fragment}",quantile="{int(label[1:]) / 100:g}"}} '
+                             f'{ms / 1000:.6f}')
+        lines += ['# HELP stackuniversity_phase_seconds Latency of each rerun phase.',
+                  '# TYPE stackuniversity_phase_seconds gauge']
+        for phase, values in sorted(summary['phases'].items()):
+            for label, ms in values.items():
+                lines.append(f'stackuniversity_phase_seconds{{phase="{phase}",quantile="{int(label[1:]) / 100:g}"}} '
+                             f'{ms / 1000:.6f}')
+        lines += ['# HELP stackuniversity_cache_requests_total Cached loader calls by outcome.',
+                  '# TYPE stackuniversity_cache_requests_total counter']
+        for loader, counts in sorted(summary['cache'].items()):
+            for kind, result in (('hits', 'hit'), ('misses', 'miss')):
+                lines.append(f'stackuniversity_cache_requests_total{{loader="{loader}",result="{result}"}} {counts[kind]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self):
+        tmp = f"{self.prometheus_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, self.prometheus_path)
+
+
+METRICS = Metrics()
+
+
+def debug_enabled(query_params=None):
+    if os.environ.get(DEBUG_ENV, '').lower() in ('1', 'true', 'yes'):
+        return True
+    return bool(query_params) and query_params.get('debug', '').lower() in ('1', 'true', 'yes')
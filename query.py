@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from database import DIFFICULTY_LEVELS
+
+SORT_OPTIONS = ["Relevance", "Name (A-Z)", "Name (Z-A)", "Fees (Low-High)", "Fees (High-Low)"]
+CACHE_SIZE = 512
+
+
+class Filters(NamedTuple):
+    search: str = ""
+    region: Optional[str] = None
+    type: Optional[str] = None
+    max_fees: Optional[int] = None
+    difficulty: Optional[str] = None
+    sort_by: str = "Relevance"
+
+
+# --- Query engine ---
+class QueryEngine:
+    """Filter/sort engine over one version of the catalog.
+
+    Region, type and difficulty are held as integer codes, fees as a pre-sorted array cut
+    with binary search, and every sort option as a ready-made row order, so a query is a few
+    vectorized passes over flat arrays. Results are row positions in display order, memoized
+    in a bounded LRU keyed by (data version, filters).
+
+    `search` maps query text to university ids, best match first.
+    """
+
+    def __init__(self, df, version, search=None, cache_size=CACHE_SIZE):
+        self.df = df
+        self.version = version
+        self.search = search
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.ids = df['id'].to_numpy()
+        self._id_order = np.argsort(self.ids, kind='stable')
+        self.region_codes, self.regions = self._encode(df['region'])
+        self.type_codes, self.types = self._encode(df['type'])
+        difficulty = pd.Categorical(df['difficulty'], categories=DIFFICULTY_LEVELS, ordered=True)
+        self.difficulty_codes = difficulty.codes
+
+        fees = df['avg_fees'].to_numpy()
+        self._fee_order = np.argsort(fees, kind='stable')
+        self._sorted_fees = fees[self._fee_order]
+        # Descending orders sort negated ranks so ties keep catalog order, as a stable sort would.
+        name_rank = pd.factorize(df['name'], sort=True)[0]
+        self.sort_orders = {
+            "Relevance": np.argsort(name_rank, kind='stable'),
+            "Name (A-Z)": np.argsort(name_rank, kind='stable'),
+            "Name (Z-A)": np.argsort(-name_rank, kind='stable'),
+            "Fees (Low-High)": self._fee_order,
+            "Fees (High-Low)": np.argsort(-fees, kind='stable'),
+        }
+
+    @staticmethod
+    def _encode(column):
+        # Categorical columns (see catalog.py) already carry sorted codes; use them as they are.
+        if isinstance(column.dtype, pd.CategoricalDtype) and column.cat.categories.is_monotonic_increasing:
+            return column.cat.codes.to_numpy(), list(column.cat.categories)
+        codes, uniques = pd.factorize(column, sort=True)
+        return codes, list(uniques)
+
+    @staticmethod
+    def _code(values, value):
+        # None for values absent from this catalog version, so the comparison matches nothing.
+        return values.index(value) if value in values else None
+
+    def positions_for_ids(self, ids):
+        ids = np.asarray(ids, dtype=self.ids.dtype)
+        if not len(self.ids) or not len(ids):
+            return np.empty(0, dtype=np.intp)
+        found = np.searchsorted(self.ids, ids, sorter=self._id_order)
+        positions = self._id_order[np.minimum(found, len(self.ids) - 1)]
+        return positions[self.ids[positions] == ids]
+
+    def _mask(self, filters):
+        mask = np.ones(len(self.ids), dtype=bool)
+        if filters.region is not None:
+            mask &= self.region_codes == self._code(self.regions, filters.region)
+        if filters.type is not None:
+            mask &= self.type_codes == self._code(self.types, filters.type)
+        if filters.difficulty is not None:
+            mask &= self.difficulty_codes == self._code(DIFFICULTY_LEVELS, filters.difficulty)
+        if filters.max_fees is not None:
+            cut = np.searchsorted(self._sorted_fees, filters.max_fees, side='right')
+            mask[self._fee_order[cut:]] = False
+        return mask
+
+    def _compute(self, filters):
+        mask = self._mask(filters)
+        if filters.search:
+            ranked = self.positions_for_ids(self.search(filters.search))
+            if filters.sort_by == "Relevance":
+                return ranked[mask[ranked]]
+            in_search = np.zeros(len(self.ids), dtype=bool)
+            in_search[ranked] = True
+            mask &= in_search
+        order = self.sort_orders[filters.sort_by]
+        return order[mask[order]]
+
+    def positions(self, filters):
+        key = (self.version, filters)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        result = self._compute(filters)
+        result.setflags(write=False)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def query(self, filters):
+        """University ids matching `filters`, in display order."""
+        return self.ids[self.positions(filters)]
+
+    def select(self, filters):
+        """Rows of the catalog matching `filters`, in display order."""
+        return self.df.iloc[self.positions(filters)]
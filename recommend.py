@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from database import DIFFICULTY_LEVELS
+from taxonomy import INTERESTS
+
+# Relative importance of each wizard answer. Unanswered questions drop out and the rest are
+# renormalized, so a perfect fit always scores 1.0.
+WEIGHTS = {'region': 0.25, 'type': 0.15, 'budget': 0.25, 'difficulty': 0.15, 'academic_interest': 0.20}
+# Over-budget institutions lose fit linearly, reaching zero at this multiple of the budget.
+BUDGET_TOLERANCE = 2.0
+TOP_K = 5
+CRITERIA_LABELS = {'region': 'region', 'type': 'type', 'budget': 'budget', 'difficulty': 'difficulty',
+                   'academic_interest': 'academic interest'}
+
+
+# --- Recommendation scoring ---
+class Recommender:
+    """Weighted fit of every institution against wizard preferences, as flat NumPy arrays.
+
+    `catalog` is a catalog.Catalog; `interests` is the long-form (university_id, interest,
+    programs) table from database.read_university_interests.
+    """
+
+    def __init__(self, catalog, interests, version=None):
+        df = self.df = catalog.universities
+        self.version = version
+        self.ids = df['id'].to_numpy()
+        self.fees = df['avg_fees'].to_numpy(dtype=np.float64)
+        self.regions = df['region'].to_numpy(dtype=object)
+        self.types = df['type'].to_numpy(dtype=object)
+        self.difficulty = pd.Categorical(df['difficulty'], categories=DIFFICULTY_LEVELS, ordered=True).codes
+
+        # Share of each institution's programs in each interest category (rows follow df).
+        program_counts = catalog.program_counts().astype(np.float64)
+        counts = (interests.pivot_table(index='university_id', columns='interest', values='programs',
+                                        aggfunc='sum', fill_value=0)
+                  .reindex(index=self.ids, columns=INTERESTS, fill_value=0)
+                  .to_numpy(dtype=np.float64))
+        self.interest_share = counts / np.maximum(program_counts, 1)[:, None]
+
+    def components(self, prefs):
+        """Per-criterion fit in [0, 1] for every answered preference."""
+        parts = {}
+        if 'region' in prefs:
+            parts['region'] = (self.regions == prefs['region']).astype(np.float64)
+        if 'type' in prefs:
+            parts['type'] = (self.types == prefs['type']).astype(np.float64)
+        if 'max_fees' in prefs:
+            budget = float(prefs['max_fees'])
+            over = np.maximum(self.fees - budget, 0) / (budget * (BUDGET_TOLERANCE - 1))
+            parts['budget'] = np.clip(1 - over, 0, 1)
+        if 'difficulty' in prefs and prefs['difficulty'] in DIFFICULTY_LEVELS:
+            distance = np.abs(self.difficulty - DIFFICULTY_LEVELS.index(prefs['difficulty']))
+            parts['difficulty'] = np.where(self.difficulty >= 0, 1 - distance / (len(DIFFICULTY_LEVELS) - 1), 0)
+        if prefs.get('academic_interest') in INTERESTS:
+            share = self.interest_share[:, INTERESTS.index(prefs['academic_interest'])]
+            parts['academic_interest'] = (share > 0).astype(np.float64)
+        return parts
+
+    def scores(self, prefs):
+        parts = self.components(prefs)
+        if not parts:
+            return np.ones(len(self.ids)), parts
+        total = sum(WEIGHTS[name] for name in parts)
+        return sum(WEIGHTS[name] * fit for name, fit in parts.items()) / total, parts
+
+    def top_k(self, prefs, k=TOP_K):
+        """The k best fits, best first, via a partial sort so cost stays linear in the catalog.
+
+        Returns (row positions, scores, per-row lists of unmet preferences, exact-match count).
+        Equal scores are ordered by the share of programs in the chosen interest, then by lower
+        fees; every row tied with the k-th score is ranked before the cut, so ties never fall
+        to partition order.
+        """
+        scores, parts = self.scores(prefs)
+        exact = int(np.count_nonzero(scores >= 1.0 - 1e-9))
+        k = min(k, len(scores))
+        if k == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0), [], exact
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores >= kth)
+        if prefs.get('academic_interest') in INTERESTS:
+            share = self.interest_share[candidates, INTERESTS.index(prefs['academic_interest'])]
+        else:
+            share = np.zeros(len(candidates))
+        best = candidates[np.lexsort((self.fees[candidates], -share, -scores[candidates]))][:k]
+        best = best[scores[best] > 0]
+        misses = [[name for name, fit in parts.items() if fit[pos] < 1.0] for pos in best]
+        return best, scores[best], misses, exact
@@ -0,0 +1,316 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # optional, faster listing parser
+    lxml_html = None
+
+# Override with the STACKUNIVERSITY_TCU_URL environment variable, e.g. to ingest from a local stand-in.
+TCU_LISTING_URL = os.environ.get('STACKUNIVERSITY_TCU_URL',
+                                 "https://www.tcu.go.tz/services/accreditation/universities-registered-tanzania")
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+
+# Politeness defaults: at most MAX_WORKERS requests in flight and REQUESTS_PER_SECOND
+# sustained, with short bursts of up to MAX_WORKERS requests.
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 4.0
+REQUEST_TIMEOUT = 15
+# Safety net only; pagination stops at the first empty page.
+PAGE_LIMIT = 200
+
+
+# --- Rate limiting ---
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+# --- HTTP session ---
+def make_session(pool_size=MAX_WORKERS, headers=None):
+    session = requests.Session()
+    session.headers.update(headers or DEFAULT_HEADERS)
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET']))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def listing_page_url(base_url, page):
+    return f"{base_url}?page={page}" if page > 1 else base_url
+
+
+# --- Listing page parsing ---
+# Parsing is a generator pipeline: a backend yields the raw cells of each row of the listing
+# table only, and listing_records turns rows into records. Backends take the page as bytes
+# and decode it at most once.
+LISTING_TABLE_CLASS = 'views-table'
+FEED_CHUNK = 16384
+_LISTING_TABLE = re.compile(rf'\b{LISTING_TABLE_CLASS}\b')
+_TABLE_START = re.compile(rf'''<table\b[^>]*\bclass\s*=\s*["']?[^"'>]*\b{LISTING_TABLE_CLASS}\b''', re.IGNORECASE)
+_CHARSET = re.compile(rb'''<meta[^>]+charset=["']?([\w-]+)''', re.IGNORECASE)
+
+
+def sniff_encoding(body, content_type=None):
+    """Charset from the Content-Type header, else from a <meta> tag near the top, else UTF-8."""
+    if content_type and 'charset=' in content_type:
+        return content_type.split('charset=', 1)[1].split(';')[0].strip(' "\'')
+    match = _CHARSET.search(body[:2048])
+    return match.group(1).decode('ascii') if match else 'utf-8'
+
+
+def _decode(body, encoding):
+    return body if isinstance(body, str) else body.decode(encoding or sniff_encoding(body), errors='replace')
+
+
+class _ListingRowParser(HTMLParser):
+    # Collects (cell texts, name-cell href) for each tbody row of the listing table and
+    # ignores everything else; `done` is set once that table closes.
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.done = False
+        self._depth = 0
+        self._in_body = False
+        self._row = None
+        self._cell = None
+        self._href = None
+
+    def _close_cell(self):
+        if self._cell is not None:
+            self._row.append(''.join(self._cell))
+            self._cell = None
+
+    def _close_row(self):
+        if self._row is not None:
+            self._close_cell()
+            self.rows.append((self._row, self._href))
+            self._row = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            if self._depth or LISTING_TABLE_CLASS in (dict(attrs).get('class') or '').split():
+                self._depth += 1
+        elif self._depth != 1:
+            return
+        elif tag == 'tbody':
+            self._in_body = True
+        elif tag == 'tr' and self._in_body:
+            self._close_row()
+            self._row, self._href = [], None
+        elif tag == 'td' and self._row is not None:
+            self._close_cell()
+            self._cell = []
+        elif tag == 'a' and self._cell is not None and len(self._row) == 1 and self._href is None:
+            self._href = dict(attrs).get('href')
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+        if tag == 'table':
+            self._depth -= 1
+            if not self._depth:
+                self._close_row()
+                self.done = True
+        elif self._depth != 1:
+            return
+        elif tag == 'td':
+            self._close_cell()
+        elif tag == 'tr':
+            self._close_row()
+        elif tag == 'tbody':
+            self._close_row()
+            self._in_body = False
+
+    def handle_data(self, data):
+        if self._cell is not None and self._depth == 1:
+            self._cell.append(data)
+
+
+def _rows_stdlib(body, encoding=None):
+    # Streams the page through html.parser from the listing table's start tag and stops at its end.
+    text = _decode(body, encoding)
+    table = _TABLE_START.search(text)
+    if table is None:
+        return
+    parser = _ListingRowParser()
+    for start in range(table.start(), len(text), FEED_CHUNK):
+        parser.feed(text[start:start + FEED_CHUNK])
+        yield from parser.rows
+        parser.rows.clear()
+        if parser.done:
+            return
+    parser.close()
+    yield from parser.rows
+
+
+def _rows_strainer(body, encoding=None):
+    # BeautifulSoup, but only the listing table is turned into a tree.
+    soup = BeautifulSoup(_decode(body, encoding), 'html.parser',
+                         parse_only=SoupStrainer('table', attrs={'class': _LISTING_TABLE}))
+    for row in soup.select(f'table.{LISTING_TABLE_CLASS} tbody tr'):
+        cells = row.find_all('td')
+        link = cells[1].find('a', href=True) if len(cells) > 1 else None
+        yield [cell.text for cell in cells], link['href'] if link else None
+
+
+def _rows_lxml(body, encoding=None):
+    # libxml2 parses the bytes directly, honouring `encoding` or the page's own declaration.
+    parser = lxml_html.HTMLParser(encoding=encoding) if encoding and not isinstance(body, str) else None
+    doc = lxml_html.fromstring(body, parser=parser)
+    for row in doc.xpath(f"//table[contains(concat(' ', normalize-space(@class), ' '), ' {LISTING_TABLE_CLASS} ')]"
+                         "/tbody/tr"):
+        cells = row.xpath('./td')
+        links = cells[1].xpath('.//a/@href') if len(cells) > 1 else []
+        yield [cell.text_content() for cell in cells], links[0] if links else None
+
+
+LISTING_BACKENDS = {'stdlib': _rows_stdlib, 'strainer': _rows_strainer}
+if lxml_html is not None:
+    LISTING_BACKENDS['lxml'] = _rows_lxml
+# Fastest available; see benchmarks/bench_parser.py.
+DEFAULT_BACKEND = 'lxml' if 'lxml' in LISTING_BACKENDS else 'stdlib'
+
+
+def iter_listing_rows(body, backend=None, encoding=None):
+    """(cell texts, name-cell href) for each row of the listing table, from bytes or str."""
+    return LISTING_BACKENDS[backend or DEFAULT_BACKEND](body, encoding)
+
+
+def listing_records(rows, page, base_url=None):
+    """Records from iter_listing_rows output. `base_url` resolves each row's 'detail_url'."""
+    for idx, (cells, href) in enumerate(rows):
+        if len(cells) < 4:
+            continue
+        name_full = cells[1].strip()
+        name_parts = name_full.replace(')', '').split('(')
+        name = name_parts[0].strip()
+        acronym = name_parts[1].strip() if len(name_parts) > 1 else ''.join(word[0].upper() for word in name.split()[:3])
+
+        head_office = cells[2].strip()
+        uni_type = cells[3].replace('University', '').replace('College', '').replace('Campus, Centre and Institute', '').strip()
+
+        difficulty = "Medium"
+        if "Dar es Salaam" in head_office and "Public" in uni_type:
+            difficulty = "High"
+        elif "Health" in name or "Medicine" in name or "Science and Technology" in name:
+            difficulty = "High" if uni_type == "Public" else "Very High" if uni_type == "Private" else "High"
+
+        avg_fees = 1500000
+        if "Private" in cells[3]:
+            avg_fees = 2000000 + ((idx + page * 10) * 50000) % 2500000
+
+        yield {
+            'name': name,
+            'acronym': acronym,
+            'region': head_office,
+            'type': uni_type,
+            'avg_fees': avg_fees,
+            'difficulty': difficulty,
+            'location': head_office,
+            'detail_url': urljoin(base_url or '', href) if href else None,
+        }
+
+
+def parse_listing_page(body, page, base_url=None, backend=None, encoding=None):
+    return list(listing_records(iter_listing_rows(body, backend, encoding), page, base_url))
+
+
+# --- Concurrent fetch engine ---
+def fetch_listing_pages(base_url=TCU_LISTING_URL, session=None, max_workers=MAX_WORKERS,
+                        rate=REQUESTS_PER_SECOND, page_limit=PAGE_LIMIT, on_page=None, cache=None):
+    """Fetch and parse listing pages concurrently until the first empty page.
+
+    Returns the parsed rows of every page before the first empty one, in page order.
+    `on_page(page, url, n_rows)` is called as each page completes. Raw pages are kept in
+    `cache` (a crawler.HtmlCache) when given, so the listing can be re-parsed offline.
+    """
+    own_session = session is None
+    if own_session:
+        session = make_session(max_workers)
+    bucket = TokenBucket(rate, capacity=max_workers)
+
+    def fetch(page):
+        url = listing_page_url(base_url, page)
+        bucket.acquire()
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        if cache is not None:
+            cache.put(url, response.content)
+        rows = parse_listing_page(response.content, page, base_url=url,
+                                  encoding=sniff_encoding(response.content, response.headers.get('Content-Type')))
+        if on_page:
+            on_page(page, url, len(rows))
+        return rows
+
+    results = {}
+    last_page = page_limit
+    next_page = 1
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = {}
+            while pending or next_page <= last_page:
+                # Keep the window full, but never schedule past a known empty page.
+                while len(pending) < max_workers and next_page <= last_page:
+                    pending[pool.submit(fetch, next_page)] = next_page
+                    next_page += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page = pending.pop(future)
+                    try:
+                        rows = future.result()
+                    except Exception:
+                        if page > last_page:
+                            continue
+                        for other in pending:
+                            other.cancel()
+                        raise
+                    if rows:
+                        results[page] = rows
+                    else:
+                        last_page = min(last_page, page - 1)
+                # Pages already in flight past the end are simply discarded.
+                for future in [f for f, p in pending.items() if p > last_page]:
+                    if future.cancel():
+                        pending.pop(future)
+    finally:
+        if own_session:
+            session.close()
+
+    pages = []
+    for page in range(1, last_page + 1):
+        if page not in results:
+            break
+        pages.append(results[page])
+    return pages
@@ -0,0 +1,75 @@
+import re
+
+# Weights for bm25(search_index): name, acronym, programs. An acronym hit ("UDSM") should
+# beat a name hit, which should beat a match somewhere in the program list.
+COLUMN_WEIGHTS = (5.0, 10.0, 1.0)
+# Terms shorter than this are never typo-corrected; longer terms allow two edits.
+FUZZY_MIN_LENGTH = 4
+FUZZY_TWO_EDITS_LENGTH = 8
+
+
+def query_terms(text):
+    return re.findall(r'\w+', text.lower())
+
+
+# --- Typo tolerance ---
+def edit_distance(a, b, limit):
+    """Levenshtein distance between `a` and `b`, or `limit + 1` once it is known to exceed `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _has_prefix(conn, term):
+    return conn.execute('SELECT 1 FROM search_vocab WHERE term >= ? AND term < ? LIMIT 1',
+                        (term, term + '\uffff')).fetchone() is not None
+
+
+def _corrections(conn, term):
+    if len(term) < FUZZY_MIN_LENGTH:
+        return []
+    limit = 2 if len(term) >= FUZZY_TWO_EDITS_LENGTH else 1
+    # Block on the first letter: typos there are rare, and it keeps the candidate list short.
+    candidates = conn.execute('''SELECT term FROM search_vocab
+                                 WHERE term >= ? AND term < ? AND length(term) >= ?''',
+                              (term[0], term[0] + '\uffff', len(term) - limit))
+    # Compare against the same-length prefix too, so "engeneer" still finds "engineering".
+    return [vocab for (vocab,) in candidates
+            if edit_distance(term, vocab, limit) <= limit or edit_distance(term, vocab[:len(term)], limit) <= limit]
+
+
+# --- Query ---
+def build_match_query(conn, terms, fuzzy=True):
+    """FTS5 MATCH expression: every term as a prefix query, misspelt terms replaced by close vocabulary terms."""
+    clauses = []
+    for term in terms:
+        if not fuzzy or _has_prefix(conn, term):
+            clauses.append(f'"{term}"*')
+            continue
+        corrections = _corrections(conn, term)
+        if not corrections:
+            return None
+        clauses.append('(' + ' OR '.join(f'"{vocab}"*' for vocab in corrections) + ')')
+    return ' AND '.join(clauses)
+
+
+def search_universities(conn, text, fuzzy=True):
+    """Ids of universities matching `text`, best match first."""
+    terms = query_terms(text)
+    if not terms:
+        return []
+    match = build_match_query(conn, terms, fuzzy)
+    if match is None:
+        return []
+    weights = ', '.join(str(w) for w in COLUMN_WEIGHTS)
+    rows = conn.execute(f'''SELECT rowid FROM search_index WHERE search_index MATCH ?
+                            ORDER BY bm25(search_index, {weights})''', (match,))
+    return [uid for (uid,) in rows]
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# Share of the similarity score each feature group carries. Programs and facilities compare as
+# sets (cosine of their one-hot vectors); type, fee band and difficulty either match or not.
+FEATURE_WEIGHTS = {'program': 0.5, 'facility': 0.2, 'type': 0.1, 'fee_band': 0.1, 'difficulty': 0.1}
+FEE_BAND_WIDTH = 1000000
+SIMILAR_K = 6
+# Scores are rounded so equal pairs compare equal however the matrix product was blocked.
+SCORE_DECIMALS = 6
+# Upper bound on the scores held at once: rows per block = SCORE_BLOCK // number of institutions.
+SCORE_BLOCK = 1 << 24
+# Columns scanned first to bound each row's k-th best score (see _top_k).
+SCORE_SAMPLE = 2048
+
+
+# --- Feature vectors ---
+def feature_matrix(universities, programs, facilities):
+    """One L2-normalized row per institution over every feature token, weighted so a dot product is the score.
+
+    `universities` has id, type, avg_fees and difficulty columns; `programs` and `facilities`
+    are (university_id, name) rows. The score of two institutions is the weighted sum, over
+    the feature groups, of the cosine of their one-hot group vectors, so it lies in [0, 1]
+    and depends on nothing but the two institutions.
+    """
+    ids = universities['id'].to_numpy()
+    fee_bands = universities['avg_fees'].astype('Float64') // FEE_BAND_WIDTH
+    groups = [
+        ('program', pd.Index(ids).get_indexer(programs['university_id']), programs['name']),
+        ('facility', pd.Index(ids).get_indexer(facilities['university_id']), facilities['name']),
+        ('type', np.arange(len(ids)), universities['type']),
+        ('fee_band', np.arange(len(ids)), fee_bands),
+        ('difficulty', np.arange(len(ids)), universities['difficulty']),
+    ]
+    blocks = []
+    for group, rows, values in groups:
+        codes, tokens = pd.factorize(pd.Series(values, copy=False), use_na_sentinel=True)
+        keep = (rows >= 0) & (codes >= 0)
+        block = np.zeros((len(ids), len(tokens)), dtype=np.float32)
+        block[rows[keep], codes[keep]] = 1
+        sizes = block.sum(axis=1, keepdims=True)
+        block *= np.sqrt(FEATURE_WEIGHTS[group] / np.maximum(sizes, 1))
+        blocks.append(block)
+    return ids, np.hstack(blocks)
+
+
+# --- Nearest neighbours ---
+def _row_blocks(rows, n):
+    step = max(1, SCORE_BLOCK // max(1, n))
+    return [rows[start:start + step] for start in range(0, len(rows), step)]
+
+
+def scores(vectors, rows):
+    """Similarity of each of `rows` to every institution, with each row's own score set to -1."""
+    block = vectors[rows] @ vectors.T
+    block[np.arange(len(rows)), rows] = -1
+    return block
+
+
+def _top_k(block, k, sample):
+    # The k best columns of each row, best first and ties to the lower column. Scanning a
+    # column sample first gives each row a score that at least k columns reach, so only the
+    # few columns at or above it are sorted rather than partitioning every row in full.
+    # The threshold is lowered by one rounding step, so scores that round equal to it still tie.
+    threshold = np.partition(block[:, sample], -k, axis=1)[:, -k] - 10.0 ** -SCORE_DECIMALS
+    rows, columns = np.divmod(np.flatnonzero(block >= threshold[:, None]), block.shape[1])
+    values = np.round(block[rows, columns], SCORE_DECIMALS)
+    order = np.lexsort((columns, -values, rows))
+    rows, columns, values = rows[order], columns[order], values[order]
+    starts = np.searchsorted(rows, np.arange(len(block)))
+    picks = (starts[:, None] + np.arange(k)).ravel()
+    return columns[picks].reshape(-1, k), values[picks].reshape(-1, k)
+
+
+def nearest(vectors, rows, k=SIMILAR_K):
+    """(neighbour rows, scores) of the k institutions most similar to each of `rows`, best first.
+
+    Works through `rows` in blocks, so the full n x n matrix is never held.
+    """
+    k = max(0, min(k, len(vectors) - 1))
+    rows = np.asarray(rows, dtype=np.int64)
+    neighbours = np.empty((len(rows), k), dtype=np.int64)
+    best = np.empty((len(rows), k), dtype=np.float32)
+    if k == 0:
+        return neighbours, best
+    # Any k + 1 columns will do for the sample: at most one of them is the row itself.
+    sample = np.linspace(0, len(vectors) - 1, min(len(vectors), max(SCORE_SAMPLE, k + 1))).astype(np.int64)
+    done = 0
+    for block_rows in _row_blocks(rows, len(vectors)):
+        top, top_scores = _top_k(scores(vectors, block_rows), k, sample)
+        neighbours[done:done + len(block_rows)] = top
+        best[done:done + len(block_rows)] = top_scores
+        done += len(block_rows)
+    return neighbours, best
+
+
+def candidates(vectors, rows, floor):
+    """(row, neighbour row, score) for every institution whose score with one of `rows` reaches its `floor`.
+
+    `floor` holds each institution's current k-th best score (-inf where its list is not full):
+    these are the pairs that must be merged into existing neighbour lists when `rows` change.
+    A pair tied with the floor is kept too, since the lower id wins the tie.
+    """
+    found = [(np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.float32))]
+    for block_rows in _row_blocks(np.asarray(rows, dtype=np.int64), len(vectors)):
+        block = np.round(scores(vectors, block_rows), SCORE_DECIMALS)
+        changed, other = np.divmod(np.flatnonzero(block >= floor[None, :]), block.shape[1])
+        found.append((other, block_rows[changed], block[changed, other]))
+    return tuple(np.concatenate(parts) for parts in zip(*found))
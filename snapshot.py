@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+
+try:
+    import pyarrow as pa
+    from pyarrow import ipc
+except ImportError:  # optional; without it every cold start reads the catalog from SQLite
+    pa = ipc = None
+
+from catalog import Catalog, read_catalog
+from database import data_version, read_university_interests
+
+# One Arrow IPC file per table in each version's directory.
+SNAPSHOT_TABLES = ['universities', 'programs', 'interests']
+# Versions kept on disk: the newest, plus the one a worker that has not yet noticed may still map.
+KEEP_SNAPSHOTS = 2
+
+
+def snapshot_dir(db_path):
+    # Next to the database: universities.db -> universities.snapshots/<data version>/.
+    return os.environ.get('STACKUNIVERSITY_SNAPSHOTS') or os.path.splitext(db_path)[0] + '.snapshots'
+
+
+# --- Reading ---
+def _read_table(path):
+    # Memory-mapped: the file is paged in as pandas copies it, with no read() into a buffer first.
+    with pa.memory_map(path) as source:
+        return ipc.open_file(source).read_all().to_pandas()
+
+
+def read_snapshot(directory, version):
+    """(catalog, interests) from the snapshot of `version`; None if there is none or pyarrow is missing."""
+    if pa is None:
+        return None
+    path = os.path.join(directory, str(version))
+    try:
+        tables = {name: _read_table(os.path.join(path, f'{name}.arrow')) for name in SNAPSHOT_TABLES}
+    except (OSError, pa.ArrowException):
+        return None
+    return Catalog(tables['universities'], tables['programs']), tables['interests']
+
+
+# --- Writing ---
+def _read_current(conn):
+    # The data version and both tables from one read transaction, so they always agree.
+    conn.execute('BEGIN')
+    try:
+        return data_version(conn), read_catalog(conn), read_university_interests(conn)
+    finally:
+        conn.execute('ROLLBACK')
+
+
+def publish_snapshot(directory, version, catalog, interests):
+    """Write `version`'s snapshot, unless it is already there.
+
+    The files go to a staging directory that is then renamed to the version number, so a
+    reader sees a version's snapshot complete or not at all. Does nothing without pyarrow.
+    """
+    target = os.path.join(directory, str(version))
+    if pa is None or os.path.isdir(target):
+        return
+    os.makedirs(directory, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f'.{version}-', dir=directory)
+    try:
+        for name, df in zip(SNAPSHOT_TABLES, [catalog.universities, catalog.programs, interests]):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(os.path.join(staging, f'{name}.arrow'), 'wb') as sink, \
+                    ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.rename(staging, target)
+    except OSError:
+        # Another process published this version first; theirs is identical.
+        if not os.path.isdir(target):
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    _prune(directory, version)
+
+
+def _prune(directory, version):
+    versions = sorted(int(name) for name in os.listdir(directory) if name.isdigit() and int(name) <= version)
+    for old in versions[:-KEEP_SNAPSHOTS]:
+        shutil.rmtree(os.path.join(directory, str(old)), ignore_errors=True)
+
+
+def write_snapshot(conn, directory):
+    """Snapshot the catalog as it stands in `conn`'s database (ingest calls this after each sync); returns its version."""
+    version, catalog, interests = _read_current(conn)
+    publish_snapshot(directory, version, catalog, interests)
+    return version
+
+
+def load_snapshot(db, version):
+    """(catalog, interests) for `version`: from its snapshot, or from SQLite, which is then snapshotted.
+
+    The fallback covers databases no ingest has snapshotted yet and hosts without pyarrow; a
+    snapshot that cannot be written (say, a read-only directory) just means the next cold
+    start reads SQLite again.
+    """
+    directory = snapshot_dir(db.path)
+    snapshot = read_snapshot(directory, version)
+    if snapshot is not None:
+        return snapshot
+    with db.read() as conn:
+        version, catalog, interests = _read_current(conn)
+    try:
+        publish_snapshot(directory, version, catalog, interests)
+    except OSError:
+        pass
+    return catalog, interests
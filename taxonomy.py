@@ -0,0 +1,38 @@
+import re
+from functools import lru_cache
+
+# Wizard interest categories, in the order they are offered.
+INTERESTS = ['STEM', 'Humanities', 'Business', 'Health Sciences', 'Agriculture', 'Law', 'Education']
+
+# Word-prefix keywords per category; a program may fall into several ("Arts in Education").
+INTEREST_KEYWORDS = {
+    'STEM': ['computer', 'engineer', 'data science', 'mathematic', 'statistic', 'physics', 'chemistry',
+             'biology', 'information technology', 'information systems', 'software', 'technology',
+             'architecture', 'land management', 'surveying', 'environmental science', 'geology', 'gis',
+             'science and technology', 'electronics', 'telecommunication'],
+    'Humanities': ['arts', 'mass communication', 'journalism', 'history', 'language', 'literature',
+                   'linguistic', 'philosophy', 'sociology', 'social', 'public administration', 'theology',
+                   'political', 'music', 'geography', 'psychology', 'general studies'],
+    'Business': ['business', 'accounting', 'finance', 'commerce', 'economics', 'marketing', 'procurement',
+                 'tourism', 'hospitality', 'entrepreneurship', 'banking', 'human resource'],
+    'Health Sciences': ['medicine', 'medical', 'nursing', 'pharmacy', 'dental', 'health', 'clinical',
+                        'laboratory', 'physiotherapy', 'radiography', 'optometry', 'midwifery'],
+    'Agriculture': ['agricultur', 'veterinary', 'forestry', 'fisheries', 'agronomy', 'animal', 'horticulture',
+                    'food science', 'wildlife', 'crop'],
+    'Law': ['law', 'llb', 'legal', 'jurisprudence'],
+    'Education': ['education', 'teaching', 'pedagogy'],
+}
+
+_PATTERNS = {
+    interest: re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + ')', re.IGNORECASE)
+    for interest, keywords in INTEREST_KEYWORDS.items()
+}
+
+
+@lru_cache(maxsize=65536)
+def classify_program(name):
+    """Interest categories a program name belongs to, in INTERESTS order.
+
+    Program names repeat heavily across institutions, so results are memoized.
+    """
+    return tuple(interest for interest in INTERESTS if _PATTERNS[interest].search(name or ''))
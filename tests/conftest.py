@@ -0,0 +1,41 @@
+import os
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import database
+from benchmarks.synthetic import synthetic_universities
+from database import init_db, sync_universities
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """A migrated, empty database on a fresh file."""
+    conn = init_db(str(tmp_path / 'test.db'))
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def records():
+    return synthetic_universities(40)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, records):
+    """An AppTest of app.py over its own database seeded with `records`."""
+    path = str(tmp_path / 'app.db')
+    seed = init_db(path)
+    sync_universities(seed, records)
+    seed.close()
+    monkeypatch.setattr(database, 'DB_PATH', path)
+    # Resources cached by an earlier test would still point at that test's database.
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+    yield at
+    st.cache_resource.clear()
@@ -0,0 +1,126 @@
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+import api
+from api import GZIP_MIN_BYTES, CatalogAPI, make_server
+from database import Database, sync_universities
+
+
+@pytest.fixture
+def db(tmp_path, records):
+    db = Database(str(tmp_path / 'api.db'))
+    with db.write() as conn:
+        sync_universities(conn, records)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def catalog_api(db):
+    return CatalogAPI(db)
+
+
+def get(catalog_api, target, **headers):
+    response = catalog_api.handle(target, headers.get('accept_encoding', ''), headers.get('if_none_match'))
+    body = response.body
+    if response.headers.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return response, json.loads(body) if body else None
+
+
+# --- Endpoints ---
+def test_cursor_pages_cover_the_listing(catalog_api, records):
+    ids, cursor = [], None
+    while True:
+        response, payload = get(catalog_api, "/universities?sort=fees&limit=7" + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status == 200 and payload['total'] == len(records)
+        ids += [item['id'] for item in payload['items']]
+        cursor = payload['next_cursor']
+        if cursor is None:
+            break
+    assert ids == [r['id'] for r in sorted(records, key=lambda r: r['avg_fees'])]
+
+
+def test_details_and_errors(catalog_api, records):
+    response, payload = get(catalog_api, f"/universities/{records[3]['id']}")
+    assert response.status == 200 and payload['university']['name'] == records[3]['name']
+    assert len(payload['university']['similar']) > 0
+    assert get(catalog_api, "/universities/999999")[0].status == 404
+    assert get(catalog_api, "/nowhere")[0].status == 404
+    assert get(catalog_api, "/search")[0].status == 400
+    assert get(catalog_api, "/universities?limit=x")[0].status == 400
+    assert get(catalog_api, "/universities?sort=size")[0].status == 400
+    assert get(catalog_api, "/universities?cursor=%%%")[0].status == 400
+
+
+def test_cursors_expire_with_the_data(catalog_api, db, records):
+    cursor = get(catalog_api, "/universities?limit=5")[1]['next_cursor']
+    with db.write() as conn:
+        sync_universities(conn, records[1:])
+    assert get(catalog_api, f"/universities?limit=5&cursor={cursor}")[0].status == 410
+
+
+# --- Revalidation and compression ---
+def test_etags_revalidate_until_the_data_changes(catalog_api, db, records):
+    response, _ = get(catalog_api, "/universities")
+    etag = response.headers['ETag']
+    unchanged, _ = get(catalog_api, "/universities", if_none_match=f'W/{etag}')
+    assert (unchanged.status, unchanged.body, unchanged.headers['ETag']) == (304, b'', etag)
+    with db.write() as conn:
+        sync_universities(conn, records[1:])
+    assert get(catalog_api, "/universities", if_none_match=etag)[0].status == 200
+
+
+def test_only_a_would_be_200_is_not_modified(catalog_api):
+    etag = get(catalog_api, "/aggregates")[0].headers['ETag']
+    for target in ("/universities/999999", "/nowhere", "/universities?limit=x"):
+        response, payload = get(catalog_api, target, if_none_match=etag)
+        assert response.status >= 400 and 'error' in payload, target
+
+
+def test_gzip_follows_accept_encoding(catalog_api):
+    response, payload = get(catalog_api, "/universities?limit=50", accept_encoding='br, gzip;q=0.5')
+    assert response.headers['Content-Encoding'] == 'gzip' and response.headers['ETag'].endswith('-gzip"')
+    assert len(payload['items']) > 1
+    for refused in ('gzip;q=0', 'identity', '*;q=0', 'deflate, gzip; q=0.0'):
+        response, _ = get(catalog_api, "/universities?limit=50", accept_encoding=refused)
+        assert 'Content-Encoding' not in response.headers and not response.headers['ETag'].endswith('-gzip"'), refused
+    assert 'Content-Encoding' in get(catalog_api, "/universities?limit=50", accept_encoding='*')[0].headers
+
+
+def test_small_bodies_keep_the_plain_etag(catalog_api):
+    response, _ = get(catalog_api, "/universities?limit=1&q=zzzz", accept_encoding='gzip')
+    assert len(response.body) < GZIP_MIN_BYTES and 'Content-Encoding' not in response.headers
+    etag = response.headers['ETag']
+    assert not etag.endswith('-gzip"')
+    unchanged, _ = get(catalog_api, "/universities?limit=1&q=zzzz", accept_encoding='gzip', if_none_match=etag)
+    assert unchanged.status == 304 and unchanged.headers['ETag'] == etag
+
+
+# --- HTTP server ---
+def test_server_answers_failures_with_json(db, monkeypatch):
+    server = make_server(db, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=10)
+        conn.request('GET', '/aggregates')
+        response = conn.getresponse()
+        assert response.status == 200 and json.loads(response.read())['metrics']
+
+        monkeypatch.setattr(api, 'read_aggregates', lambda conn: 1 / 0)
+        # A URL not served before, so the cached 200 is not reused.
+        conn.request('GET', '/aggregates?again=1')
+        response = conn.getresponse()
+        assert response.status == 500 and json.loads(response.read()) == {'error': "Internal server error"}
+        # The keep-alive connection is still usable.
+        conn.request('GET', '/universities?limit=1')
+        assert conn.getresponse().status == 200
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
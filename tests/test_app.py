@@ -0,0 +1,183 @@
+import database
+from app import PAGE_SIZES, render_cards
+from benchmarks.synthetic import synthetic_universities
+from database import init_db, sync_universities
+
+
+def open_explore(app):
+    app.button(key='explore_all_btn').click().run()
+    assert not app.exception
+    return app
+
+
+def card_ids(app):
+    return [int(button.key.split('_')[1]) for button in app.button if button.key and button.key.startswith('view_')]
+
+
+# --- Paginated card grid ---
+def test_explore_shows_one_page_of_cards(app, records):
+    open_explore(app)
+    assert len(card_ids(app)) == PAGE_SIZES[0]
+    assert app.number_input(key='explore_page').max == -(-len(records) // PAGE_SIZES[0])
+
+
+def test_paging_and_page_size(app, records):
+    open_explore(app)
+    first = card_ids(app)
+    app.number_input(key='explore_page').set_value(2).run()
+    second = card_ids(app)
+    assert len(second) == PAGE_SIZES[0] and not set(first) & set(second)
+    app.selectbox(key='page_size_select').select(PAGE_SIZES[2]).run()
+    assert len(card_ids(app)) == len(records)
+    assert app.number_input(key='explore_page').value == 1
+
+
+def test_new_filters_start_from_the_first_page(app):
+    open_explore(app)
+    app.number_input(key='explore_page').set_value(3).run()
+    app.selectbox(key='sort_by_select').select("Fees (High-Low)").run()
+    assert app.number_input(key='explore_page').value == 1
+
+
+def test_cards_escape_their_text():
+    [card] = render_cards({'name': ["<b>A&B</b>"], 'acronym': ["A"], 'region': ["R"], 'type': ["Public"],
+                           'difficulty': ["High"], 'summary': ["<script>x</script>"]})
+    assert "&lt;b&gt;A&amp;B&lt;/b&gt;" in card and "<script>" not in card
+
+
+# --- Data version ---
+def results_found(app):
+    return next(int(m.value.split('<strong>')[1].split('<')[0]) for m in app.markdown if 'results found' in m.value)
+
+
+def test_an_outside_ingest_shows_on_the_next_rerun(app, records):
+    open_explore(app)
+    assert results_found(app) == len(records)
+    conn = init_db(database.DB_PATH)
+    changes = sync_universities(conn, records + synthetic_universities(50)[len(records):])
+    conn.close()
+    app.run()
+    assert changes['log_id'] == 2
+    assert results_found(app) == 50
+
+
+# --- Details view ---
+def test_details_escape_scraped_text_and_skip_missing_fields(app, records):
+    uni = dict(records[0], description="<script>alert(1)</script> & more", location="<i>Town</i>",
+               facilities=["<b>Lab</b>"],
+               programs=[{'name': "<img src=x>", 'duration': None, 'prospects': None, 'program_difficulty': None},
+                         {'name': "BSc in Nursing", 'duration': 4, 'prospects': "Nurse <3", 'program_difficulty': 'High'}])
+    conn = init_db(database.DB_PATH)
+    sync_universities(conn, [uni] + records[1:])
+    conn.close()
+    app.session_state['current_view'] = 'details'
+    app.session_state['selected_uni_id'] = uni['id']
+    app.run()
+    assert not app.exception
+    html = "\n".join(m.value for m in app.markdown)
+    for raw in ["<script>", "<i>Town", "<b>Lab", "<img src=x>", "Nurse <3"]:
+        assert raw not in html
+    for escaped in ["&lt;script&gt;alert(1)&lt;/script&gt; &amp; more", "&lt;i&gt;Town&lt;/i&gt;", "&lt;b&gt;Lab&lt;/b&gt;",
+                    "&lt;img src=x&gt;", "Career Prospects: Nurse &lt;3", "Duration: 4 years | Difficulty: High"]:
+        assert escaped in html
+    assert "None" not in html
+
+
+
+def test_recommendations_escape_scraped_text(app, records):
+    uni = dict(records[0], name="<img src=x onerror=alert(1)>", acronym="<b>X</b>", region="<i>Coast</i>",
+               description="<script>alert(2)</script>")
+    conn = init_db(database.DB_PATH)
+    sync_universities(conn, [uni] + records[1:])
+    conn.close()
+    app.session_state['current_view'] = 'wizard'
+    app.session_state['wizard_step'] = 5
+    app.session_state['wizard_preferences'] = {'region': uni['region']}
+    app.run()
+    assert not app.exception
+    html = "\n".join(m.value for m in app.markdown)
+    for raw in ["<img src=x", "<b>X", "<i>Coast", "<script>"]:
+        assert raw not in html
+    for escaped in ["&lt;img src=x onerror=alert(1)&gt; (&lt;b&gt;X&lt;/b&gt;)", "&lt;i&gt;Coast&lt;/i&gt; |",
+                    "&lt;script&gt;alert(2)&lt;/script&gt;"]:
+        assert escaped in html
+
+# --- Debug timing panel ---
+def test_debug_panel_shows_rerun_phases(app):
+    assert not any(e.label.startswith("⏱") for e in app.expander)
+    app.query_params['debug'] = '1'
+    app.run()
+    [panel] = [e for e in app.expander if e.label.startswith("⏱")]
+    phases = panel.dataframe[0].value['Phase'].tolist()
+    assert phases[:3] == ['page_setup', 'session_state', 'data_update'] and 'home' in phases
+
+
+# --- Ids in session state ---
+def test_session_keeps_ids_and_details_load_on_demand(app, records):
+    open_explore(app)
+    uid = card_ids(app)[0]
+    app.button(key=f'compare_{uid}').click().run()
+    app.button(key=f'view_{uid}').click().run()
+    assert app.session_state['selected_uni_id'] == uid and app.session_state['comparison_list'] == [uid]
+    assert type(app.session_state['selected_uni_id']) is int
+    name = next(r['name'] for r in records if r['id'] == uid)
+    assert app.header[0].value == f"{name} Details"
+
+    # An ingest that removes the institution leaves the session with a dangling id.
+    conn = init_db(database.DB_PATH)
+    sync_universities(conn, [r for r in records if r['id'] != uid])
+    conn.close()
+    app.run()
+    assert not app.exception and "No university selected" in app.warning[0].value
+    app.button(key='details_fallback_btn').click().run()
+    assert app.session_state['current_view'] == 'explore' and not app.exception
+
+
+# --- Explore fragment and sections ---
+def selected_count(app):
+    return next(md.value for md in app.markdown if "selected for comparison" in md.value)
+
+
+def test_compare_toggle_updates_the_card_and_counter(app):
+    open_explore(app)
+    uid = card_ids(app)[0]
+    app.button(key=f'compare_{uid}').click().run()
+    assert app.session_state['comparison_list'] == [uid] and "<strong>1</strong>" in selected_count(app)
+    assert app.button(key=f'compare_{uid}').label == "Remove"
+    app.button(key=f'compare_{uid}').click().run()
+    assert app.session_state['comparison_list'] == [] and "<strong>0</strong>" in selected_count(app)
+
+
+def test_only_the_open_section_renders(app):
+    open_explore(app)
+    uids = card_ids(app)[:2]
+    for uid in uids:
+        app.button(key=f'compare_{uid}').click().run()
+    app.number_input(key='explore_page').set_value(2).run()
+    app.radio(key='browse_section').set_value("Compare").run()
+    assert not app.exception and not card_ids(app)
+    assert app.header[0].value == "Compare Universities" and "Comparing 2 institutions" in app.caption[0].value
+    # The page widget was not rendered while Compare was open; Explore comes back on its first page.
+    app.radio(key='browse_section').set_value("Explore Universities").run()
+    assert not app.exception and app.number_input(key='explore_page').value == 1
+
+
+# --- Live filter counts ---
+def test_filter_options_show_their_match_counts(app, records):
+    open_explore(app)
+    region = records[0]['region']
+    in_region = [r for r in records if r['region'] == region]
+    assert f"{region} ({len(in_region)})" in app.selectbox(key='region_select').options
+    app.selectbox(key='region_select').select(region).run()
+    public = sum(r['type'] == 'Public' for r in in_region)
+    assert f"Public ({public})" in app.selectbox(key='type_select').options
+
+
+def test_reset_clears_every_filter_and_the_sort(app, records):
+    open_explore(app)
+    app.selectbox(key='type_select').select('Private').run()
+    app.selectbox(key='sort_by_select').select("Fees (High-Low)").run()
+    app.button(key='reset_filters').click().run()
+    assert not app.exception
+    assert app.selectbox(key='type_select').value == "All Types" and app.session_state['type_'] == "All Types"
+    assert app.selectbox(key='sort_by_select').value == "Relevance" and app.session_state['sort_by'] == "Relevance"
@@ -0,0 +1,42 @@
+import json
+
+from benchmarks.suite import BASELINE, compare, run_size
+from benchmarks.synthetic import interest_frame, synthetic_frame, synthetic_universities
+from database import COLUMNS, DIFFICULTY_LEVELS, read_university_interests, sync_universities
+
+
+# --- Synthetic catalog ---
+def test_synthetic_catalog_is_reproducible_and_well_formed():
+    records = synthetic_universities(200, seed=3)
+    assert records == synthetic_universities(200, seed=3) != synthetic_universities(200, seed=4)
+    assert [r['id'] for r in records] == list(range(1, 201))
+    assert len({r['name'] for r in records}) == 200
+    for r in records:
+        assert set(r) == set(COLUMNS) and r['difficulty'] in DIFFICULTY_LEVELS and r['programs']
+    assert list(synthetic_frame(5).columns) == COLUMNS
+
+
+def test_interest_frame_matches_the_database(conn, records):
+    sync_universities(conn, records)
+    expected = read_university_interests(conn).sort_values(['university_id', 'interest']).reset_index(drop=True)
+    frame = interest_frame(records).sort_values(['university_id', 'interest']).reset_index(drop=True)
+    assert frame.to_dict('records') == expected.to_dict('records')
+
+
+# --- Regression suite ---
+def test_regressions_need_both_the_ratio_and_the_delta():
+    baseline = {'1000': {'fast': {'min_ms': 0.5}, 'slow': {'min_ms': 10.0}, 'steady': {'min_ms': 10.0}}}
+    results = {'1000': {'fast': {'min_ms': 2.0}, 'slow': {'min_ms': 25.0}, 'steady': {'min_ms': 19.0},
+                        'new': {'min_ms': 1.0}}}
+    rows = {case: regressed for case, _, _, _, _, regressed in compare(results, baseline, tolerance=1.0)}
+    # 4x slower but only 1.5 ms: noise. 2.5x and 15 ms: a regression. Under 2x: fine. No baseline: skipped.
+    assert rows == {'fast': False, 'slow': True, 'steady': False}
+
+
+def test_suite_covers_every_baseline_case():
+    results = run_size(60, repeat=1)
+    with open(BASELINE) as f:
+        baseline = json.load(f)['results']
+    for cases in baseline.values():
+        assert set(cases) <= set(results)
+    assert all(timing['min_ms'] >= 0 and timing['repeat'] >= 1 for timing in results.values())
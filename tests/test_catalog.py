@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from catalog import SUMMARY_COLUMNS, SUMMARY_LENGTH, Catalog, read_catalog, summarize
+from database import sync_universities
+
+
+def test_catalog_holds_compact_summary_columns(conn, records):
+    records[0]['description'] = "x" * (SUMMARY_LENGTH + 40)
+    sync_universities(conn, records)
+    catalog = read_catalog(conn)
+    df = catalog.universities
+    assert list(df.columns) == SUMMARY_COLUMNS and df['id'].tolist() == [r['id'] for r in records]
+    assert isinstance(df['region'].dtype, pd.CategoricalDtype) and isinstance(df['type'].dtype, pd.CategoricalDtype)
+    assert df['difficulty'].cat.ordered and df['avg_fees'].dtype.itemsize <= 4
+    assert df['summary'].tolist() == [summarize(r['description']) for r in records]
+    assert df['summary'].iloc[0] == "x" * SUMMARY_LENGTH + "…"
+
+
+def test_program_slices_follow_rows(conn, records):
+    sync_universities(conn, records)
+    catalog = read_catalog(conn)
+    assert catalog.program_counts().tolist() == [len(r['programs']) for r in records]
+    names = catalog.programs['name']
+    for row in (0, 17, len(records) - 1):
+        start, end = catalog.program_offsets[row], catalog.program_offsets[row + 1]
+        assert names.iloc[start:end].tolist() == [p['name'] for p in records[row]['programs']]
+
+    owners, codes = catalog.program_codes([3, 1])
+    categories = names.cat.categories
+    assert [categories[c] for c in codes[owners == 0]] == [p['name'] for p in records[3]['programs']]
+    assert [categories[c] for c in codes[owners == 1]] == [p['name'] for p in records[1]['programs']]
+
+
+def test_rows_of_ids(records):
+    catalog = Catalog.from_records(records[::2])
+    ids = catalog.universities['id'].to_numpy()
+    assert catalog.rows([ids[3], 2, ids[0], 10 ** 6]).tolist() == [3, -1, 0, -1]
+
+
+def test_records_and_database_build_the_same_catalog(conn, records):
+    sync_universities(conn, records)
+    from_db, from_records = read_catalog(conn), Catalog.from_records(records)
+    pd.testing.assert_frame_equal(from_db.universities, from_records.universities, check_dtype=False,
+                                  check_categorical=False)
+    assert np.array_equal(from_db.program_offsets, from_records.program_offsets)
+    assert from_db.memory_usage()['universities'] > 0
@@ -0,0 +1,100 @@
+import itertools
+
+import numpy as np
+
+import compare
+from catalog import read_catalog
+from compare import FEATURES, bitsets, build_comparison, closest_pairs, overlap_matrix
+from database import read_comparison_details, sync_universities
+
+
+def comparison_of(conn, ids):
+    return build_comparison(read_catalog(conn), ids, *read_comparison_details(conn, ids))
+
+
+def program_sets(records):
+    return [{p['name'] for p in r['programs']} for r in records]
+
+
+# --- Comparison table ---
+def test_table_follows_the_requested_order(conn, records):
+    records[2]['name'] = records[1]['name']
+    records[2]['facilities'] = []
+    sync_universities(conn, records)
+    picked = [records[2], records[0], records[1]]
+    comparison = comparison_of(conn, [r['id'] for r in picked] + [10 ** 6])
+    table = comparison.table
+    assert list(table.index) == FEATURES and table.shape == (len(FEATURES), 3)
+    # A repeated name is told apart by its acronym; the unknown id is skipped.
+    assert table.columns[0] == f"{records[1]['name']} ({records[2]['acronym']})"
+    assert table.loc["Region"].tolist() == [r['region'] for r in picked]
+    assert table.loc["Avg. Annual Fees"].tolist() == [f"{r['avg_fees']:,} TZS" for r in picked]
+    assert table.loc["Number of Programs"].tolist() == [str(len(r['programs'])) for r in picked]
+    assert table.loc["Facilities"].tolist() == [", ".join(r['facilities']) for r in picked]
+    assert table.loc["Admission Requirements"].tolist() == [r['admission_requirements'] for r in picked]
+    assert comparison.differing.tolist() == [len(set(row)) > 1 for row in table.to_numpy()]
+
+
+
+def test_repeated_names_and_acronyms_still_get_unique_columns(conn, records):
+    for r in records[1:4]:
+        r['name'], r['acronym'] = records[0]['name'], records[0]['acronym']
+    records[4]['name'], records[4]['acronym'] = records[0]['name'], ''
+    records[5]['name'], records[5]['acronym'] = records[0]['name'], ''
+    sync_universities(conn, records)
+    picked = records[:7]
+    comparison = comparison_of(conn, [r['id'] for r in picked])
+    name, acronym = records[0]['name'], records[0]['acronym']
+    assert comparison.table.columns.tolist() == [f"{name} ({acronym}, #{r['id']})" for r in picked[:4]] + \
+        [f"{name} (#{r['id']})" for r in picked[4:6]] + [records[6]['name']]
+    assert comparison.program_overlap.index.is_unique and comparison.facility_overlap.columns.is_unique
+
+def test_overlaps_match_set_intersections(conn, records):
+    sync_universities(conn, records)
+    picked = records[:6]
+    comparison = comparison_of(conn, [r['id'] for r in picked])
+    programs, facilities = program_sets(picked), [set(r['facilities']) for r in picked]
+    assert comparison.program_overlap.to_numpy().tolist() == [[len(a & b) for b in programs] for a in programs]
+    assert comparison.facility_overlap.to_numpy().tolist() == [[len(a & b) for b in facilities] for a in facilities]
+
+
+def test_large_comparisons_show_only_the_closest_pairs(conn, records, monkeypatch):
+    monkeypatch.setattr(compare, 'MATRIX_DISPLAY_LIMIT', 5)
+    sync_universities(conn, records)
+    comparison = comparison_of(conn, [r['id'] for r in records[:8]])
+    assert comparison.program_overlap is None and comparison.facility_overlap is None
+    assert comparison.table.shape[1] == 8 and len(comparison.closest) == compare.CLOSEST_PAIRS
+
+
+# --- Set overlap ---
+def test_bitsets_span_several_words():
+    # 70 distinct codes need two words; owner 2 holds all of them.
+    owners = np.array([0, 0, 1, 1] + [2] * 70)
+    codes = np.array([3, 6900, 6900, 500] + [100 * k for k in range(70)])
+    bits = bitsets(owners, codes, 4)
+    assert bits.shape == (4, 2)
+    assert overlap_matrix(bits).tolist() == [[2, 1, 1, 0], [1, 2, 2, 0], [1, 2, 70, 0], [0, 0, 0, 0]]
+    assert overlap_matrix(bitsets(owners[:0], codes[:0], 0)).shape == (0, 0)
+
+
+def test_closest_pairs_match_brute_force(records, monkeypatch):
+    # Small chunks, so pairs are ranked across several of them.
+    monkeypatch.setattr(compare, 'OVERLAP_CHUNK', 64)
+    programs = program_sets(records)
+    facilities = [set(r['facilities']) for r in records]
+    names = sorted(set().union(*programs))
+    owners, codes = zip(*[(i, names.index(name)) for i, names_ in enumerate(programs) for name in names_])
+    facility_names = sorted(set().union(*facilities))
+    f_owners, f_codes = zip(*[(i, facility_names.index(f)) for i, fs in enumerate(facilities) for f in fs])
+    labels = np.array([f"u{i}" for i in range(len(records))], dtype=object)
+    closest = closest_pairs(bitsets(np.array(owners), np.array(codes), len(records)),
+                            bitsets(np.array(f_owners), np.array(f_codes), len(records)), labels, limit=10)
+
+    expected = sorted(((len(programs[i] & programs[j]) / max(1, len(programs[i] | programs[j])),
+                        len(facilities[i] & facilities[j])) for i, j in itertools.combinations(range(len(records)), 2)),
+                      reverse=True)[:10]
+    got = [(jaccard, facility) for jaccard, facility in zip(closest["Program overlap"], closest["Shared facilities"])]
+    assert got == [(round(jaccard, 2), facility) for jaccard, facility in expected]
+    for _, row in closest.iterrows():
+        i, j = int(row["Institution"][1:]), int(row["Compared with"][1:])
+        assert i < j and row["Shared programs"] == len(programs[i] & programs[j])
@@ -0,0 +1,76 @@
+import pytest
+
+from benchmarks.fixtures import FixtureServer, detail_content, render_detail_page
+from crawler import HtmlCache, crawl, parse_detail_page, replay_details, replay_listing
+from scraper import fetch_listing_pages
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HtmlCache(str(tmp_path / 'cache'))
+    yield cache
+    cache.close()
+
+
+def detail_urls(server, n):
+    return [server.url.replace('/universities', f'/institution/{num}') for num in range(1, n + 1)]
+
+
+# --- Page cache ---
+def test_cache_stores_identical_bodies_once(cache):
+    cache.put('http://x/a', b'<html>same</html>', etag='"1"')
+    cache.put('http://x/b', b'<html>same</html>')
+    cache.put('http://x/c', b'<html>other</html>')
+    assert cache.get('http://x/a') == b'<html>same</html>'
+    assert cache.lookup('http://x/a')['etag'] == '"1"'
+    assert cache.get('http://x/missing') is None
+    urls, bodies, on_disk = cache.size()
+    assert (urls, bodies) == (3, 2) and on_disk > 0
+
+
+# --- Concurrent crawl ---
+def test_recrawl_revalidates_and_fetches_only_changed_pages(cache):
+    with FixtureServer(n_pages=1, rows_per_page=12, latency=0.01) as server:
+        urls = detail_urls(server, 12)
+        assert crawl(urls, cache, per_host=3, rate=1000) == {'downloaded': 12, 'not_modified': 0, 'failed': 0}
+        assert server.max_in_flight <= 3
+        assert crawl(urls, cache, rate=1000) == {'downloaded': 0, 'not_modified': 12, 'failed': 0}
+        server.revisions[5] = 1
+        assert crawl(urls, cache, rate=1000) == {'downloaded': 1, 'not_modified': 11, 'failed': 0}
+    assert cache.get(urls[4]) == render_detail_page(5, 1).encode('utf-8')
+
+
+def test_failed_pages_keep_their_cached_copy(cache):
+    with FixtureServer(n_pages=1, rows_per_page=3, latency=0) as server:
+        urls = detail_urls(server, 3)
+        crawl(urls, cache, rate=1000)
+        server.rows_per_page = 2
+        seen = []
+        counts = crawl(urls, cache, rate=1000, on_fetch=lambda url, status: seen.append(status))
+    assert counts == {'downloaded': 0, 'not_modified': 2, 'failed': 1} and sorted(seen) == ['failed'] + ['not_modified'] * 2
+    assert cache.get(urls[2]) == render_detail_page(3).encode('utf-8')
+
+
+# --- Detail parsing and offline replay ---
+def test_detail_pages_parse_to_their_content():
+    assert parse_detail_page(render_detail_page(7, 2)) == detail_content(7, 2)
+
+
+def test_missing_detail_fields_are_left_out():
+    page = ("<table class='programmes'><tbody><tr><td>BSc in Law</td><td>n/a</td><td></td><td>Unknown</td></tr>"
+            "</tbody></table>")
+    assert parse_detail_page(page) == {'programs': [{'name': 'BSc in Law', 'duration': None, 'prospects': None,
+                                                     'program_difficulty': None}]}
+    assert parse_detail_page("<html><body>nothing here</body></html>") == {}
+
+
+def test_replay_needs_no_network(cache):
+    with FixtureServer(n_pages=2, rows_per_page=3, latency=0) as server:
+        pages = fetch_listing_pages(server.url, rate=100, cache=cache)
+        urls = [row['detail_url'] for rows in pages for row in rows]
+        crawl(urls, cache, rate=1000)
+        url = server.url
+    # The server is gone; everything comes from the cache.
+    assert replay_listing(url, cache) == pages
+    details = replay_details(urls + ['http://x/never-cached'], cache)
+    assert list(details) == urls and details[urls[0]] == detail_content(1)
@@ -0,0 +1,198 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from database import (DIFFICULTY_LEVELS, MIGRATIONS, SAMPLE_DATA, Database, data_version, init_db,
+                      insert_sample_data, read_programs, read_universities, read_comparison_details,
+                      read_university_details, sync_universities)
+
+SHIPPED_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'universities.db')
+
+
+# --- Incremental sync ---
+def test_first_sync_inserts_everything(conn, records):
+    changes = sync_universities(conn, records)
+    assert changes['inserted'] == [r['id'] for r in records]
+    assert changes['updated'] == changes['deleted'] == []
+    assert changes['log_id'] == data_version(conn) == 1
+    assert conn.execute('SELECT count(*) FROM universities').fetchone()[0] == len(records)
+
+
+def test_unchanged_sync_writes_nothing(conn, records):
+    sync_universities(conn, records)
+    changes = sync_universities(conn, [dict(r) for r in records])
+    assert changes == {'inserted': [], 'updated': [], 'deleted': [], 'log_id': None}
+    assert data_version(conn) == 1
+
+
+def test_sync_applies_only_the_differences(conn, records):
+    sync_universities(conn, records)
+    incoming = [dict(r) for r in records[1:]]
+    incoming[0]['avg_fees'] += 50000
+    incoming[1]['programs'] = incoming[1]['programs'][:1]
+    changes = sync_universities(conn, incoming)
+    assert changes['inserted'] == []
+    assert changes['updated'] == [records[1]['id'], records[2]['id']]
+    assert changes['deleted'] == [records[0]['id']]
+    assert data_version(conn) == 2
+
+    df = read_universities(conn).set_index('id')
+    assert records[0]['id'] not in df.index
+    assert df.loc[records[1]['id'], 'avg_fees'] == incoming[0]['avg_fees']
+    assert df.loc[records[2]['id'], 'programs'] == incoming[1]['programs']
+    for table in ['programs', 'facilities', 'program_interests']:
+        assert conn.execute(f'SELECT count(*) FROM {table} WHERE university_id = ?', (records[0]['id'],)).fetchone()[0] == 0
+
+
+def test_sync_without_deletes_keeps_missing_rows(conn, records):
+    sync_universities(conn, records)
+    changes = sync_universities(conn, records[:5], delete_missing=False)
+    assert changes['deleted'] == []
+    assert conn.execute('SELECT count(*) FROM universities').fetchone()[0] == len(records)
+
+
+def test_sample_data_never_overwrites(conn):
+    kept = SAMPLE_DATA[0][0]
+    conn.execute("INSERT INTO universities (id, name) VALUES (?, 'Kept')", (kept,))
+    conn.commit()
+    changes = insert_sample_data(conn)
+    assert changes['inserted'] == sorted(row[0] for row in SAMPLE_DATA[1:])
+    assert conn.execute('SELECT name FROM universities WHERE id = ?', (kept,)).fetchone()[0] == 'Kept'
+    assert insert_sample_data(conn)['log_id'] is None
+
+
+# --- Normalized programs and facilities ---
+def test_programs_and_facilities_round_trip_in_order(conn, records):
+    sync_universities(conn, records)
+    df = read_universities(conn)
+    assert df['programs'].tolist() == [r['programs'] for r in records]
+    assert df['facilities'].tolist() == [r['facilities'] for r in records]
+    programs = read_programs(conn)
+    assert (programs['difficulty_rank'] == programs['program_difficulty'].map(DIFFICULTY_LEVELS.index) + 1).all()
+
+
+def test_legacy_json_columns_migrate_to_tables(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    legacy = sqlite3.connect(path)
+    legacy.execute('''CREATE TABLE universities
+                      (id INTEGER PRIMARY KEY, name TEXT, acronym TEXT, region TEXT, type TEXT, avg_fees INTEGER,
+                       difficulty TEXT, location TEXT, description TEXT, facilities TEXT, programs TEXT,
+                       admission_requirements TEXT)''')
+    programs = [{'name': 'BSc in Nursing', 'duration': 4, 'prospects': 'Nurse', 'program_difficulty': 'High'},
+                {'name': 'Diploma in Law', 'duration': 2, 'prospects': 'Clerk', 'program_difficulty': 'Medium'}]
+    legacy.execute('INSERT INTO universities VALUES (7, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                   ('Legacy University', 'LU', 'Arusha', 'Public', 1500000, 'High', 'Arusha', 'Old row',
+                    json.dumps(['Library', 'Labs']), json.dumps(programs), 'Form Six'))
+    legacy.commit()
+    legacy.close()
+
+    conn = init_db(path)
+    try:
+        [uni] = read_universities(conn).to_dict('records')
+        assert (uni['id'], uni['name'], uni['programs'], uni['facilities']) == (7, 'Legacy University', programs,
+                                                                             ['Library', 'Labs'])
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(universities)')}
+        assert not columns & {'programs', 'facilities'}
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == len(MIGRATIONS)
+    finally:
+        conn.close()
+
+
+# --- Migrations and the connection manager ---
+def test_shipped_database_migrates(tmp_path):
+    path = str(tmp_path / 'universities.db')
+    shutil.copy(SHIPPED_DB, path)
+    db = Database(path)
+    try:
+        with db.read() as conn:
+            assert conn.execute('PRAGMA user_version').fetchone()[0] == len(MIGRATIONS)
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            df = read_universities(conn)
+            assert len(df) == 15 and df['programs'].map(len).sum() > 0
+            assert conn.execute('SELECT count(*) FROM search_index').fetchone()[0] == 15
+            assert conn.execute('SELECT count(*) FROM university_identities').fetchone()[0] == 15
+            assert conn.execute('SELECT count(*) FROM aggregates').fetchone()[0] > 0
+            assert conn.execute('SELECT count(DISTINCT university_id) FROM similar_universities').fetchone()[0] == 15
+    finally:
+        db.close()
+    # Opening it again finds nothing left to do.
+    conn = init_db(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == len(MIGRATIONS)
+    conn.close()
+
+
+def test_concurrent_openers_migrate_once(tmp_path):
+    path = str(tmp_path / 'fresh.db')
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def open_db():
+        barrier.wait()
+        try:
+            init_db(path).close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_db) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == len(MIGRATIONS)
+    conn.close()
+
+
+def test_readers_are_not_blocked_by_a_writer(tmp_path, records):
+    db = Database(str(tmp_path / 'wal.db'))
+    try:
+        with db.write() as conn:
+            sync_universities(conn, records[:10])
+        with db.write() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM universities')
+            # The writer holds its lock; readers still see the last committed snapshot, at once.
+            start = time.perf_counter()
+            with db.read() as reader:
+                assert reader.execute('SELECT count(*) FROM universities').fetchone()[0] == 10
+                assert data_version(reader) == 1
+            assert time.perf_counter() - start < 1
+            conn.rollback()
+        with db.read() as reader:
+            with pytest.raises(sqlite3.OperationalError):
+                reader.execute('DELETE FROM universities')
+    finally:
+        db.close()
+
+
+# --- Data version ---
+def test_data_version_is_seen_by_other_handles(tmp_path, records):
+    path = str(tmp_path / 'shared.db')
+    writer, other = Database(path), Database(path)
+    try:
+        with other.read() as conn:
+            assert data_version(conn) == 0
+        with writer.write() as conn:
+            first = sync_universities(conn, records)['log_id']
+            assert sync_universities(conn, records)['log_id'] is None
+        with other.read() as conn:
+            assert data_version(conn) == first == 1
+    finally:
+        writer.close()
+        other.close()
+
+
+# --- Details per id ---
+def test_details_are_read_per_id(conn, records):
+    sync_universities(conn, records)
+    assert read_university_details(conn, records[4]['id']) == records[4]
+    assert read_university_details(conn, 10 ** 6) is None
+    universities, facilities = read_comparison_details(conn, [records[1]['id'], records[0]['id'], 10 ** 6])
+    assert sorted(universities['id']) == [records[0]['id'], records[1]['id']]
+    assert facilities[facilities['university_id'] == records[1]['id']]['name'].tolist() == records[1]['facilities']
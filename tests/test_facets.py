@@ -0,0 +1,81 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_universities
+from catalog import read_catalog
+from database import read_university_interests, sync_universities
+from facets import BUDGET_STEPS, FacetIndex, pack
+
+
+@pytest.fixture
+def catalog(conn):
+    sync_universities(conn, synthetic_universities(150))
+    return read_catalog(conn), read_university_interests(conn)
+
+
+def expected_count(catalog, interests, choices, search_ids=None):
+    # The same count, the slow way.
+    df = catalog.universities
+    keep = np.ones(len(df), dtype=bool)
+    for facet in ('region', 'type', 'difficulty'):
+        if choices.get(facet) is not None:
+            keep &= (df[facet] == choices[facet]).to_numpy()
+    if choices.get('max_fees') is not None:
+        keep &= (df['avg_fees'] <= choices['max_fees']).to_numpy()
+    if choices.get('academic_interest') is not None:
+        ids = interests.loc[(interests['interest'] == choices['academic_interest']) & (interests['programs'] > 0),
+                            'university_id']
+        keep &= df['id'].isin(ids).to_numpy()
+    if choices.get('search'):
+        keep &= df['id'].isin(search_ids).to_numpy()
+    return int(keep.sum())
+
+
+def test_counts_match_pandas(catalog):
+    catalog, interests = catalog
+    facets = FacetIndex(catalog, interests, version=1)
+    regions = catalog.universities['region'].cat.categories[:2].tolist()
+    for region, kind, fees, interest in itertools.product([None] + regions, [None, 'Private'], [None, 2500000],
+                                                          [None, 'STEM', 'Law']):
+        choices = {'region': region, 'type': kind, 'max_fees': fees, 'academic_interest': interest}
+        assert facets.count(choices) == expected_count(catalog, interests, choices), choices
+        for facet in facets.options:
+            counts = facets.counts(choices, facet)
+            assert list(counts) == facets.options[facet]
+            for option, count in counts.items():
+                assert count == expected_count(catalog, interests, dict(choices, **{facet: option})), (facet, option)
+
+
+def test_search_and_unknown_values(catalog):
+    catalog, interests = catalog
+    ids = catalog.universities['id'].tolist()[::9] + [10 ** 6]
+    facets = FacetIndex(catalog, interests, version=1, search=lambda text: ids)
+    choices = {'search': "x", 'type': 'Public'}
+    assert facets.count(choices) == expected_count(catalog, interests, choices, ids)
+    assert facets.count({'region': 'Atlantis'}) == 0
+    assert facets.count({'max_fees': BUDGET_STEPS[0] - 1}) == expected_count(catalog, interests,
+                                                                             {'max_fees': BUDGET_STEPS[0] - 1})
+    assert facets.count({}) == len(catalog) and facets.count({'region': ''}) == len(catalog)
+
+
+def test_prefixes_are_memoized_per_version(catalog):
+    catalog, interests = catalog
+    calls = []
+    facets = FacetIndex(catalog, interests, version=1, search=lambda text: calls.append(text) or [], cache_size=4)
+    facets.count({'search': "law", 'region': 'Arusha'})
+    facets.counts({'search': "law"}, 'type')
+    assert calls == ["law"]
+    for budget in BUDGET_STEPS[:5]:
+        facets.count({'max_fees': budget})
+    assert len(facets._cache) == 4
+    facets.count({'search': "law"})
+    assert calls == ["law", "law"]
+
+
+def test_pack_sets_little_endian_bits():
+    mask = np.zeros(70, dtype=bool)
+    mask[[0, 3, 64, 69]] = True
+    assert pack(mask).tolist() == [0b1001, 0b100001]
+    assert np.bitwise_count(pack(mask)).sum() == 4
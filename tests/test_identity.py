@@ -0,0 +1,97 @@
+import pytest
+
+from database import Database, read_universities
+from identity import IdentityIndex, canonical_region, identity, name_key, normalize_record, resolve_ids
+from ingest import run_ingest
+from scraper import listing_records
+
+LISTING = [
+    ("University of Dar es Salaam (UDSM)", "Dar es Salaam", "Public University"),
+    ("Sokoine University of Agriculture (SUA)", "Morogoro", "Public University"),
+    ("St. Augustine University of Tanzania (SAUT)", "Mwanza", "Private University"),
+    ("St. Augustine University of Tanzania Arusha Campus (SAUT)", "Arusha", "Private Campus, Centre and Institute"),
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'identity.db'))
+    yield db
+    db.close()
+
+
+def run(db, tmp_path, listing):
+    # An ingest of `listing`, served as fetch_listing_pages would return it: one page of rows.
+    rows = [([str(num), name, head_office, kind], None) for num, (name, head_office, kind) in enumerate(listing, 1)]
+    pages = [list(listing_records(rows, 1))]
+    return run_ingest(db, fetch=lambda url, on_page=None, cache=None: pages, details=False,
+                      cache_dir=str(tmp_path / 'cache'))
+
+
+def ingest(db, tmp_path, listing):
+    result = run(db, tmp_path, listing)
+    assert result['status'] == 'succeeded', result
+    with db.read() as conn:
+        return {row['name']: row['id'] for row in read_universities(conn).to_dict('records')}, result
+
+
+# --- Stable ids across ingests ---
+def test_a_renamed_institution_keeps_its_id_when_relisted(db, tmp_path):
+    first, _ = ingest(db, tmp_path, LISTING)
+    assert len(set(first.values())) == len(LISTING)
+    # Delisted for a run, then back under another spelling and address.
+    second, result = ingest(db, tmp_path, LISTING[1:])
+    assert "University of Dar es Salaam" not in second and result['deleted'] == 1
+    renamed = ("The University of Dar es Salam (UDSM)", "P.O. Box 35091, Dar-es-Salaam", "Public University")
+    third, result = ingest(db, tmp_path, [renamed] + LISTING[1:])
+    assert third["The University of Dar es Salam"] == first["University of Dar es Salaam"]
+    assert {name: uid for name, uid in third.items() if name != "The University of Dar es Salam"} == second
+    assert result['matching'] == {'exact': 3, 'fuzzy': 1, 'new': 0, 'duplicates': 0}
+
+
+def test_ids_and_identities_are_committed_together(db, tmp_path):
+    with db.write() as conn:
+        conn.execute("""CREATE TRIGGER fail_identities BEFORE INSERT ON university_identities
+                        BEGIN SELECT RAISE(ABORT, 'disk full'); END""")
+    result = run(db, tmp_path, LISTING)
+    assert result['status'] == 'failed' and 'disk full' in result['message']
+    with db.read() as conn:
+        # Ids without the spellings that map to them would be handed out again by the next ingest.
+        assert conn.execute('SELECT count(*) FROM universities').fetchone()[0] == 0
+        assert conn.execute('SELECT count(*) FROM sync_log').fetchone()[0] == 0
+
+
+# --- Matching ---
+def test_campuses_stay_apart_and_duplicates_collapse():
+    records = [{'name': name, 'acronym': acronym, 'region': region}
+               for name, acronym, region in [("St. Augustine University of Tanzania", "SAUT", "Mwanza"),
+                                             ("St Augustine University of Tanzania Arusha Campus", "SAUT", "Arusha"),
+                                             ("Saint Augustine University of Tanzania", "SAUT", "Mwanza"),
+                                             ("Mzumbe University", "MU", "Morogoro")]]
+    kept, rows, stats = resolve_ids(records, IdentityIndex())
+    assert [r['id'] for r in kept] == [1, 2, 3] and len(rows) == 4
+    assert stats == {'exact': 0, 'fuzzy': 0, 'new': 3, 'duplicates': 1}
+    # A later run matches the spellings it has seen exactly, and a new one by name.
+    index = IdentityIndex(rows, next_id=4)
+    assert index.match(identity(normalize_record(records[2]))) == (1, 'exact')
+    variant = normalize_record({'name': "Mzumbe Universty", 'acronym': "MU", 'region': "Mzumbe, Morogoro"})
+    assert index.match(identity(variant)) == (3, 'fuzzy')
+    assert index.match(identity(normalize_record({'name': "Mzumbe University 2", 'acronym': '', 'region': "Morogoro"}))) \
+        == (None, None)
+
+
+# --- Normalization ---
+def test_head_offices_map_to_regions():
+    assert canonical_region("Dar es Salaam") == "Dar es Salaam"
+    assert canonical_region("P.O. Box 35091, Dar es Salaam") == "Dar es Salaam"
+    assert canonical_region("Dar-es-Salam") == "Dar es Salaam"
+    assert canonical_region("Moshi") == "Kilimanjaro"
+    assert canonical_region("ZANZIBAR") == "Mjini Magharibi"
+    assert canonical_region("  Somewhere else, ") == "Somewhere else"
+    assert canonical_region("") == "Unknown"
+
+
+def test_name_keys_fold_spelling_variants():
+    assert name_key("St. Augustine Univ. of Tanzania") == name_key("Saint Augustine University, Tanzania")
+    assert name_key("Muhimbili University of Health & Allied Sciences") == "muhimbili university health allied science"
+    assert name_key("Mbeya University of Science and Technology") != name_key("Mbeya University of Technology")
@@ -0,0 +1,105 @@
+import json
+import time
+from functools import partial
+
+import pytest
+
+import ingest
+import snapshot
+from benchmarks.fixtures import FixtureServer
+from database import SAMPLE_DATA, Database, data_version, read_universities
+from ingest import IngestBusy, IngestWorker, claim_job, read_job, run_ingest
+from scraper import fetch_listing_pages
+from snapshot import read_snapshot, snapshot_dir
+
+FAST = partial(fetch_listing_pages, rate=100)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'ingest.db'))
+    yield db
+    db.close()
+
+
+def ingest_from(server, db, tmp_path, **options):
+    return run_ingest(db, url=server.url, fetch=FAST, details=False, cache_dir=str(tmp_path / 'cache'), **options)
+
+
+# --- Background ingest and job bookkeeping ---
+def test_job_counts_only_listing_pages(db, tmp_path):
+    with FixtureServer(n_pages=3, rows_per_page=5, latency=0) as server:
+        result = ingest_from(server, db, tmp_path)
+        # The engine also fetched empty pages past the end; they are not counted.
+        assert server.requests > 3
+    assert result['status'] == 'succeeded', result
+    assert (result['pages'], result['rows'], result['inserted']) == (3, 15, 15)
+    with db.read() as conn:
+        job = read_job(conn)
+        assert (job['status'], job['pages'], job['rows']) == ('succeeded', 3, 15)
+        assert job['result'] == result
+        assert len(read_universities(conn)) == 15
+
+
+def test_offline_replay_counts_the_same(db, tmp_path):
+    with FixtureServer(n_pages=2, rows_per_page=5, latency=0) as server:
+        ingest_from(server, db, tmp_path)
+        result = ingest_from(server, db, tmp_path, offline=True)
+        assert server.requests <= 2 + 4
+    assert (result['status'], result['pages'], result['rows'], result['inserted']) == ('succeeded', 2, 10, 0)
+
+
+def test_failed_listing_falls_back_to_sample_data(db, tmp_path):
+    with FixtureServer(n_pages=3, latency=0) as server:
+        server.errors[1] = 404
+        result = ingest_from(server, db, tmp_path)
+    assert result['status'] == 'fallback'
+    assert "HTTP error" in result['message'] and result['inserted'] == len(SAMPLE_DATA)
+    assert (result['pages'], result['rows']) == (0, 0)
+
+
+def test_a_running_job_blocks_another(db):
+    with db.write() as conn:
+        job_id = claim_job(conn, 'test')
+        with pytest.raises(IngestBusy):
+            claim_job(conn, 'test')
+    with db.write() as conn:
+        conn.execute('UPDATE ingest_jobs SET heartbeat_at = ? WHERE id = ?', (time.time() - ingest.JOB_STALE_AFTER - 1,
+                                                                              job_id))
+        conn.commit()
+        # A job whose heartbeat has gone stale is taken to have crashed.
+        newer = claim_job(conn, 'test')
+    with db.read() as conn:
+        assert read_job(conn, job_id)['status'] == 'abandoned'
+        assert read_job(conn)['id'] == newer
+
+
+def test_worker_runs_in_the_background(db, tmp_path):
+    with FixtureServer(n_pages=2, rows_per_page=5, latency=0) as server:
+        worker = IngestWorker(db, url=server.url, fetch=FAST, details=False, cache_dir=str(tmp_path / 'cache'))
+        job_id = worker.start()
+        for _ in range(200):
+            if worker.status(job_id)['status'] != 'running':
+                break
+            time.sleep(0.05)
+    job = worker.status(job_id)
+    assert job['status'] == 'succeeded' and job['rows'] == 10
+
+
+def test_cli(tmp_path, capsys):
+    with FixtureServer(n_pages=1, rows_per_page=5, latency=0) as server:
+        code = ingest.main(['--db', str(tmp_path / 'cli.db'), '--url', server.url, '--no-details',
+                            '--cache-dir', str(tmp_path / 'cache')])
+    result = json.loads(capsys.readouterr().out)
+    assert code == 0 and result['status'] == 'succeeded' and result['universities'] == 5
+
+
+# --- Snapshots ---
+@pytest.mark.skipif(snapshot.pa is None, reason="snapshots need pyarrow")
+def test_ingest_publishes_a_snapshot(db, tmp_path):
+    with FixtureServer(n_pages=1, rows_per_page=5, latency=0) as server:
+        ingest_from(server, db, tmp_path)
+    with db.read() as conn:
+        version = data_version(conn)
+    catalog, _ = read_snapshot(snapshot_dir(db.path), version)
+    assert len(catalog) == 5
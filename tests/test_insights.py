@@ -0,0 +1,44 @@
+import numpy as np
+
+from database import DIFFICULTY_LEVELS, FEE_BIN_WIDTH, read_aggregates, read_university_interests, sync_universities
+from insights import chart_options
+from taxonomy import INTERESTS
+
+
+def bars(chart, series=0):
+    return dict(zip(chart['xAxis']['data'], chart['series'][series]['data']))
+
+
+def test_charts_match_the_catalog(conn, records):
+    sync_universities(conn, records)
+    charts = chart_options(read_aggregates(conn))
+    fees = np.array([r['avg_fees'] for r in records])
+
+    regions = bars(charts['region'])
+    assert regions == {region: sum(r['region'] == region for r in records) for region in regions}
+    assert sum(regions.values()) == len(records) and list(regions.values()) == sorted(regions.values(), reverse=True)
+    assert {d['name']: d['value'] for d in charts['type']['series'][0]['data']} == {
+        kind: sum(r['type'] == kind for r in records) for kind in ('Public', 'Private')}
+    assert bars(charts['difficulty']) == {level: sum(r['difficulty'] == level for r in records)
+                                          for level in DIFFICULTY_LEVELS}
+    assert sum(bars(charts['fee_histogram']).values()) == len(records)
+    assert len(bars(charts['fee_histogram'])) == len(set(fees // FEE_BIN_WIDTH))
+    assert charts['fee_percentiles']['p50'] == np.percentile(fees, 50)
+
+    private = [r['avg_fees'] for r in records if r['type'] == 'Private']
+    boxes = dict(zip(charts['fee_by_type']['xAxis']['data'], charts['fee_by_type']['series'][0]['data']))
+    assert boxes['Private'] == [round(q) for q in np.percentile(private, [0, 25, 50, 75, 100])]
+
+    interests = read_university_interests(conn)
+    programs = interests.groupby('interest')['programs'].sum()
+    assert bars(charts['interest']) == {i: int(programs.get(i, 0)) for i in INTERESTS}
+    assert bars(charts['interest'], 1) == {i: int((interests['interest'] == i).sum()) for i in INTERESTS}
+
+
+def test_aggregates_follow_syncs(conn, records):
+    sync_universities(conn, records)
+    moved = [dict(r, region='Dodoma') for r in records[:5]] + records[5:]
+    sync_universities(conn, moved)
+    regions = bars(chart_options(read_aggregates(conn))['region'])
+    assert regions['Dodoma'] == sum(r['region'] == 'Dodoma' for r in moved)
+    assert sum(regions.values()) == len(records)
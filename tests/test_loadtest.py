@@ -0,0 +1,57 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmarks.browser import free_port, start_server
+from benchmarks.loadtest import Run, memory_kib
+from database import init_db, sync_universities
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+@pytest.fixture
+def server(tmp_path, records):
+    db = str(tmp_path / 'load.db')
+    conn = init_db(db)
+    sync_universities(conn, records)
+    conn.close()
+    port = free_port()
+    process = start_server(APP, port, db, STACKUNIVERSITY_CACHE=str(tmp_path / 'cache'))
+    yield port
+    process.terminate()
+    process.wait()
+
+
+# --- Live sessions ---
+def test_browse_and_wizard_scripts_complete(server):
+    port = server
+    run = Run(think=0)
+    # Seed 0 draws a browse script and seed 1 a wizard run; each finishes the script it started.
+    stop = time.perf_counter() + 0.1
+
+    async def sessions():
+        await asyncio.gather(run.session(port, 0, stop, 0.5), run.session(port, 1, stop, 0.5))
+    asyncio.run(sessions())
+    assert run.errors == []
+    assert run.scripts == {'browse': 1, 'wizard': 1}
+    assert {"explore", "add to compare", "view details", "compare", "insights", "recommendations"} <= set(run.latencies)
+    assert all(ms > 0 for values in run.latencies.values() for ms in values)
+
+
+# --- Helpers ---
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason="needs /proc")
+def test_memory_is_read_from_proc():
+    assert memory_kib(os.getpid(), 'VmRSS') > 0
+    assert memory_kib(os.getpid(), 'VmHWM') >= memory_kib(os.getpid(), 'VmRSS')
+    assert memory_kib(2 ** 22 + 1, 'VmRSS') is None
+
+
+def test_listing_url_can_point_at_a_local_stand_in():
+    env = dict(os.environ, STACKUNIVERSITY_TCU_URL='http://127.0.0.1:9/universities')
+    out = subprocess.run([sys.executable, '-c', 'import scraper; print(scraper.TCU_LISTING_URL)'], env=env,
+                         cwd=os.path.dirname(APP), capture_output=True, text=True, check=True).stdout
+    assert out.strip() == 'http://127.0.0.1:9/universities'
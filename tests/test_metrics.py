@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from metrics import Metrics, debug_enabled, percentile
+
+
+def memoize(fn):
+    # A minimal stand-in for st.cache_data: runs the body only on a miss.
+    memo = {}
+
+    def call(*args):
+        if args not in memo:
+            memo[args] = fn(*args)
+        return memo[args]
+    call.clear = memo.clear
+    return call
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 0.5) is None
+    assert percentile([5, 1, 3, 2, 4], 0.5) == 3
+    assert percentile(list(range(1, 101)), 0.95) == 95
+    assert percentile([7], 0.99) == 7
+
+
+def test_reruns_record_phases_and_cache_counts(tmp_path):
+    log = tmp_path / 'metrics.jsonl'
+    metrics = Metrics(log_path=str(log))
+    calls = []
+    load = metrics.cached(memoize)(lambda version: calls.append(version) or version * 2)
+
+    for _ in range(3):
+        with metrics.rerun() as rerun:
+            metrics.lap('setup')
+            assert load(1) == 2
+            metrics.lap('load')
+    assert calls == [1] and rerun.cache['<lambda>'] == {'hits': 1, 'misses': 0}
+    metrics.lap('outside a rerun')
+
+    summary = metrics.summary()
+    assert summary['reruns'] == 3 and set(summary['phases']) == {'setup', 'load'}
+    assert summary['cache'] == {'<lambda>': {'hits': 2, 'misses': 1}}
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(records) == 3 and list(records[0]['phases']) == ['setup', 'load']
+    assert records[0]['cache'] == {'<lambda>': {'hits': 0, 'misses': 1}}
+
+
+def test_fragments_time_only_their_own_reruns():
+    metrics = Metrics()
+    with metrics.rerun():
+        with metrics.fragment('explore'):
+            metrics.lap('explore.cards')
+    with metrics.fragment('explore'):
+        metrics.lap('explore.cards')
+    summary = metrics.summary()
+    assert summary['reruns'] == 1 and list(summary['fragments']) == ['explore']
+    assert summary['phases']['explore.cards']['p50'] is not None
+
+
+def test_interrupted_reruns_keep_their_status(tmp_path):
+    log = tmp_path / 'metrics.jsonl'
+    metrics = Metrics(log_path=str(log))
+    with pytest.raises(KeyError):
+        with metrics.rerun():
+            raise KeyError('x')
+    assert json.loads(log.read_text())['status'] == 'KeyError'
+
+
+def test_prometheus_export(tmp_path):
+    path = tmp_path / 'metrics.prom'
+    metrics = Metrics(prometheus_path=str(path))
+    with metrics.rerun():
+        metrics.lap('page_setup')
+    text = path.read_text()
+    assert 'stackuniversity_rerun_seconds_count 1\n' in text
+    assert 'stackuniversity_phase_seconds{phase="page_setup",quantile="0.5"}' in text
+    assert text == metrics.prometheus_text()
+
+
+def test_debug_switch(monkeypatch):
+    monkeypatch.delenv('STACKUNIVERSITY_DEBUG', raising=False)
+    assert not debug_enabled({}) and debug_enabled({'debug': '1'}) and not debug_enabled({'debug': 'no'})
+    monkeypatch.setenv('STACKUNIVERSITY_DEBUG', 'true')
+    assert debug_enabled()
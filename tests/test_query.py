@@ -0,0 +1,74 @@
+import itertools
+
+import pytest
+
+from benchmarks.synthetic import synthetic_frame
+from query import SORT_OPTIONS, Filters, QueryEngine
+
+
+@pytest.fixture
+def df():
+    return synthetic_frame(300)
+
+
+def expected_ids(df, filters, ranked=None):
+    # What the query engine should return, the slow way.
+    rows = df
+    if filters.region is not None:
+        rows = rows[rows['region'] == filters.region]
+    if filters.type is not None:
+        rows = rows[rows['type'] == filters.type]
+    if filters.difficulty is not None:
+        rows = rows[rows['difficulty'] == filters.difficulty]
+    if filters.max_fees is not None:
+        rows = rows[rows['avg_fees'] <= filters.max_fees]
+    if ranked is not None:
+        rows = rows[rows['id'].isin(ranked)]
+        if filters.sort_by == "Relevance":
+            return [uid for uid in ranked if uid in set(rows['id'])]
+    by, ascending = {"Relevance": ('name', True), "Name (A-Z)": ('name', True), "Name (Z-A)": ('name', False),
+                     "Fees (Low-High)": ('avg_fees', True), "Fees (High-Low)": ('avg_fees', False)}[filters.sort_by]
+    return rows.sort_values(by, ascending=ascending, kind='stable')['id'].tolist()
+
+
+def test_filters_and_sorts_match_pandas(df):
+    engine = QueryEngine(df, version=1)
+    for region, kind, fees, sort_by in itertools.product([None, 'Arusha', 'Mwanza'], [None, 'Private'],
+                                                         [None, 1500000, 5000000], SORT_OPTIONS):
+        filters = Filters(region=region, type=kind, max_fees=fees, sort_by=sort_by)
+        assert engine.query(filters).tolist() == expected_ids(df, filters), filters
+    filters = Filters(difficulty='High')
+    assert engine.query(filters).tolist() == expected_ids(df, filters)
+
+
+def test_search_keeps_relevance_order_unless_sorted(df):
+    ranked = df['id'].tolist()[::-7] + [999999]
+    engine = QueryEngine(df, version=1, search=lambda text: ranked)
+    for sort_by in SORT_OPTIONS:
+        filters = Filters(search="x", type='Public', sort_by=sort_by)
+        assert engine.query(filters).tolist() == expected_ids(df, filters, ranked[:-1]), sort_by
+
+
+def test_unknown_values_match_nothing(df):
+    engine = QueryEngine(df, version=1)
+    assert len(engine.query(Filters(region='Atlantis'))) == 0
+    assert len(engine.query(Filters(max_fees=0))) == 0
+
+
+def test_results_are_memoized_per_version(df):
+    calls = []
+    engine = QueryEngine(df, version=1, search=lambda text: calls.append(text) or df['id'].tolist(), cache_size=2)
+    first = engine.positions(Filters(search="law"))
+    assert engine.positions(Filters(search="law")) is first and calls == ["law"]
+    assert not first.flags.writeable
+    engine.positions(Filters(search="a"))
+    engine.positions(Filters(search="b"))
+    engine.positions(Filters(search="law"))
+    assert calls == ["law", "a", "b", "law"]
+
+
+def test_positions_for_ids_skips_missing(df):
+    engine = QueryEngine(df.iloc[::-1].reset_index(drop=True), version=1)
+    positions = engine.positions_for_ids([5, 999999, 1])
+    assert engine.ids[positions].tolist() == [5, 1]
+    assert len(engine.positions_for_ids([])) == 0
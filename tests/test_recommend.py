@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import interest_frame, synthetic_universities
+from catalog import Catalog
+from recommend import INTERESTS, Recommender
+
+PREFS = [
+    {},
+    {'max_fees': 3000000},
+    {'type': 'Private'},
+    {'region': 'Arusha', 'type': 'Public', 'max_fees': 2000000, 'academic_interest': 'Health Sciences',
+     'difficulty': 'High'},
+    {'type': 'Private', 'max_fees': 5000000, 'academic_interest': 'STEM'},
+]
+
+
+@pytest.fixture(scope='module')
+def recommender():
+    records = synthetic_universities(500)
+    return Recommender(Catalog.from_records(records), interest_frame(records))
+
+
+def full_sort(recommender, prefs, k):
+    # Every row ranked by the whole key (score, interest share, lower fees, catalog order), then cut.
+    scores, _ = recommender.scores(prefs)
+    if prefs.get('academic_interest') in INTERESTS:
+        share = recommender.interest_share[:, INTERESTS.index(prefs['academic_interest'])]
+    else:
+        share = np.zeros(len(scores))
+    order = sorted(range(len(scores)), key=lambda row: (-scores[row], -share[row], recommender.fees[row], row))
+    return [row for row in order[:k] if scores[row] > 0]
+
+
+@pytest.mark.parametrize('prefs', PREFS)
+@pytest.mark.parametrize('k', [1, 5, 20])
+def test_top_k_matches_a_full_sort(recommender, prefs, k):
+    positions, scores, misses, exact = recommender.top_k(prefs, k)
+    assert positions.tolist() == full_sort(recommender, prefs, k)
+    assert exact == int((recommender.scores(prefs)[0] >= 1.0 - 1e-9).sum())
+
+
+def test_ties_at_the_cut_go_to_the_cheapest(recommender):
+    # Without answers every institution scores 1.0: the five cheapest must win.
+    positions, scores, _, exact = recommender.top_k({}, 5)
+    assert exact == len(recommender.ids) and (scores == 1.0).all()
+    assert sorted(recommender.fees[positions]) == sorted(recommender.fees)[:5]
+
+
+def test_scores_and_misses(recommender):
+    prefs = {'region': 'Arusha', 'max_fees': 2000000}
+    positions, scores, misses, _ = recommender.top_k(prefs, 500)
+    for pos, score, missed in zip(positions, scores, misses):
+        in_region = recommender.regions[pos] == 'Arusha'
+        in_budget = recommender.fees[pos] <= 2000000
+        assert (score == 1.0) == (in_region and in_budget)
+        assert missed == [name for name, ok in (('region', in_region), ('budget', in_budget)) if not ok]
+    # Twice the budget or more is no budget fit at all.
+    parts = recommender.components({'max_fees': 1000000})
+    assert (parts['budget'][recommender.fees >= 2000000] == 0).all()
+
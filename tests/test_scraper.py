@@ -0,0 +1,109 @@
+import time
+
+import pytest
+import requests
+
+from benchmarks.fixtures import FixtureServer, listing_rows, render_listing_page
+from scraper import (FEED_CHUNK, LISTING_BACKENDS, TokenBucket, fetch_listing_pages, listing_page_url, parse_listing_page,
+                     sniff_encoding)
+
+
+# --- Pagination ---
+def test_fetches_every_page_until_the_first_empty_one():
+    with FixtureServer(n_pages=7, rows_per_page=5, latency=0) as server:
+        seen = []
+        pages = fetch_listing_pages(server.url, max_workers=3, rate=100,
+                                    on_page=lambda page, url, n_rows: seen.append((page, n_rows)))
+    assert [len(rows) for rows in pages] == [5] * 7
+    assert [row['name'] for row in pages[0]] == [name.split(' (')[0] for _, name, _, _ in listing_rows(1, 5)]
+    assert pages[6][-1]['detail_url'] == server.url.replace('/universities', '/institution/35')
+    assert sorted(page for page, n_rows in seen if n_rows) == list(range(1, 8))
+    assert server.max_in_flight <= 3
+
+
+def test_empty_first_page_returns_nothing():
+    with FixtureServer(n_pages=0, latency=0) as server:
+        assert fetch_listing_pages(server.url, max_workers=4, rate=100) == []
+        assert server.requests <= 4
+
+
+def test_http_error_is_raised():
+    with FixtureServer(n_pages=5, rows_per_page=2, latency=0) as server:
+        server.errors[2] = 404
+        with pytest.raises(requests.HTTPError):
+            fetch_listing_pages(server.url, max_workers=2, rate=100)
+
+
+def test_page_urls():
+    assert listing_page_url('http://x/universities', 1) == 'http://x/universities'
+    assert listing_page_url('http://x/universities', 3) == 'http://x/universities?page=3'
+
+
+# --- Token bucket ---
+def test_token_bucket_allows_a_burst_then_holds_the_rate():
+    bucket = TokenBucket(rate=20, capacity=4)
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - start >= 4 / 20 * 0.9
+
+
+# --- Parser backends ---
+@pytest.mark.parametrize('backend', sorted(LISTING_BACKENDS))
+def test_backends_parse_the_listing_table(backend):
+    body = render_listing_page(listing_rows(2, 3)).encode('utf-8')
+    records = parse_listing_page(body, 2, base_url='http://x/universities?page=2', backend=backend)
+    assert [(r['name'], r['acronym'], r['region'], r['detail_url']) for r in records] == [
+        ("Institute 3 of Education", "I3E", "Mwanza", 'http://x/institution/4'),
+        ("Institute 4 of Agriculture", "I4A", "Morogoro", 'http://x/institution/5'),
+        ("Institute 5 of Arts and Social Sciences", "I5A", "Mbeya", 'http://x/institution/6'),
+    ]
+    assert records == parse_listing_page(body.decode('utf-8'), 2, base_url='http://x/universities?page=2',
+                                         backend=backend)
+
+
+@pytest.mark.parametrize('backend', sorted(LISTING_BACKENDS))
+def test_backends_agree_and_decode_the_declared_charset(backend):
+    page = ("<html><head><meta charset='iso-8859-1'></head><body><table class='views-table'><tbody>"
+            "<tr><td>1</td><td><a href='/i/1'>Université Côte (UC)</a></td><td>Arusha</td>"
+            "<td>Private University</td></tr></tbody></table></body></html>").encode('iso-8859-1')
+    assert sniff_encoding(page) == 'iso-8859-1'
+    [record] = parse_listing_page(page, 1, backend=backend)
+    assert (record['name'], record['acronym'], record['type']) == ("Université Côte", "UC", "Private")
+    assert record == parse_listing_page(page, 1, backend='stdlib')[0]
+
+
+def test_page_without_the_listing_table_has_no_records():
+    for backend in LISTING_BACKENDS:
+        assert parse_listing_page(b"<html><body><table><tr><td>x</td></tr></table></body></html>", 1,
+                                  backend=backend) == []
+
+
+# --- Streaming parse ---
+@pytest.mark.parametrize('backend', sorted(LISTING_BACKENDS))
+def test_rows_split_across_feed_chunks(backend):
+    rows = listing_rows(1, rows_per_page=2000)
+    body = render_listing_page(rows).encode('utf-8')
+    assert len(body) > 8 * FEED_CHUNK
+    records = parse_listing_page(body, 1, backend=backend)
+    assert [r['name'] for r in records] == [name.split(' (')[0] for _, name, _, _ in rows]
+
+
+@pytest.mark.parametrize('backend', sorted(LISTING_BACKENDS))
+def test_only_the_listing_table_is_read(backend):
+    page = ("<table class='layout'><tbody><tr><td>1</td><td>Menu</td><td>x</td><td>y</td></tr></tbody></table>"
+            "<table class='views-table cols-4'><thead><tr><td>S/N</td><td>Name</td><td>a</td><td>b</td></tr></thead>"
+            "<tbody><tr><td>1</td><td><a href='/i/1'>Alpha University (AU)</a></td><td>Arusha</td>"
+            "<td>Public University</td></tr><tr><td>short row</td></tr></tbody></table><p>after</p>")
+    records = parse_listing_page(page.encode('utf-8'), 1, backend=backend)
+    assert [(r['name'], r['acronym'], r['region'], r['type'], r['detail_url']) for r in records] == [
+        ("Alpha University", "AU", "Arusha", "Public", '/i/1')]
+
+
+def test_content_type_charset_wins_over_meta():
+    body = "<meta charset='utf-8'>Kilimanjaro Christian Médical".encode('iso-8859-1')
+    assert sniff_encoding(body, 'text/html; charset=ISO-8859-1') == 'ISO-8859-1'
+    assert sniff_encoding(b"<html>no declaration</html>") == 'utf-8'
@@ -0,0 +1,58 @@
+import pytest
+
+from database import sync_universities
+from search import edit_distance, query_terms, search_universities
+
+
+def record(uid, name, acronym, programs):
+    return {'id': uid, 'name': name, 'acronym': acronym, 'region': 'Arusha', 'type': 'Public', 'avg_fees': 1000000,
+            'difficulty': 'Medium', 'location': 'Arusha', 'description': '', 'facilities': [],
+            'programs': [{'name': name, 'duration': 3, 'prospects': '', 'program_difficulty': 'Medium'}
+                         for name in programs], 'admission_requirements': ''}
+
+
+@pytest.fixture
+def catalog(conn):
+    sync_universities(conn, [
+        record(1, "University of Dar es Salaam", "UDSM", ["BSc in Computer Science", "Bachelor of Laws"]),
+        record(2, "Muhimbili University of Health and Allied Sciences", "MUHAS", ["Doctor of Medicine", "BSc in Nursing"]),
+        record(3, "Nelson Mandela Institute of Science and Technology", "NM-AIST", ["MSc in Engineering"]),
+        record(4, "Institute of Accountancy Arusha", "IAA", ["Bachelor of Accounting", "BSc in Computer Science"]),
+    ])
+    return conn
+
+
+def test_names_rank_above_programs(catalog):
+    assert search_universities(catalog, "UDSM") == [1]
+    ranked = search_universities(catalog, "science")
+    assert set(ranked[:2]) == {2, 3} and set(ranked[2:]) == {1, 4}
+    assert search_universities(catalog, "arusha accounting") == [4]
+
+
+def test_prefixes_and_diacritics_match(catalog):
+    assert search_universities(catalog, "muhim") == [2]
+    assert set(search_universities(catalog, "comp sci")) == {1, 4}
+    assert search_universities(catalog, "Mandéla") == [3]
+
+
+def test_typos_are_corrected(catalog):
+    assert search_universities(catalog, "medcine") == [2]
+    assert search_universities(catalog, "engeneering") == [3]
+    assert search_universities(catalog, "medcine", fuzzy=False) == []
+
+
+def test_no_match_and_empty_query(catalog):
+    assert search_universities(catalog, "zzzz") == []
+    assert search_universities(catalog, "  !! ") == []
+
+
+def test_index_follows_syncs(catalog):
+    sync_universities(catalog, [record(1, "University of Dar es Salaam", "UDSM", ["BSc in Pharmacy"])])
+    assert search_universities(catalog, "pharmacy") == [1]
+    assert search_universities(catalog, "nursing") == []
+
+
+def test_helpers():
+    assert query_terms("Comp-Sci, UDSM!") == ['comp', 'sci', 'udsm']
+    assert edit_distance("medcine", "medicine", 2) == 1
+    assert edit_distance("abc", "abcdef", 1) == 2
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_similarity import edit
+from benchmarks.synthetic import synthetic_universities
+from database import init_db, read_similar_universities, sync_universities
+from similarity import SIMILAR_K, feature_matrix, nearest
+
+
+def stored_lists(conn):
+    return conn.execute('SELECT university_id, position, similar_id, score FROM similar_universities '
+                        'ORDER BY university_id, position').fetchall()
+
+
+def assert_same_lists(lists, expected):
+    # Each list names the same institutions with the same scores. A score computed in another
+    # block can land on the other side of a rounding boundary, so near-ties may swap places.
+    def by_university(rows):
+        grouped = {}
+        for uid, _, similar_id, score in rows:
+            grouped.setdefault(uid, []).append((similar_id, score))
+        return grouped
+    lists, expected = by_university(lists), by_university(expected)
+    assert list(lists) == list(expected)
+    for uid, entries in expected.items():
+        assert sorted(lists[uid]) == [(similar_id, pytest.approx(score, abs=1e-5)) for similar_id, score in sorted(entries)], uid
+
+
+def rebuilt(path, records):
+    # The lists a fresh database builds from scratch for the same records.
+    conn = init_db(str(path))
+    sync_universities(conn, records)
+    lists = stored_lists(conn)
+    conn.close()
+    return lists
+
+
+# --- Scores and nearest neighbours ---
+def test_scores_weight_each_feature_group():
+    universities = pd.DataFrame({'id': [1, 2, 3], 'type': ['Public', 'Public', 'Private'],
+                                 'avg_fees': [1500000, 1900000, 5000000], 'difficulty': ['High', 'High', 'Low']})
+    programs = pd.DataFrame({'university_id': [1, 1, 2, 3], 'name': ['Law', 'Medicine', 'Law', 'Arts']})
+    facilities = pd.DataFrame({'university_id': [1, 2], 'name': ['Library', 'Library']})
+    ids, vectors = feature_matrix(universities, programs, facilities)
+    score = vectors @ vectors.T
+    # Programs share one of two (cosine 1/sqrt(2)); facility, type, fee band and difficulty all match.
+    assert np.isclose(score[0, 1], 0.5 / np.sqrt(2) + 0.2 + 0.1 + 0.1 + 0.1)
+    # Without facilities, the third can match itself on at most the other 80%.
+    assert np.isclose(score[0, 2], 0) and np.allclose(np.diag(score), [1, 1, 0.8])
+
+
+def test_nearest_matches_a_full_sort(records):
+    universities = pd.DataFrame(records)[['id', 'type', 'avg_fees', 'difficulty']]
+    programs = pd.DataFrame([(r['id'], p['name']) for r in records for p in r['programs']],
+                            columns=['university_id', 'name'])
+    facilities = pd.DataFrame([(r['id'], f) for r in records for f in r['facilities']], columns=['university_id', 'name'])
+    ids, vectors = feature_matrix(universities, programs, facilities)
+    rows = np.arange(len(ids))
+    neighbours, scores = nearest(vectors, rows)
+    full = np.round(vectors @ vectors.T, 6)
+    np.fill_diagonal(full, -1)
+    for row in rows:
+        order = np.lexsort((np.arange(len(ids)), -full[row]))[:SIMILAR_K]
+        assert neighbours[row].tolist() == order.tolist() and np.allclose(scores[row], full[row, order])
+
+
+# --- Stored lists ---
+def test_incremental_refresh_matches_a_full_rebuild(conn, tmp_path):
+    records = synthetic_universities(80)
+    sync_universities(conn, records)
+    assert_same_lists(stored_lists(conn), rebuilt(tmp_path / 'rebuilt-0.db', records))
+    deleted = []
+    for seed in range(1, 20):
+        # Each round changes some institutions' programs, deletes a few and adds a few.
+        records = edit(records, 12, seed)
+        deleted += sync_universities(conn, records)['deleted']
+        assert_same_lists(stored_lists(conn), rebuilt(tmp_path / f'rebuilt-{seed}.db', records))
+    assert len(deleted) > 20
+
+
+def record(uid, programs, facilities):
+    return {'id': uid, 'name': f"University {uid}", 'acronym': f"U{uid}", 'region': 'Arusha', 'type': 'Public',
+            'avg_fees': 1500000, 'difficulty': 'Medium', 'location': 'Arusha', 'description': '',
+            'facilities': facilities, 'programs': [{'name': name, 'duration': 3, 'prospects': '', 'program_difficulty': 'Medium'}
+                                                   for name in programs], 'admission_requirements': ''}
+
+
+def test_a_deleted_list_does_not_lend_its_floor(conn, tmp_path):
+    # 10's list ends at 0.645 and 11's at 0.441 without naming 10. Updating 10 rewrites its list
+    # after 11's; once 10 is deleted, 9 moving to 0.599 from 11 must still enter 11's list.
+    others = [record(uid, [f"Z{uid}"], ["Library", "Gym"]) for uid in range(1, 10)]
+    records = others + [record(10, [f"Z{uid}" for uid in range(1, 7)], ["Library"]), record(11, ["A"], ["Gym"])]
+    sync_universities(conn, records)
+    records[9]['description'] = "Updated."
+    sync_universities(conn, records)
+    moved = record(9, ["Z9", "A"] + [f"Y{n}" for n in range(8)], ["Library", "Gym"])
+    records = others[:8] + [moved, records[10]]
+    sync_universities(conn, records)
+    assert [s['id'] for s in read_similar_universities(conn, 11)] == [9, 1, 2, 3, 4, 5]
+    assert_same_lists(stored_lists(conn), rebuilt(tmp_path / 'rebuilt.db', records))
+
+
+def test_details_read_the_stored_list(conn, records):
+    sync_universities(conn, records)
+    similar = read_similar_universities(conn, records[0]['id'])
+    assert len(similar) == SIMILAR_K and records[0]['id'] not in [s['id'] for s in similar]
+    assert [s['score'] for s in similar] == sorted((s['score'] for s in similar), reverse=True)
+    assert read_similar_universities(conn, 10 ** 6) == []
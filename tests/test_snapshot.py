@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+import pytest
+
+import snapshot
+from catalog import read_catalog
+from database import Database, data_version, read_university_interests, sync_universities
+from snapshot import KEEP_SNAPSHOTS, load_snapshot, read_snapshot, snapshot_dir, write_snapshot
+
+needs_arrow = pytest.mark.skipif(snapshot.pa is None, reason="snapshots need pyarrow")
+
+
+@pytest.fixture
+def db(tmp_path, records):
+    db = Database(str(tmp_path / 'snap.db'))
+    with db.write() as conn:
+        sync_universities(conn, records)
+    yield db
+    db.close()
+
+
+def assert_same_catalog(loaded, conn):
+    catalog, interests = loaded
+    expected = read_catalog(conn)
+    pd.testing.assert_frame_equal(catalog.universities, expected.universities)
+    pd.testing.assert_frame_equal(catalog.programs, expected.programs)
+    assert catalog.program_offsets.tolist() == expected.program_offsets.tolist()
+    pd.testing.assert_frame_equal(interests, read_university_interests(conn))
+
+
+@needs_arrow
+def test_snapshot_round_trips_the_catalog(db, tmp_path):
+    directory = str(tmp_path / 'snapshots')
+    with db.write() as conn:
+        version = write_snapshot(conn, directory)
+        assert os.listdir(directory) == [str(version)]
+        assert_same_catalog(read_snapshot(directory, version), conn)
+    assert read_snapshot(directory, version + 1) is None
+
+
+@needs_arrow
+def test_only_the_newest_versions_are_kept(db, tmp_path, records):
+    directory = str(tmp_path / 'snapshots')
+    versions = []
+    for count in range(len(records), len(records) - 4, -1):
+        with db.write() as conn:
+            sync_universities(conn, records[:count])
+            versions.append(write_snapshot(conn, directory))
+    assert sorted(os.listdir(directory)) == sorted(str(v) for v in versions[-KEEP_SNAPSHOTS:])
+
+
+@needs_arrow
+def test_a_damaged_snapshot_is_ignored(db, tmp_path):
+    directory = str(tmp_path / 'snapshots')
+    with db.write() as conn:
+        version = write_snapshot(conn, directory)
+    with open(os.path.join(directory, str(version), 'programs.arrow'), 'wb') as f:
+        f.write(b'not arrow')
+    assert read_snapshot(directory, version) is None
+
+
+def test_load_falls_back_to_sqlite_and_publishes(db):
+    with db.read() as conn:
+        version = data_version(conn)
+        assert_same_catalog(load_snapshot(db, version), conn)
+    published = os.path.isdir(os.path.join(snapshot_dir(db.path), str(version)))
+    assert published == (snapshot.pa is not None)
+
+
+def test_without_pyarrow_nothing_is_written(db, monkeypatch):
+    monkeypatch.setattr(snapshot, 'pa', None)
+    with db.read() as conn:
+        version = data_version(conn)
+        assert_same_catalog(load_snapshot(db, version), conn)
+    assert not os.path.exists(snapshot_dir(db.path))
+
+
+def test_snapshot_location(monkeypatch):
+    monkeypatch.delenv('STACKUNIVERSITY_SNAPSHOTS', raising=False)
+    assert snapshot_dir('/data/universities.db') == '/data/universities.snapshots'
+    monkeypatch.setenv('STACKUNIVERSITY_SNAPSHOTS', '/tmp/snaps')
+    assert snapshot_dir('/data/universities.db') == '/tmp/snaps'